@@ -2,7 +2,9 @@
 #refactored by Tameem 14/3/2025
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
-from channels.db import database_sync_to_async as sync_to_async, aclose_old_connections
+from channels.db import aclose_old_connections
+from app.live.roster import roster_member
+from app.live.rooms import get_live_room, leave_live_room
 
 class LobbyConsumer(AsyncWebsocketConsumer):
     async def connect(self):
@@ -15,9 +17,12 @@ class LobbyConsumer(AsyncWebsocketConsumer):
 
         self.user = self.scope.get("user")
         self.session = self.scope["session"]
+        self.member = roster_member(self.user, self.session)
 
         await self.accept()
-        await self.send_updated_participants()
+        live_room = get_live_room(self.join_code)
+        await live_room.join_roster(self.member)
+        await self.send_roster()
 
     async def disconnect(self, close_code):
         await self.channel_layer.group_discard(
@@ -25,7 +30,7 @@ class LobbyConsumer(AsyncWebsocketConsumer):
             self.channel_name
         )
 
-        await self.send_updated_participants()
+        await leave_live_room(self.join_code, self.member)
 
         await aclose_old_connections()
 
@@ -34,7 +39,7 @@ class LobbyConsumer(AsyncWebsocketConsumer):
         data = json.loads(text_data)
 
         if data.get("action") == "update":
-            await self.send_updated_participants()
+            await self.send_roster()
         elif data.get("action") == "quiz_started":
             await self.channel_layer.group_send(
                 self.room_group_name,
@@ -48,42 +53,18 @@ class LobbyConsumer(AsyncWebsocketConsumer):
         else:
             await self.send(text_data=json.dumps({"error": "Unknown action in lobby"}))
 
-    @sync_to_async
-    def get_participants(self, room):
-        participants = room.participants.exclude(user__role="tutor")
-        result = []
-        for participant in participants:
-            if participant.guest_access:
-                result.append(f"Guest ({participant.guest_access.session_id[:8]})")
-            else:
-                result.append(participant.user.email_address)
-        return result
+    async def send_roster(self):
+        """Send the full roster to this socket only.
 
+        The roster is kept by this worker process, so with several workers it
+        only lists the participants whose sockets are connected to this one.
+        """
+        await self.send(text_data=json.dumps(get_live_room(self.join_code).roster.snapshot()))
 
-    async def send_updated_participants(self):
-        from app.models import Room
-        try:
-            room = await sync_to_async(Room.objects.get)(join_code=self.join_code)
-            participants = await self.get_participants(room)
-
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    "type": "participants_update",
-                    "participants": participants
-                }
-            )
-        except Room.DoesNotExist:
-            return
 
+    async def broadcast_frame(self, event):
+        await self.send(text_data=event["text"])
 
-    async def participants_update(self, event):
-        await self.send(text_data=json.dumps({
-            "type": "update_participants",
-            "action": "update_participants",
-            "participants": event["participants"]
-        }))
-    
 
     async def quiz_started(self, event):
         await self.send(text_data=json.dumps({
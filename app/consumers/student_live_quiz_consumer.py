@@ -1,6 +1,42 @@
 import json
+import math
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from app.grading import DecimalChecker
+from app.live.frames import encode
+from app.live.leaderboard import participant_key, participant_label
+from app.live.rooms import get_live_room, leave_live_room
+from app.live.roster import roster_member
+from app.models.quiz import TrueFalseQuestion, IntegerInputQuestion, TextInputQuestion, DecimalInputQuestion, MultipleChoiceQuestion, NumericalRangeQuestion
+from app.models.responses import TrueFalseResponse, IntegerInputResponse, TextInputResponse, DecimalInputResponse, MultipleChoiceResponse, NumericalRangeResponse
+
+# Decimal answers are rounded to the stored precision, as the database would when writing them
+to_decimal = DecimalChecker(0, DecimalInputResponse._meta.get_field("answer").decimal_places).quantise
+
+
+def to_finite_float(answer):
+    """Convert a range answer to float, rejecting nan and infinity, which FloatField would accept."""
+    value = float(answer)
+    if not math.isfinite(value):
+        raise ValueError("Answer must be a finite number")
+    return value
+
+
+# question_type sent by the client -> (question model, response model, answer conversion)
+RESPONSE_TYPES = {
+    "true_false": (TrueFalseQuestion, TrueFalseResponse, lambda answer: str(answer).strip().lower() == "true"),
+    "integer": (IntegerInputQuestion, IntegerInputResponse, int),
+    "text": (TextInputQuestion, TextInputResponse, lambda answer: answer),
+    "decimal": (DecimalInputQuestion, DecimalInputResponse, to_decimal),
+    "multiple_choice": (MultipleChoiceQuestion, MultipleChoiceResponse, lambda answer: answer),
+    "numerical_range": (NumericalRangeQuestion, NumericalRangeResponse, to_finite_float),
+}
+
+# Related rows the consumer has already loaded; full_clean would query each one again
+LOADED_RELATIONS = ["room", "question", "player", "guest_access"]
 
 
 class StudentQuizConsumer(AsyncWebsocketConsumer):
@@ -14,9 +50,11 @@ class StudentQuizConsumer(AsyncWebsocketConsumer):
         await self.accept()
         self.user = self.scope.get("user")
         self.session = self.scope["session"]
+        self.participant_key = None
+        participant = None
 
         if self.user and self.user.is_authenticated and self.user.role.lower() != "tutor":
-            await database_sync_to_async(RoomParticipant.objects.get_or_create)(
+            participant, _ = await database_sync_to_async(RoomParticipant.objects.get_or_create)(
                 room=self.room, user=self.user
             )
         else:
@@ -27,48 +65,20 @@ class StudentQuizConsumer(AsyncWebsocketConsumer):
             guest_access, _ = await database_sync_to_async(GuestAccess.objects.get_or_create)(
                 session_id=guest_session
             )
-            await database_sync_to_async(RoomParticipant.objects.get_or_create)(
+            participant, _ = await database_sync_to_async(RoomParticipant.objects.get_or_create)(
                 room=self.room, guest_access=guest_access
             )
-        participants = await self.get_participants(self.room)
-        participant_number = len(participants)
-        update_message = {
-            "type": "participants_update",
-            "participants": participants,
-            "participant_number": participant_number
-        }
-        await self.channel_layer.group_send(self.room_group_name, update_message)
-        await self.channel_layer.group_send(f"live_quiz_{self.join_code}", update_message)
+            participant.guest_access = guest_access
+            self.guest_access = guest_access
+        if participant:
+            await self.register_participant(participant)
+        self.member = roster_member(self.user, self.session)
+        await get_live_room(self.join_code).join_roster(self.member)
 
 
     async def disconnect(self, close_code):
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
-        from app.models import Room, RoomParticipant, GuestAccess
-        room = await database_sync_to_async(Room.objects.get)(join_code=self.join_code)
-        try:
-            if self.user and self.user.is_authenticated:
-                participant = await database_sync_to_async(RoomParticipant.objects.get)(
-                    room=room, user_id=self.user.id
-                )
-            else:
-                guest = await database_sync_to_async(GuestAccess.objects.get)(
-                    session_id=self.session.session_key
-                )
-                participant = await database_sync_to_async(RoomParticipant.objects.get)(
-                    room=room, guest_access=guest
-                )
-
-        except RoomParticipant.DoesNotExist:
-            pass
-        participants = await self.get_participants(room)
-        participant_number = len(participants)
-        update_message = {
-            "type": "participants_update",
-            "participants": participants,
-            "participant_number": participant_number
-        }
-        await self.channel_layer.group_send(self.room_group_name, update_message)
-        await self.channel_layer.group_send(f"live_quiz_{self.join_code}", update_message)
+        await leave_live_room(self.join_code, getattr(self, "member", None))
 
 
     async def receive(self, text_data):
@@ -80,140 +90,74 @@ class StudentQuizConsumer(AsyncWebsocketConsumer):
             question_id = data.get("question_id")
             question_type = data.get("question_type")
 
+            if not get_live_room(self.join_code).clock.accepts(question_type, question_id):
+                await self.send(text_data=json.dumps({"error": "Question closed", "question_id": question_id}))
+                return
             if question_id in self.answered_questions:
                 return
             self.answered_questions.add(question_id)
             user = self.scope.get("user")
-            await self.save_response(user, question_type, question_id, answer)
-            await self.channel_layer.group_send(
-                f"live_quiz_{self.join_code}",
-                {"type": "answer_received", "answer": answer}
-            )
+            leaderboard = await get_live_room(self.join_code).get_leaderboard(self.room)
+            try:
+                response = await self.save_response(user, question_type, question_id, answer)
+            except (ValueError, TypeError, ValidationError):
+                self.answered_questions.discard(question_id)
+                await self.send(text_data=json.dumps({"error": "Invalid answer", "question_id": question_id}))
+                return
+            if response is None:
+                return
+            await self.send(text_data=json.dumps({"type": "answer_ack", "question_id": question_id}))
+            if self.participant_key:
+                leaderboard.record_answer(self.participant_key, response.correct, response.question.mark)
+            get_live_room(self.join_code).request_leaderboard_update()
         elif action == "update":
             pass
 
 
-    @database_sync_to_async
-    def save_response(self, user, question_type, question_id, answer):
-        from app.models.quiz import TrueFalseQuestion, IntegerInputQuestion, TextInputQuestion, DecimalInputQuestion, MultipleChoiceQuestion, NumericalRangeQuestion
-        from app.models.responses import TrueFalseResponse, IntegerInputResponse, TextInputResponse, DecimalInputResponse, MultipleChoiceResponse, NumericalRangeResponse
-        if user.is_authenticated:
-            if question_type == "true_false":
-                question = TrueFalseQuestion.objects.get(id=question_id)
-                bool_answer = True if str(answer).strip().lower() == "true" else False
-                return TrueFalseResponse.objects.create(player=user, room=self.room, question=question, answer=bool_answer)
-            elif question_type == "integer":
-                question = IntegerInputQuestion.objects.get(id=question_id)
-                return IntegerInputResponse.objects.create(player=user, room=self.room, question=question, answer=int(answer))
-            elif question_type == "text":
-                question = TextInputQuestion.objects.get(id=question_id)
-                return TextInputResponse.objects.create(player=user, room=self.room, question=question, answer=answer)
-            elif question_type == "decimal":
-                question = DecimalInputQuestion.objects.get(id=question_id)
-                return DecimalInputResponse.objects.create(player=user, room=self.room, question=question, answer=answer)
-            elif question_type == "multiple_choice":
-                question = MultipleChoiceQuestion.objects.get(id=question_id)
-                return MultipleChoiceResponse.objects.create(player=user, room=self.room, question=question, answer=answer)
-            elif question_type == "numerical_range":
-                question = NumericalRangeQuestion.objects.get(id=question_id)
-                return NumericalRangeResponse.objects.create(player=user, room=self.room, question=question, answer=float(answer))
-            else:
-                return None
+    async def register_participant(self, participant):
+        self.participant_key = participant_key(participant.user_id, participant.guest_access_id)
+        leaderboard = get_live_room(self.join_code).leaderboard
+        if leaderboard is not None:
+            label = await database_sync_to_async(participant_label)(participant)
+            leaderboard.add_participant(self.participant_key, participant.id, label, participant.joined_at)
+
+
+    async def save_response(self, user, question_type, question_id, answer):
+        """Validate and grade an answer, then hand it to the room's write-behind buffer."""
+        from app.helpers.helper_functions import isCorrectAnswer
+        if question_type not in RESPONSE_TYPES:
+            return None
+        question_model, response_model, convert = RESPONSE_TYPES[question_type]
+        live_room = get_live_room(self.room.join_code)
+        question = await live_room.get_question(question_model, int(question_id))
+        if user and user.is_authenticated:
+            owner = {"player": user}
         else:
-            session_key = self.scope["session"].session_key
+            owner = {"guest_access": await self.get_guest_access()}
+        response = response_model(room=self.room, question=question, answer=convert(answer), **owner)
+        response.full_clean(exclude=LOADED_RELATIONS)
+        isCorrectAnswer(response)
+        live_room.ingest(response, timezone.now())
+        return response
+
+
+    async def get_guest_access(self):
+        if getattr(self, "guest_access", None) is None:
             from app.models import GuestAccess
-            guest_access = GuestAccess.objects.get(session_id=session_key)
-            if question_type == "true_false":
-                question = TrueFalseQuestion.objects.get(id=question_id)
-                bool_answer = True if str(answer).strip().lower() == "true" else False
-                return TrueFalseResponse.objects.create(guest_access=guest_access, room=self.room, question=question, answer=bool_answer)
-            elif question_type == "integer":
-                question = IntegerInputQuestion.objects.get(id=question_id)
-                return IntegerInputResponse.objects.create(guest_access=guest_access, room=self.room, question=question, answer=int(answer))
-            elif question_type == "text":
-                question = TextInputQuestion.objects.get(id=question_id)
-                return TextInputResponse.objects.create(guest_access=guest_access, room=self.room, question=question, answer=answer)
-            elif question_type == "decimal":
-                question = DecimalInputQuestion.objects.get(id=question_id)
-                return DecimalInputResponse.objects.create(guest_access=guest_access, room=self.room, question=question, answer=answer)
-            elif question_type == "multiple_choice":
-                question = MultipleChoiceQuestion.objects.get(id=question_id)
-                return MultipleChoiceResponse.objects.create(guest_access=guest_access, room=self.room, question=question, answer=answer)
-            elif question_type == "numerical_range":
-                question = NumericalRangeQuestion.objects.get(id=question_id)
-                return NumericalRangeResponse.objects.create(guest_access=guest_access, room=self.room, question=question, answer=float(answer))
-            else:
-                return None
-
-
-    async def student_question(self, event):
-        response = {
-            "type": "question_update",
-            "question": event.get("message").get("question"),
-            "question_id": event.get("message").get("question_id"),
-            "options": event.get("message").get("options"),
-            "question_number": event.get("message").get("question_number"),
-            "total_questions": event.get("message").get("total_questions"),
-            "time": event.get("message").get("time"),
-            "question_type": event.get("message").get("question_type", "multiple_choice"),
-            "items": event.get("message").get("items", []),
-            "image": event.get("message").get("image", "")
-        }
-        await self.send(text_data=json.dumps(response))
-
-
-    async def quiz_update(self, event):
-        await self.send(text_data=json.dumps(event))
-
-
-    async def leaderboard_update(self, event):
-        response = {
-            "type": "leaderboard_update",
-            "leaderboard": event.get("leaderboard")
-        }
-        if "answered_count" in event:
-            response["answered_count"] = event["answered_count"]
-        if "participant_number" in event:
-            response["participant_number"] = event["participant_number"]
-        await self.send(text_data=json.dumps(response))
-
-
-    async def quiz_ended(self, event):
-        await self.send(text_data=json.dumps({
-            "type": "quiz_ended",
-            "message": event.get("message")
-        }))
-
-
-    @database_sync_to_async
-    def get_participants(self, room):
-        participants = room.participants.exclude(user__role__iexact="tutor")
-        result = []
-        for participant in participants:
-            if participant.guest_access:
-                result.append(f"Guest ({participant.guest_access.session_id[:8]})")
-            else:
-                result.append(participant.user.email_address)
-        return result
-
-
-    async def participants_update(self, event):
-        await self.send(text_data=json.dumps({
-            "action": "update_participants",
-            "participant_number": event.get("participant_number"),
-            "participants": event.get("participants")
-        }))
-
-    async def show_stats(self, event):
-         stats_data = {
-             "type": "show_stats",
-             "correct_answer": event.get("correct_answer", ""),
-             "responses_received": event.get("responses_received", -2),
-             "correct_responses": event.get("correct_responses", -2),
-         }
-         await self.send(text_data=json.dumps(stats_data))
-
-    async def hide_stats_popup(self, event):
-        await self.send(text_data=json.dumps({
-            "type": "hide_stats_popup"
-        }))
+            session_key = self.scope["session"].session_key
+            self.guest_access = await database_sync_to_async(GuestAccess.objects.get)(session_id=session_key)
+        return self.guest_access
+
+
+    async def broadcast_frame(self, event):
+        await self.send(text_data=event["text"])
+
+
+    async def rank_update(self, event):
+        leaderboard = get_live_room(self.join_code).leaderboard
+        if leaderboard is None:
+            return
+        message = {"type": "leaderboard_update"}
+        message.update(leaderboard.student_view(self.participant_key, settings.LIVE_QUIZ_STUDENT_TOP_K))
+        message["answered_count"] = event.get("answered_count")
+        await self.send(text_data=encode(message))
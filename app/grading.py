@@ -0,0 +1,138 @@
+"""Compiled answer checkers.
+
+Each question is turned once into a small grader holding everything it needs
+already normalised: the text key, the quantised decimal, the stripped option
+set, the numeric bounds. Checkers are cached by (type, id, version) where the
+version is the question's answer-defining values, so editing a question's
+answer compiles a new checker instead of grading against a stale one."""
+from collections import OrderedDict
+from decimal import Decimal, InvalidOperation
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+
+def normalise_text(value):
+    """Case-insensitive key for a text answer that ignores surrounding and repeated whitespace."""
+    return " ".join(str(value).split()).casefold()
+
+
+class ExactChecker:
+    """Integer and true/false questions: the answer converted to the question's type must match."""
+
+    def __init__(self, field, expected):
+        self.field = field
+        self.expected = field.to_python(expected)
+
+    def __call__(self, answer):
+        return self.field.to_python(answer) == self.expected
+
+
+class TextChecker:
+    def __init__(self, expected):
+        self.expected = normalise_text(expected)
+
+    def __call__(self, answer):
+        return normalise_text(answer) == self.expected
+
+
+class DecimalChecker:
+    """Compares at the question's precision, the same rounding the database applies when storing."""
+
+    def __init__(self, expected, decimal_places):
+        self.exponent = Decimal(1).scaleb(-decimal_places)
+        self.expected = self.quantise(expected)
+
+    def quantise(self, value):
+        try:
+            return Decimal(str(value).strip()).quantize(self.exponent)
+        except InvalidOperation:
+            raise ValidationError(f"'{value}' is not a decimal number.")
+
+    def __call__(self, answer):
+        return self.quantise(answer) == self.expected
+
+
+class ChoiceChecker:
+    def __init__(self, expected, options):
+        self.expected = str(expected).strip()
+        self.options = frozenset(str(option).strip() for option in options)
+
+    def is_option(self, answer):
+        return isinstance(answer, str) and answer.strip() in self.options
+
+    def __call__(self, answer):
+        return str(answer).strip() == self.expected
+
+
+class RangeChecker:
+    def __init__(self, low, high):
+        self.low = float(low)
+        self.high = float(high)
+
+    def __call__(self, answer):
+        try:
+            return self.low <= float(answer) <= self.high
+        except (TypeError, ValueError):
+            raise ValidationError(f"'{answer}' is not a number.")
+
+
+def checker_version(question):
+    """The values a question is graded against."""
+    kind = question._meta.model_name
+    if kind == "numericalrangequestion":
+        return (question.min_value, question.max_value)
+    if kind == "multiplechoicequestion":
+        return (question.correct_answer, tuple(question.options))
+    return (question.correct_answer,)
+
+
+def compile_checker(question):
+    kind = question._meta.model_name
+    if kind == "numericalrangequestion":
+        return RangeChecker(question.min_value, question.max_value)
+    if kind == "multiplechoicequestion":
+        return ChoiceChecker(question.correct_answer, question.options)
+    if kind == "textinputquestion":
+        return TextChecker(question.correct_answer)
+    field = question._meta.get_field("correct_answer")
+    if kind == "decimalinputquestion":
+        return DecimalChecker(question.correct_answer, field.decimal_places)
+    return ExactChecker(field, question.correct_answer)
+
+
+class CheckerCache:
+    """Least-recently-used cache of compiled checkers keyed by (type, id, version)."""
+
+    def __init__(self, maxsize=None):
+        self.maxsize = settings.ANSWER_CHECKER_CACHE_SIZE if maxsize is None else maxsize
+        self._checkers = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._checkers)
+
+    def get(self, question):
+        key = (question._meta.model_name, question.pk, checker_version(question))
+        checker = self._checkers.get(key)
+        if checker is not None:
+            self._checkers.move_to_end(key)
+            self.hits += 1
+            return checker
+        self.misses += 1
+        checker = compile_checker(question)
+        self._checkers[key] = checker
+        if len(self._checkers) > self.maxsize:
+            self._checkers.popitem(last=False)
+        return checker
+
+    def clear(self):
+        self._checkers.clear()
+        self.hits = self.misses = 0
+
+
+checkers = CheckerCache()
+
+
+def get_checker(question):
+    return checkers.get(question)
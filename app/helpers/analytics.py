@@ -0,0 +1,50 @@
+"""Score analytics for a finished room.
+
+The participants' saved scores are read once into a NumPy array, and the
+mean, median, percentiles and score distribution are computed from it
+instead of with a Python loop per participant. Every score writer stores the
+participant's total, streak bonuses included, so the array needs no
+recomputation from the responses."""
+import numpy as np
+from app.models import RoomParticipant
+
+PERCENTILES = (25, 50, 75, 90)
+
+
+class ScoreAnalytics:
+    """The total scores of a room's participants, as one array."""
+
+    def __init__(self, scores):
+        self.scores = np.fromiter(scores, dtype=np.float64)
+
+    @classmethod
+    def load(cls, room):
+        return cls(
+            RoomParticipant.objects.filter(room=room).exclude(user__role__iexact="tutor")
+            .values_list('score', flat=True)
+        )
+
+    def __len__(self):
+        return len(self.scores)
+
+    def mean(self):
+        return float(self.scores.mean()) if len(self.scores) else 0.0
+
+    def median(self):
+        return float(np.median(self.scores)) if len(self.scores) else 0.0
+
+    def percentiles(self, points=PERCENTILES):
+        """[{"point": 25, "score": ...}, ...] for each requested percentile."""
+        if not len(self.scores):
+            return [{"point": point, "score": 0.0} for point in points]
+        return [{"point": point, "score": score} for point, score in zip(points, np.percentile(self.scores, points).tolist())]
+
+    def distribution(self, bins=10):
+        """[{"label": "0-5", "count": 3}, ...] with equal width buckets over the scores."""
+        if not len(self.scores):
+            return []
+        counts, edges = np.histogram(self.scores, bins=bins)
+        return [
+            {"label": f"{start:g}-{end:g}", "count": count}
+            for start, end, count in zip(edges[:-1].tolist(), edges[1:].tolist(), counts.tolist())
+        ]
@@ -1,47 +1,30 @@
-from itertools import chain
+from itertools import chain, groupby
 from typing import Any
+from django.db.models import Count, IntegerField, Q, Sum
+from django.db.models.functions import Cast
 from app.models import Quiz, IntegerInputQuestion, Response, TrueFalseQuestion, NumericalRangeResponse, RoomParticipant, \
     TextInputQuestion, DecimalInputQuestion, MultipleChoiceQuestion, NumericalRangeQuestion, quiz, \
     Stats, IntegerInputResponse, TrueFalseResponse, TextInputResponse, DecimalInputResponse, MultipleChoiceResponse, \
-    User, Room
+    User, Room, QuizItem
 from app.models.stats import QuestionStats
 
+RESPONSE_MODELS = (
+    TrueFalseResponse, IntegerInputResponse, TextInputResponse,
+    DecimalInputResponse, MultipleChoiceResponse, NumericalRangeResponse,
+)
+
 def get_content_type():
     from django.contrib.contenttypes.models import ContentType
     return ContentType
 
 def getAllQuestions(quiz):
     if isinstance(quiz, Quiz):
-        questions_int = list(IntegerInputQuestion.objects.filter(quiz=quiz))
-        questions_tf = list(TrueFalseQuestion.objects.filter(quiz=quiz))
-        questions_text = list(TextInputQuestion.objects.filter(quiz=quiz))
-        questions_decimal = list(DecimalInputQuestion.objects.filter(quiz=quiz))
-        questions_mcq = list(MultipleChoiceQuestion.objects.filter(quiz=quiz))
-        questions_num_range = list(NumericalRangeQuestion.objects.filter(quiz=quiz))
-
-        all_questions = (
-            questions_int + questions_tf + questions_text +
-            questions_decimal + questions_mcq + questions_num_range
-        )
-
-        return all_questions
+        return quiz.get_all_questions()
     return None
 
 def isCorrectAnswer(response):
-    if isinstance(response, NumericalRangeResponse):
-        if response.question.min_value <= response.answer <= response.question.max_value:
-            response.correct = True
-            return True
-        else:
-            response.correct = False
-            return False
-    else:
-        if response.answer == response.question.correct_answer:
-            response.correct = True
-            return True
-        else:
-            response.correct = False
-            return False
+    """Grade a response that has not been saved yet; saved responses carry `correct`."""
+    return response.grade()
 
 def get_streak_bonus(streak_count, base_points):
     """Calculate the streak bonus based on the streak count."""
@@ -53,12 +36,12 @@ def get_streak_bonus(streak_count, base_points):
 
 def get_responses(user, room):
     #get all the responses for the specific user for a particular room ordered by time
-    tf_responses = TrueFalseResponse.objects.filter(player=user, room=room)
-    int_responses = IntegerInputResponse.objects.filter(player=user, room=room)
-    text_responses = TextInputResponse.objects.filter(player=user, room=room)
-    decimal_responses = DecimalInputResponse.objects.filter(player=user, room=room)
-    mc_responses = MultipleChoiceResponse.objects.filter(player=user, room=room)
-    range_responses = NumericalRangeResponse.objects.filter(player=user, room=room)
+    tf_responses = TrueFalseResponse.objects.filter(player=user, room=room).select_related('question')
+    int_responses = IntegerInputResponse.objects.filter(player=user, room=room).select_related('question')
+    text_responses = TextInputResponse.objects.filter(player=user, room=room).select_related('question')
+    decimal_responses = DecimalInputResponse.objects.filter(player=user, room=room).select_related('question')
+    mc_responses = MultipleChoiceResponse.objects.filter(player=user, room=room).select_related('question')
+    range_responses = NumericalRangeResponse.objects.filter(player=user, room=room).select_related('question')
     responses = sorted(
         chain(tf_responses, int_responses, text_responses, decimal_responses, mc_responses, range_responses),
         key=lambda r: r.timestamp  # Order by timestamp
@@ -68,49 +51,93 @@ def get_responses(user, room):
 def calculate_user_base_score(user,room):
     if not user or not room:
         return 0
-    responses= get_responses(user,room)
     base_score=0 # base score ie without bonuses
-    for response in responses:
-        if isCorrectAnswer(response):
-            base_score += response.question.mark  # add base points to base score
+    for response_model in RESPONSE_MODELS:
+        marks = response_model.objects.filter(player=user, room=room, correct=True).aggregate(total=Sum('question__mark'))
+        base_score += marks['total'] or 0
     return base_score
 
-def calculate_user_score(user,room):
-    if not user or not room:
-        return 0
-    responses= get_responses(user,room)
+def graded_marks(room, **owner):
+    """(correct, mark) for each of a participant's responses in a room, oldest first.
+
+    Reads the stored grade and the question's mark in one query per response
+    type instead of loading every response and its question.
+    """
+    rows = []
+    for response_model in RESPONSE_MODELS:
+        rows.extend(
+            response_model.objects.filter(room=room, **owner)
+            .values_list('timestamp', 'correct', 'question__mark')
+        )
+    rows.sort(key=lambda row: row[0])
+    return [(correct, mark) for _, correct, mark in rows]
+
+def score_graded_marks(marks):
+    """(base score, total score with streak bonuses) for graded_marks()."""
     base_score=0 # base score ie without bonuses
     total_score=0 #score including bonuses
     streak_count=0 # streak tracker
-    question_position={} # stores counters for each question
-    for response in responses:
-        question_id = response.question.id
-        if isCorrectAnswer(response):
-            base_points = response.question.mark  # base points from the question
+    for correct, base_points in marks:
+        if correct:
             base_score += base_points  # add base points to base score
             total_score+=base_points
             streak_count+=1
             # apply streak bonuses
-            streak_bonus= get_streak_bonus(streak_count, base_points)
-            total_score+= streak_bonus
-            # reset the question counter
-            if question_id not in question_position:
-                question_position[question_id] = 0  # Ensure tracking starts at zero
-            question_position[question_id] += 1 # Increment for every response
+            total_score+= get_streak_bonus(streak_count, base_points)
         else: #incorrect answer resets streak
             streak_count=0
-    #update the participant's score in the database ie without the added bonuses in order to use for stats page later
-    RoomParticipant.objects.filter(user=user, room=room).update(score=base_score)
+    return base_score, total_score
+
+def room_graded_marks(room):
+    """(player_id, guest_access_id, timestamp, correct, mark) for every response in a room.
+
+    One UNION ALL query across the six response tables, ordered by participant
+    and then time so each participant's answers arrive together and in order.
+    """
+    fields = ('player_id', 'guest_access_id', 'timestamp', 'correct', 'question__mark')
+    first, *rest = [
+        response_model.objects.filter(room=room).values_list(*fields)
+        for response_model in RESPONSE_MODELS
+    ]
+    return first.union(*rest, all=True).order_by('player_id', 'guest_access_id', 'timestamp')
+
+def score_room(room):
+    """(base score, total score) for every participant who answered, keyed by (user_id, guest_access_id)."""
+    scores = {}
+    for owner, rows in groupby(room_graded_marks(room), key=lambda row: row[:2]):
+        scores[owner] = score_graded_marks((correct, mark) for _, _, _, correct, mark in rows)
+    return scores
+
+def update_room_scores(room):
+    """Store every participant's total score, streak bonuses included, in a fixed number of queries.
+
+    This is the score the live leaderboard saves, so the stats read the same
+    basis whichever of them wrote it last.
+    """
+    scores = score_room(room)
+    participants = list(RoomParticipant.objects.filter(room=room))
+    for participant in participants:
+        participant.score = scores.get((participant.user_id, participant.guest_access_id), (0, 0))[1]
+    RoomParticipant.objects.bulk_update(participants, ['score'])
+    return scores
+
+def calculate_user_score(user,room):
+    if not user or not room:
+        return 0
+    base_score, total_score = score_graded_marks(graded_marks(room, player=user))
+    #update the participant's score in the database, with bonuses as the leaderboard saves it, for the stats page later
+    RoomParticipant.objects.filter(user=user, room=room).update(score=total_score)
     return total_score
 
 def get_leaderboard(room):
     if not room:
         return []
 
-    participants=(RoomParticipant.objects.filter(room=room))
+    participants=list(RoomParticipant.objects.filter(room=room))
     #calculate scores in bulk
+    scores = score_room(room)
     for participant in participants:
-        participant.score = calculate_user_score(participant.user, room)
+        participant.score = scores.get((participant.user_id, participant.guest_access_id), (0, 0))[1]
     #update the score in bulk
     RoomParticipant.objects.bulk_update(participants, ['score'])
     #fetch sorted data
@@ -129,17 +156,57 @@ def get_leaderboard(room):
     ]
 
 def create_quiz_stats(room):
-    Stats.objects.create(
-        room=room,
-        quiz=room.quiz
-    )
-    questions = getAllQuestions(room.quiz)
-    for question in questions:
-         QuestionStats.objects.create(
+    """Record a finished room's Stats and one QuestionStats per question of its quiz.
+
+    The scores are summarised from one query and the per-question counts come
+    from one grouped query per response table; each kind of row is then
+    written with a single bulk_create.
+    """
+    stats = Stats(room=room, quiz_id=room.quiz_id)
+    stats.summarise_scores()
+    Stats.objects.bulk_create([stats])
+
+    counts = question_response_counts(room)
+    question_stats = []
+    for content_type_id, question_id in QuizItem.objects.filter(quiz_id=room.quiz_id).values_list('content_type_id', 'object_id'):
+        received, correct = counts.get((content_type_id, question_id), (0, 0))
+        question_stats.append(QuestionStats(
             room=room,
-            question_type=get_content_type().objects.get_for_model(question),
-            question_id=question.id,
+            question_type_id=content_type_id,
+            question_id=question_id,
+            responses_received=received,
+            correct_responses=correct,
+            percentage_correct=QuestionStats.percentage(received, correct),
+        ))
+    QuestionStats.objects.bulk_create(question_stats)
+    return stats
+
+def question_response_counts(room):
+    """{(question content type id, question id): (responses received, correct responses)} for a room.
+
+    One grouped COUNT/SUM query per response table; questions nobody answered are absent.
+    """
+    question_models = [response_model._meta.get_field('question').related_model for response_model in RESPONSE_MODELS]
+    content_types = get_content_type().objects.get_for_models(*question_models)
+    counts = {}
+    for response_model, question_model in zip(RESPONSE_MODELS, question_models):
+        rows = (
+            response_model.objects.filter(room=room).order_by()
+            .values('question_id')
+            .annotate(received=Count('id'), correct=Sum(Cast('correct', IntegerField())))
         )
+        for row in rows:
+            counts[content_types[question_model].id, row['question_id']] = (row['received'], row['correct'] or 0)
+    return counts
+
+def refresh_question_stats(room):
+    """Recount a room's existing QuestionStats rows and write them back with one bulk_update."""
+    counts = question_response_counts(room)
+    question_stats = list(QuestionStats.objects.filter(room=room))
+    for row in question_stats:
+        row.responses_received, row.correct_responses = counts.get((row.question_type_id, row.question_id), (0, 0))
+        row.percentage_correct = QuestionStats.percentage(row.responses_received, row.correct_responses)
+    QuestionStats.objects.bulk_update(question_stats, ['responses_received', 'correct_responses', 'percentage_correct'])
 
 def get_response_model_class(question_type):
     response_model_mapping = {
@@ -155,6 +222,36 @@ def get_response_model_class(question_type):
         raise ValueError("Unknown Response model")
     return response_model
 
+def count_correct_responses(responses):
+    """Responses received and how many were correct, counted by the database."""
+    counts = responses.aggregate(
+        responses_received=Count('id'),
+        correct_responses=Count('id', filter=Q(correct=True)),
+    )
+    return counts['responses_received'], counts['correct_responses']
+
+def regrade_responses(room):
+    """Re-grade a room's responses against the current questions, e.g. after an answer key is fixed.
+
+    Only responses whose result changed are written. Scores and stats for the
+    room are recalculated afterwards. Returns the number of responses changed.
+    """
+    changed = []
+    for response_model in RESPONSE_MODELS:
+        stale = []
+        for response in response_model.objects.filter(room=room).select_related('question'):
+            previous = response.correct
+            if response.grade() != previous:
+                stale.append(response)
+        response_model.objects.bulk_update(stale, ['correct'], batch_size=500)
+        changed.extend(stale)
+    if changed:
+        update_room_scores(room)
+        for stats in Stats.objects.filter(room=room):
+            stats.save()
+        refresh_question_stats(room)
+    return len(changed)
+
 def get_all_responses_question(room, question):
     question_type=get_content_type().objects.get_for_model(question)
     responses = get_response_model_class(question_type).objects.filter(room=room, question=question)
@@ -174,8 +271,6 @@ def get_responses_by_player_in_room(player: object, room: object) -> list[Any] |
             responses_decimal + responses_mcq + responses_num_range
         )
 
-        for response in all_responses:
-            isCorrectAnswer(response)
         return all_responses
     return None
 
@@ -220,55 +315,29 @@ def find_best_and_worst_scores(quiz_history):
     return best_score, worst_score
 
 def count_answers_for_question(room, question):
-    if isinstance(question, TrueFalseQuestion):
-        responses = TrueFalseResponse.objects.filter(room=room, question=question)
-    elif isinstance(question, IntegerInputQuestion):
-        responses = IntegerInputResponse.objects.filter(room=room, question=question)
-    elif isinstance(question, TextInputQuestion):
-        responses = TextInputResponse.objects.filter(room=room, question=question)
-    elif isinstance(question, DecimalInputQuestion):
-        responses = DecimalInputResponse.objects.filter(room=room, question=question)
-    elif isinstance(question, MultipleChoiceQuestion):
-        responses = MultipleChoiceResponse.objects.filter(room=room, question=question)
-    elif isinstance(question, NumericalRangeQuestion):
-        responses = NumericalRangeResponse.objects.filter(room=room, question=question)
-    else:
-        responses = []
-    unique_players = set(r.player_id for r in responses)
-    return len(unique_players)
+    """Participants who answered a question, users and guests alike, counted by the database."""
+    response_model = next((model for model in RESPONSE_MODELS
+                           if isinstance(question, model._meta.get_field('question').related_model)), None)
+    if response_model is None:
+        return 0
+    counts = response_model.objects.filter(room=room, question=question).aggregate(
+        players=Count('player', distinct=True),
+        guests=Count('guest_access', distinct=True),
+    )
+    return counts['players'] + counts['guests']
 
 def get_guest_responses(guest_access, room):
-    tf_responses = list(TrueFalseResponse.objects.filter(guest_access=guest_access, room=room))
-    int_responses = list(IntegerInputResponse.objects.filter(guest_access=guest_access, room=room))
-    text_responses = list(TextInputResponse.objects.filter(guest_access=guest_access, room=room))
-    decimal_responses = list(DecimalInputResponse.objects.filter(guest_access=guest_access, room=room))
-    mc_responses = list(MultipleChoiceResponse.objects.filter(guest_access=guest_access, room=room))
-    range_responses = list(NumericalRangeResponse.objects.filter(guest_access=guest_access, room=room))
+    tf_responses = list(TrueFalseResponse.objects.filter(guest_access=guest_access, room=room).select_related('question'))
+    int_responses = list(IntegerInputResponse.objects.filter(guest_access=guest_access, room=room).select_related('question'))
+    text_responses = list(TextInputResponse.objects.filter(guest_access=guest_access, room=room).select_related('question'))
+    decimal_responses = list(DecimalInputResponse.objects.filter(guest_access=guest_access, room=room).select_related('question'))
+    mc_responses = list(MultipleChoiceResponse.objects.filter(guest_access=guest_access, room=room).select_related('question'))
+    range_responses = list(NumericalRangeResponse.objects.filter(guest_access=guest_access, room=room).select_related('question'))
     all_responses = (tf_responses + int_responses + text_responses + decimal_responses + mc_responses + range_responses)
-    for response in all_responses:
-        isCorrectAnswer(response)
     return sorted(all_responses, key=lambda r: r.timestamp)
 
 def calculate_guest_score(guest_access, room):
     if not guest_access or not room:
         return 0
-    responses = get_guest_responses(guest_access, room)
-    base_score = 0
-    total_score = 0
-    streak_count = 0
-    question_position = {}
-    for response in responses:
-        question_id = response.question.id
-        if isCorrectAnswer(response):
-            base_points = response.question.mark  # base points from the question
-            base_score += base_points
-            total_score += base_points
-            streak_count += 1
-            streak_bonus = get_streak_bonus(streak_count, base_points)
-            total_score += streak_bonus
-            if question_id not in question_position:
-                question_position[question_id] = 0
-            question_position[question_id] += 1
-        else:
-            streak_count = 0
+    _, total_score = score_graded_marks(graded_marks(room, guest_access=guest_access))
     return total_score
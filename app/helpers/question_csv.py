@@ -0,0 +1,87 @@
+"""Bulk question import from a CSV file for the quiz editor.
+
+Each row is checked with the same form the editor uses for its question
+type, so a row is accepted exactly when it could have been typed in by hand.
+Valid rows are added after the quiz's existing questions in one transaction,
+with one bulk insert per question type."""
+import csv
+import io
+from collections import defaultdict
+from django.db import transaction
+from app.models import Quiz
+from app.models.quiz import Question
+from app.question_registry import QUESTION_FORMS
+
+CSV_COLUMNS = ('type', 'question_text', 'time', 'mark', 'correct_answer', 'options', 'min_value', 'max_value')
+REQUIRED_COLUMNS = ('type', 'question_text', 'mark')
+OPTION_SEPARATOR = '|'
+
+
+def form_data(question_type, row):
+    data = {name: (row.get(name) or '').strip() for name in CSV_COLUMNS if name != 'type'}
+    if not data['time']:
+        data['time'] = Question._meta.get_field('time').default
+    data['options'] = [option.strip() for option in data['options'].split(OPTION_SEPARATOR) if option.strip()]
+    if question_type == 'true_false':
+        data['correct_answer'] = data['correct_answer'].capitalize()
+    return data
+
+
+def form_errors(form):
+    return "; ".join(
+        message if field == '__all__' else f"{field}: {message}"
+        for field, messages in form.errors.items()
+        for message in messages
+    )
+
+
+def parse_question_csv(lines):
+    """Validate each row of a question CSV with its question type's form.
+
+    Returns the unsaved questions built from the valid rows, and a list of
+    (row number, message) for the rest. Rows are numbered as a spreadsheet
+    shows them, with the header as row 1.
+    """
+    reader = csv.DictReader(lines)
+    missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"The CSV header is missing {', '.join(missing)}")
+
+    questions, errors = [], []
+    for row_number, row in enumerate(reader, start=2):
+        question_type = (row.get('type') or '').strip().lower()
+        form_class = QUESTION_FORMS.get(question_type)
+        if form_class is None:
+            errors.append((row_number, f"Unknown question type '{question_type}'"))
+            continue
+        form = form_class(form_data(question_type, row))
+        if form.is_valid():
+            questions.append(form.save(commit=False))
+        else:
+            errors.append((row_number, form_errors(form)))
+    return questions, errors
+
+
+def import_question_csv(quiz, file):
+    """Add the valid rows of an uploaded CSV to the end of a quiz.
+
+    Returns how many questions were added and the errors of the rejected rows.
+    Raises ValueError if the file cannot be read as a question CSV.
+    """
+    try:
+        questions, errors = parse_question_csv(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+    except csv.Error as error:
+        raise ValueError(str(error)) from error
+
+    if questions:
+        last_position = max((q.position for q in quiz.get_all_questions() if q.position is not None), default=0)
+        by_model = defaultdict(list)
+        for position, question in enumerate(questions, start=last_position + 1):
+            question.quiz = quiz
+            question.position = position
+            by_model[type(question)].append(question)
+        with transaction.atomic():
+            for model, model_questions in by_model.items():
+                model.objects.bulk_create(model_questions)
+            Quiz.content_changed(quiz.id)
+    return len(questions), errors
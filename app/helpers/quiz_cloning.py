@@ -0,0 +1,45 @@
+from collections import defaultdict
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from app.models import Quiz, QuizItem
+
+
+def copy_question(question, quiz):
+    """An unsaved copy of a question belonging to another quiz, sharing its stored image."""
+    values = {
+        field.attname: getattr(question, field.attname)
+        for field in question._meta.concrete_fields
+        if not field.primary_key and field.name != 'quiz'
+    }
+    return type(question)(quiz=quiz, **values)
+
+
+def clone_quiz(quiz, tutor):
+    """Copy a quiz and all of its questions for another tutor.
+
+    The copy is made in one transaction with one bulk_create per question type
+    and one for the quiz index, so the number of queries does not grow with the
+    size of the quiz. Images are content-addressed and only deleted once no
+    question uses them, so copies can share the original's files.
+    """
+    questions = quiz.get_all_questions()
+    with transaction.atomic():
+        new_quiz = Quiz.objects.create(
+            name=f"Copy of {quiz.name}",
+            subject=quiz.subject,
+            difficulty=quiz.difficulty,
+            type=quiz.type,
+            tutor=tutor
+        )
+        copies = [copy_question(question, new_quiz) for question in questions]
+        copies_by_model = defaultdict(list)
+        for copy in copies:
+            copies_by_model[type(copy)].append(copy)
+        for model, model_copies in copies_by_model.items():
+            model.objects.bulk_create(model_copies)
+
+        QuizItem.objects.bulk_create([
+            QuizItem(quiz=new_quiz, position=position, content_type=ContentType.objects.get_for_model(copy), object_id=copy.pk)
+            for position, copy in enumerate(copies, start=1)
+        ])
+    return new_quiz
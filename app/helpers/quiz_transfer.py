@@ -0,0 +1,193 @@
+"""Quiz export and import as NDJSON, one JSON record per line.
+
+A "quiz" record starts a quiz and is followed by its "question" records in
+manifest order; a question's position is its place in the stream. When
+images are bundled, each distinct image is sent once as an "image" record
+before the first record that uses it. Both directions work a line at a
+time, so a whole question bank never has to be held in memory."""
+import base64
+import json
+import posixpath
+from collections import defaultdict
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from app import image_store
+from app.models import Quiz, QuizItem, IntegerInputQuestion
+from app.models.quiz import Question
+from app.question_registry import QUESTION_MODELS
+
+QUESTION_TYPES = {model: question_type for question_type, model in QUESTION_MODELS.items()}
+QUIZ_FIELDS = ('name', 'subject', 'difficulty', 'type', 'is_public')
+QUESTION_IMAGE_FOLDER = IntegerInputQuestion._meta.get_field('image').upload_to.rstrip('/')
+QUIZ_IMAGE_FOLDER = Quiz._meta.get_field('quiz_img').upload_to.rstrip('/')
+IMAGE_FOLDERS = {QUESTION_IMAGE_FOLDER, QUIZ_IMAGE_FOLDER}
+
+
+def question_fields(model):
+    return [
+        field for field in model._meta.concrete_fields
+        if not field.primary_key and field.name not in ('quiz', 'position', 'image')
+    ]
+
+
+def to_line(record):
+    return json.dumps(record, cls=DjangoJSONEncoder) + "\n"
+
+
+def export_quizzes(quizzes, include_images=False):
+    """Yield the NDJSON lines for quizzes and all of their questions."""
+    bundled = set()
+
+    def image_lines(name):
+        if include_images and name and name not in bundled and default_storage.exists(name):
+            bundled.add(name)
+            with default_storage.open(name) as file:
+                content = base64.b64encode(file.read()).decode('ascii')
+            yield to_line({"record": "image", "name": name, "content": content})
+
+    for quiz in quizzes:
+        yield from image_lines(quiz.quiz_img.name)
+        record = {"record": "quiz", **{name: getattr(quiz, name) for name in QUIZ_FIELDS}}
+        record["image"] = quiz.quiz_img.name or None
+        yield to_line(record)
+
+        for question in quiz.get_all_questions():
+            yield from image_lines(question.image.name)
+            record = {"record": "question", "question_type": QUESTION_TYPES[type(question)]}
+            record.update({field.name: getattr(question, field.attname) for field in question_fields(type(question))})
+            record["image"] = question.image.name or None
+            yield to_line(record)
+
+
+class QuizImporter:
+    """Builds quizzes from parsed records, inserting questions in bounded batches."""
+
+    def __init__(self, tutor, batch_size):
+        self.tutor = tutor
+        self.batch_size = batch_size
+        self.quizzes = []
+        self.quiz = None
+        self.position = 0
+        self.pending = []
+        # Exported image name -> stored name, for bundled images
+        self.images = {}
+        # Files this import added to storage, removed again if it rolls back
+        self.stored = []
+
+    def add(self, record):
+        kind = record.get("record")
+        if kind == "image":
+            self.add_image(record)
+        elif kind == "quiz":
+            self.add_quiz(record)
+        elif kind == "question":
+            self.add_question(record)
+        else:
+            raise ValueError(f"Unknown record {kind!r}")
+
+    def add_image(self, record):
+        name = record["name"]
+        folder = posixpath.dirname(name)
+        if folder not in IMAGE_FOLDERS:
+            folder = QUESTION_IMAGE_FOLDER
+        content = ContentFile(base64.b64decode(record["content"], validate=True), name=posixpath.basename(name))
+        existed = default_storage.exists(image_store.content_address(content, folder))
+        self.images[name] = image_store.store(content, folder)
+        if not existed:
+            self.stored.append(self.images[name])
+
+    def image(self, name, folder):
+        """The stored name for an image reference, or None if the image is not available here.
+
+        Quiz and question images are reference counted separately, so a record
+        may only use an image from its own type's folder.
+        """
+        if not name:
+            return None
+        stored = self.images.get(name, name)
+        if posixpath.dirname(stored) != folder:
+            raise ValueError(f"Image {name!r} is not in {folder}/")
+        # Unbundled images can only refer to files already on this site
+        if name in self.images or default_storage.exists(stored):
+            return stored
+        return None
+
+    def discard_images(self):
+        """Remove the bundled images this import stored that no row refers to."""
+        for name in self.stored:
+            if posixpath.dirname(name) == QUIZ_IMAGE_FOLDER:
+                image_store.release(name, Quiz.objects.filter(quiz_img=name).count())
+            else:
+                Question.release_image(name)
+        self.stored = []
+
+    def add_quiz(self, record):
+        quiz = Quiz(tutor=self.tutor, quiz_img=self.image(record.get("image"), QUIZ_IMAGE_FOLDER))
+        for name in QUIZ_FIELDS:
+            if name in record:
+                setattr(quiz, name, Quiz._meta.get_field(name).to_python(record[name]))
+        quiz.full_clean(exclude=['tutor', 'quiz_img'])
+        quiz.save()
+        self.quizzes.append(quiz)
+        self.quiz = quiz
+        self.position = 0
+
+    def add_question(self, record):
+        if self.quiz is None:
+            raise ValueError("Question record before any quiz record")
+        model = QUESTION_MODELS.get(record.get("question_type"))
+        if model is None:
+            raise ValueError(f"Unknown question type {record.get('question_type')!r}")
+        self.position += 1
+        question = model(quiz=self.quiz, position=self.position, image=self.image(record.get("image"), QUESTION_IMAGE_FOLDER))
+        for field in question_fields(model):
+            if field.name in record:
+                setattr(question, field.attname, field.to_python(record[field.name]))
+        question.full_clean(exclude=['quiz', 'image'], validate_unique=False)
+        self.pending.append(question)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Insert the pending questions with one bulk_create per type, and their index rows."""
+        by_model = defaultdict(list)
+        for question in self.pending:
+            by_model[type(question)].append(question)
+        for model, questions in by_model.items():
+            model.objects.bulk_create(questions)
+        QuizItem.objects.bulk_create([
+            QuizItem(quiz=question.quiz, position=question.position,
+                     content_type=ContentType.objects.get_for_model(question), object_id=question.pk)
+            for question in self.pending
+        ])
+        self.pending = []
+
+
+def import_quizzes(lines, tutor, batch_size=None):
+    """Create a tutor's quizzes from NDJSON lines (str or bytes) and return them.
+
+    The import is all or nothing: an invalid line raises ValueError naming it,
+    and bundled images stored before the failure are removed again.
+    """
+    importer = QuizImporter(tutor, batch_size or settings.QUIZ_IMPORT_BATCH_SIZE)
+    try:
+        with transaction.atomic():
+            for number, line in enumerate(lines, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    importer.add(json.loads(line))
+                except ValidationError as error:
+                    raise ValueError(f"Line {number}: {'; '.join(error.messages)}") from error
+                except (ValueError, KeyError, TypeError, AttributeError) as error:
+                    raise ValueError(f"Line {number}: {error}") from error
+            importer.flush()
+    except Exception:
+        importer.discard_images()
+        raise
+    return importer.quizzes
@@ -0,0 +1,33 @@
+"""Content-addressed image storage.
+
+An uploaded image is stored under the SHA-256 of its contents, so uploading
+the same picture twice, or copying a quiz, stores it once. Rows share a file
+by holding the same name; the owning model releases a name only once no row
+refers to it any more."""
+import hashlib
+import os
+import posixpath
+from django.core.files.storage import default_storage
+
+
+def content_address(file, folder):
+    """Storage name for a file derived from its contents."""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    extension = os.path.splitext(file.name)[1].lower()
+    return posixpath.join(folder, digest.hexdigest() + extension)
+
+
+def store(file, folder):
+    """Store a file under its content address and return the stored name."""
+    name = content_address(file, folder)
+    if not default_storage.exists(name):
+        name = default_storage.save(name, file)
+    return name
+
+
+def release(name, references):
+    """Delete a stored file once nothing references it."""
+    if name and references == 0 and default_storage.exists(name):
+        default_storage.delete(name)
@@ -0,0 +1,81 @@
+import asyncio
+from channels.layers import get_channel_layer
+from django.conf import settings
+from app.live.frames import frame_event
+
+
+class LeaderboardBroadcaster:
+    """Coalesces answer events into at most one leaderboard push per tick.
+
+    request() only schedules a flush if none is pending, so a burst of answers
+    inside one tick results in a single leaderboard_update to the tutor group
+    and a single rank_update to the student group, plus an answer_distribution
+    to the tutor group if the current question's distribution changed.
+    flush_now() sends immediately and cancels the pending tick.
+    """
+
+    def __init__(self, live_room, tick=None):
+        self.live_room = live_room
+        self.tick = settings.LIVE_QUIZ_BROADCAST_TICK if tick is None else tick
+        self.requests = 0
+        self.flushes = 0
+        self._pending = None
+
+    def has_pending(self):
+        if self._pending is None or self._pending.done():
+            return False
+        # A task left behind by a loop that is no longer running will never fire
+        return self._pending.get_loop() is asyncio.get_running_loop()
+
+    def request(self):
+        self.requests += 1
+        if not self.has_pending():
+            self._pending = asyncio.ensure_future(self._flush_later())
+
+    def cancel(self):
+        if self._pending is not None and not self._pending.done():
+            self._pending.cancel()
+        self._pending = None
+
+    async def flush_now(self):
+        self.cancel()
+        await self.flush()
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.tick)
+        # Clear first so answers arriving during the flush schedule the next tick
+        self._pending = None
+        await self.flush()
+
+    async def flush(self):
+        payload = await self.build_payload()
+        if payload is None:
+            return
+        channel_layer = get_channel_layer()
+        join_code = self.live_room.join_code
+        await channel_layer.group_send(f"live_quiz_{join_code}", frame_event(payload))
+        # Students build their own smaller view from the in-process leaderboard
+        await channel_layer.group_send(
+            f"student_{join_code}",
+            {"type": "rank_update", "answered_count": payload["answered_count"]}
+        )
+        question = self.live_room.current_question
+        if question is not None:
+            distribution = self.live_room.distributions.pop_changed((question.question_type, question.id))
+            if distribution is not None:
+                await channel_layer.group_send(f"live_quiz_{join_code}", frame_event(distribution))
+        self.flushes += 1
+
+    async def build_payload(self):
+        live_room = self.live_room
+        if live_room.leaderboard is None:
+            return None
+        answered_count = 0
+        question = live_room.current_question
+        if question is not None:
+            answered_count = live_room.counters.answered_count((question.question_type, question.id))
+        return {
+            "type": "leaderboard_update",
+            "leaderboard": live_room.leaderboard.leaderboard(),
+            "answered_count": answered_count
+        }
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import defaultdict, deque
+
+logger = logging.getLogger(__name__)
+
+
+def encode_frame(frame):
+    return json.dumps(frame, separators=(",", ":")).encode() + b"\n"
+
+
+class ChannelBroker:
+    """Single-host message broker for UnixSocketChannelLayer.
+
+    Every ASGI worker process keeps one connection to the broker over a Unix
+    domain socket and speaks newline-delimited JSON. A worker subscribes the
+    channels its consumers receive on; the broker remembers which connection
+    owns each channel, keeps group membership for all workers, and forwards
+    messages to the owning connection. A group_send is written once per
+    connection with the list of member channels it owns, not once per member.
+
+    Messages for a channel nobody has subscribed yet are held for `expiry`
+    seconds, up to `capacity` per channel. When a worker disconnects its
+    channels are removed from every group; a worker that reconnects subscribes
+    them and adds them to their groups again. A client stops being read until
+    the workers its last frame was forwarded to have taken it off the socket.
+    """
+
+    def __init__(self, path, capacity=100, expiry=60, group_expiry=86400):
+        self.path = str(path)
+        self.capacity = capacity
+        self.expiry = expiry
+        self.group_expiry = group_expiry
+        self.owners = {}
+        self.owned = defaultdict(set)
+        self.backlog = defaultdict(deque)
+        self.groups = defaultdict(dict)
+        self.server = None
+        self.delivered = 0
+        self.dropped = 0
+
+    async def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.server = await asyncio.start_unix_server(self.handle_client, path=self.path)
+        return self
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        for writer in list(self.owned):
+            writer.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                await self.drain(self.dispatch(json.loads(line), writer))
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self.drop_connection(writer)
+            writer.close()
+
+    async def drain(self, writers):
+        for writer in writers:
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+    def dispatch(self, frame, writer):
+        """Apply one client frame and return the connections written to."""
+        op = frame["op"]
+        if op == "subscribe":
+            return self.subscribe(frame["channel"], writer)
+        elif op == "unsubscribe":
+            self.unsubscribe(frame["channel"], writer)
+        elif op == "send":
+            return self.deliver([frame["channel"]], frame["message"])
+        elif op == "group_add":
+            self.groups[frame["group"]][frame["channel"]] = time.time()
+        elif op == "group_discard":
+            members = self.groups.get(frame["group"])
+            if members is not None:
+                members.pop(frame["channel"], None)
+                if not members:
+                    del self.groups[frame["group"]]
+        elif op == "group_send":
+            return self.deliver(self.group_members(frame["group"]), frame["message"])
+        elif op == "flush":
+            self.backlog.clear()
+            self.groups.clear()
+        else:
+            logger.warning("Unknown channel broker operation %r", op)
+        return ()
+
+    def subscribe(self, channel, writer):
+        self.owners[channel] = writer
+        self.owned[writer].add(channel)
+        pending = self.backlog.pop(channel, None)
+        if not pending:
+            return ()
+        now = time.time()
+        for expires_at, message in pending:
+            if expires_at > now:
+                self.deliver([channel], message)
+        return (writer,)
+
+    def unsubscribe(self, channel, writer):
+        if self.owners.get(channel) is writer:
+            del self.owners[channel]
+        self.owned[writer].discard(channel)
+
+    def group_members(self, group):
+        members = self.groups.get(group)
+        if not members:
+            return []
+        cutoff = time.time() - self.group_expiry
+        expired = [channel for channel, added_at in members.items() if added_at < cutoff]
+        for channel in expired:
+            del members[channel]
+        return list(members)
+
+    def deliver(self, channels, message):
+        by_writer = defaultdict(list)
+        for channel in channels:
+            writer = self.owners.get(channel)
+            if writer is None or writer.is_closing():
+                self.hold(channel, message)
+            else:
+                by_writer[writer].append(channel)
+        for writer, owned_channels in by_writer.items():
+            writer.write(encode_frame({"channels": owned_channels, "message": message}))
+            self.delivered += len(owned_channels)
+        return list(by_writer)
+
+    def hold(self, channel, message):
+        pending = self.backlog[channel]
+        if len(pending) >= self.capacity:
+            self.dropped += 1
+            logger.warning("Channel %s is full, dropping message", channel)
+            return
+        pending.append((time.time() + self.expiry, message))
+
+    def drop_connection(self, writer):
+        channels = self.owned.pop(writer, set())
+        for channel in channels:
+            if self.owners.get(channel) is writer:
+                del self.owners[channel]
+        for group in list(self.groups):
+            members = self.groups[group]
+            for channel in channels:
+                members.pop(channel, None)
+            if not members:
+                del self.groups[group]
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QuestionClock:
+    """Server-side timer for the question currently shown in a room.
+
+    start() arms the clock when a question is pushed. Answers are accepted only
+    for that question and only until its deadline (plus a small grace period for
+    network latency). The question is ended by whichever comes first, the
+    deadline or the tutor, and try_close() makes sure that happens once.
+
+    While no question has been started the clock is idle and does not get in
+    the way, so rooms that were running before a restart keep working.
+    """
+
+    def __init__(self, grace=None):
+        self.grace = settings.LIVE_QUIZ_ANSWER_GRACE if grace is None else grace
+        self.question_key = None
+        self.deadline = None
+        self.closed = False
+        self._task = None
+
+    @property
+    def is_idle(self):
+        return self.question_key is None
+
+    def start(self, question, on_expire):
+        """Arm the clock for a snapshot question and call on_expire when its time is up."""
+        self.cancel()
+        self.question_key = (question.question_type, question.id)
+        self.closed = False
+        self.deadline = None
+        if question.time and question.time > 0:
+            loop = asyncio.get_running_loop()
+            self.deadline = loop.time() + question.time + self.grace
+            self._task = asyncio.ensure_future(self._expire_later(self.question_key, on_expire))
+
+    def remaining(self):
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - asyncio.get_running_loop().time())
+
+    def accepts(self, question_type, question_id):
+        """Whether an answer to this question may still be recorded. Costs no queries."""
+        if self.is_idle:
+            return True
+        if self.closed:
+            return False
+        try:
+            question_id = int(question_id)
+        except (TypeError, ValueError):
+            return False
+        if (question_type, question_id) != self.question_key:
+            return False
+        return self.remaining() != 0.0
+
+    def try_close(self, question_key=None):
+        """Close the current question. Returns True only for the first caller."""
+        if self.is_idle:
+            return True
+        if self.closed or (question_key is not None and question_key != self.question_key):
+            return False
+        self.closed = True
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+        self._task = None
+        return True
+
+    def cancel(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    def reset(self):
+        self.cancel()
+        self.question_key = None
+        self.deadline = None
+        self.closed = False
+
+    async def _expire_later(self, question_key, on_expire):
+        await asyncio.sleep(self.remaining())
+        if not self.try_close(question_key):
+            return
+        try:
+            await on_expire()
+        except Exception:
+            logger.exception("Ending question %s on timer expiry failed", question_key)
@@ -0,0 +1,96 @@
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from app.helpers.helper_functions import RESPONSE_MODELS
+from app.live.leaderboard import participant_key
+from app.live.snapshot import QUESTION_TYPE_TAGS
+
+logger = logging.getLogger(__name__)
+
+
+def counter_key(question):
+    """(type tag, id) for a question row, the same key the snapshot and clock use."""
+    return QUESTION_TYPE_TAGS.get(type(question)), question.id
+
+
+@dataclass
+class QuestionCounter:
+    answered: set = field(default_factory=set)
+    correct_count: int = 0
+    first_answer_at: datetime | None = None
+    last_answer_at: datetime | None = None
+
+    @property
+    def answered_count(self):
+        return len(self.answered)
+
+    def record(self, participant, correct, at):
+        if participant in self.answered:
+            return False
+        self.answered.add(participant)
+        if correct:
+            self.correct_count += 1
+        if at is not None:
+            if self.first_answer_at is None or at < self.first_answer_at:
+                self.first_answer_at = at
+            if self.last_answer_at is None or at > self.last_answer_at:
+                self.last_answer_at = at
+        return True
+
+    def totals(self):
+        return self.answered_count, self.correct_count
+
+
+class QuestionCounters:
+    """Per-question answer counts for a live room, kept up to date as answers are ingested.
+
+    Each participant counts once per question, whether they are a user or a
+    guest, so answered_count and the end-of-question stats need no queries.
+    The database stays the source of truth: load() and reconcile() rebuild the
+    counts from stored responses.
+    """
+
+    def __init__(self):
+        self._counters = {}
+
+    def __len__(self):
+        return len(self._counters)
+
+    def get(self, key):
+        return self._counters.get(key) or QuestionCounter()
+
+    def record(self, response, at=None):
+        """Count a graded response. Returns False if its participant already answered the question."""
+        counter = self._counters.setdefault(counter_key(response.question), QuestionCounter())
+        participant = participant_key(response.player_id, response.guest_access_id)
+        return counter.record(participant, response.correct, at or response.timestamp)
+
+    def answered_count(self, key):
+        return self.get(key).answered_count
+
+    @classmethod
+    def load(cls, room):
+        counters = cls()
+        for response_model in RESPONSE_MODELS:
+            tag = QUESTION_TYPE_TAGS.get(response_model._meta.get_field('question').related_model)
+            rows = (
+                response_model.objects.filter(room=room)
+                .order_by('timestamp')
+                .values_list('question_id', 'player_id', 'guest_access_id', 'correct', 'timestamp')
+            )
+            for question_id, player_id, guest_access_id, correct, timestamp in rows:
+                counter = counters._counters.setdefault((tag, question_id), QuestionCounter())
+                counter.record(participant_key(player_id, guest_access_id), correct, timestamp)
+        return counters
+
+    def reconcile(self, room):
+        """Replace the counts with the database's and return the keys that had drifted."""
+        stored = self.load(room)
+        drifted = [
+            key for key in set(self._counters) | set(stored._counters)
+            if self.get(key).totals() != stored.get(key).totals()
+        ]
+        if drifted:
+            logger.warning("Live answer counters for room %s drifted from the database: %s", room.join_code, sorted(drifted))
+        self._counters = stored._counters
+        return drifted
@@ -0,0 +1,184 @@
+import math
+from django.conf import settings
+from app.grading import normalise_text
+from app.live.counters import counter_key
+
+
+class ChoiceDistribution:
+    """Counts per option for multiple choice and true/false questions."""
+
+    kind = "choice"
+
+    def __init__(self, options):
+        self.counts = {option: 0 for option in options}
+        self.total = 0
+
+    def add(self, answer):
+        label = str(answer).strip()
+        if label not in self.counts:
+            return False
+        self.counts[label] += 1
+        self.total += 1
+        return True
+
+    def buckets(self):
+        return [{"label": label, "count": count} for label, count in self.counts.items()]
+
+
+class HistogramDistribution:
+    """Fixed-width buckets over a range chosen from the question, plus under/overflow.
+
+    The range is known before the first answer, so every answer is one
+    division and one increment however many arrive.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, low, high, bucket_count, integer=False):
+        if integer:
+            low, high = math.floor(low), math.ceil(high)
+        if high <= low:
+            high = low + bucket_count
+        width = (high - low) / bucket_count
+        if integer:
+            width = max(1, math.ceil(width))
+        self.low = low
+        self.width = width
+        self.integer = integer
+        self.counts = [0] * bucket_count
+        self.below = 0
+        self.above = 0
+        self.total = 0
+
+    def add(self, answer):
+        try:
+            value = float(answer)
+        except (TypeError, ValueError):
+            return False
+        if not math.isfinite(value):
+            return False
+        index = math.floor((value - self.low) / self.width)
+        if index < 0:
+            self.below += 1
+        elif index >= len(self.counts):
+            self.above += 1
+        else:
+            self.counts[index] += 1
+        self.total += 1
+        return True
+
+    def label(self, index):
+        start = self.low + index * self.width
+        end = start + self.width
+        if self.integer:
+            return str(int(start)) if self.width == 1 else f"{int(start)}-{int(end) - 1}"
+        return f"{start:g}-{end:g}"
+
+    def buckets(self):
+        end = self.low + len(self.counts) * self.width
+        return (
+            [{"label": f"< {self.low:g}", "count": self.below}]
+            + [{"label": self.label(index), "count": count} for index, count in enumerate(self.counts)]
+            + [{"label": f">= {end:g}", "count": self.above}]
+        )
+
+
+class TextDistribution:
+    """Most frequent distinct text answers in bounded memory.
+
+    Uses the Space-Saving algorithm: at most `capacity` answers are tracked,
+    and a new answer replaces the least counted one, inheriting its count.
+    Answers that really are frequent always stay tracked, and memory does not
+    grow with the number of distinct answers submitted.
+    """
+
+    kind = "text"
+
+    def __init__(self, capacity, top_k):
+        self.capacity = capacity
+        self.top_k = top_k
+        self.counts = {}
+        self.labels = {}
+        self.total = 0
+
+    def add(self, answer):
+        key = normalise_text(answer)
+        if not key:
+            return False
+        self.total += 1
+        if key in self.counts:
+            self.counts[key] += 1
+            return True
+        if len(self.counts) < self.capacity:
+            self.counts[key] = 1
+        else:
+            evicted = min(self.counts, key=self.counts.get)
+            self.counts[key] = self.counts.pop(evicted) + 1
+            del self.labels[evicted]
+        self.labels[key] = str(answer).strip()
+        return True
+
+    def buckets(self):
+        ranked = sorted(self.counts.items(), key=lambda item: -item[1])[:self.top_k]
+        return [{"label": self.labels[key], "count": count} for key, count in ranked]
+
+
+def build_distribution(question):
+    kind = question._meta.model_name
+    bucket_count = settings.LIVE_QUIZ_HISTOGRAM_BUCKETS
+    if kind == "multiplechoicequestion":
+        return ChoiceDistribution([str(option).strip() for option in question.options])
+    if kind == "truefalsequestion":
+        return ChoiceDistribution(["True", "False"])
+    if kind == "textinputquestion":
+        return TextDistribution(settings.LIVE_QUIZ_TEXT_ANSWER_SLOTS, settings.LIVE_QUIZ_TEXT_ANSWER_TOP_K)
+    if kind == "numericalrangequestion":
+        # The accepted range sits in the middle third of the histogram
+        span = question.max_value - question.min_value or 1
+        return HistogramDistribution(question.min_value - span, question.max_value + span, bucket_count)
+    # Integer and decimal answers are spread around the correct answer
+    centre = float(question.correct_answer)
+    spread = max(abs(centre) / 2, bucket_count / 2)
+    return HistogramDistribution(centre - spread, centre + spread, bucket_count, integer=kind == "integerinputquestion")
+
+
+class AnswerDistributions:
+    """Answer distributions for the questions of a live room, built as answers are ingested.
+
+    The room's broadcaster sends the current question's distribution to the
+    tutor with each coalesced leaderboard push, only when it has changed, so
+    revealing a question needs no scan of the stored responses.
+    """
+
+    def __init__(self):
+        self._distributions = {}
+        self._changed = set()
+
+    def record(self, response):
+        key = counter_key(response.question)
+        distribution = self._distributions.get(key)
+        if distribution is None:
+            distribution = self._distributions[key] = build_distribution(response.question)
+        if distribution.add(response.answer):
+            self._changed.add(key)
+
+    def get(self, key):
+        return self._distributions.get(key)
+
+    def message(self, key):
+        distribution = self._distributions.get(key)
+        return {
+            "type": "answer_distribution",
+            "question_type": key[0],
+            "question_id": key[1],
+            "kind": distribution.kind if distribution else None,
+            "total": distribution.total if distribution else 0,
+            "buckets": distribution.buckets() if distribution else [],
+        }
+
+    def pop_changed(self, key):
+        """The distribution message for a question if it changed since the last call, else None."""
+        if key not in self._changed:
+            return None
+        self._changed.discard(key)
+        return self.message(key)
@@ -0,0 +1,46 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def encode(message):
+    """Serialize a websocket message, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(message).decode()
+    return json.dumps(message)
+
+
+def frame_event(message):
+    """Channel layer event carrying a message that has already been serialized.
+
+    Group members handle it in broadcast_frame by sending the text as it is,
+    so a message fanned out to N sockets is encoded once instead of N times.
+    """
+    return {"type": "broadcast_frame", "text": encode(message)}
+
+
+def question_update_message(question_data):
+    """The question message shown on the student live quiz page."""
+    return {
+        "type": "question_update",
+        "question": question_data.get("question"),
+        "question_id": question_data.get("question_id"),
+        "options": question_data.get("options"),
+        "question_number": question_data.get("question_number"),
+        "total_questions": question_data.get("total_questions"),
+        "time": question_data.get("time"),
+        "question_type": question_data.get("question_type", "multiple_choice"),
+        "items": question_data.get("items", []),
+        "image": question_data.get("image", "")
+    }
+
+
+def quiz_update_message(question_data):
+    """The question message shown on the tutor live quiz page."""
+    return {
+        "type": "quiz_update",
+        "message": question_data
+    }
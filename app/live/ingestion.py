@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import time
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseIngestor:
+    """Write-behind buffer for the responses submitted in a live room.
+
+    Responses are validated and graded before they are submitted, so the
+    consumer can acknowledge them straight away. They are kept in one buffer
+    per response model and written with bulk_create once batch_size responses
+    are waiting or flush_interval seconds have passed, whichever comes first.
+    If a batch cannot be written its rows are retried one at a time, so one bad
+    row does not lose the answers it was buffered with.
+    """
+
+    def __init__(self, live_room, batch_size=None, flush_interval=None):
+        self.live_room = live_room
+        self.batch_size = settings.LIVE_QUIZ_INGEST_BATCH_SIZE if batch_size is None else batch_size
+        self.flush_interval = settings.LIVE_QUIZ_INGEST_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.ingested = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.started_at = None
+        self._buffers = {}
+        self._timer = None
+
+    @property
+    def queue_depth(self):
+        return sum(len(rows) for rows in self._buffers.values())
+
+    def submit(self, response):
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+        self._buffers.setdefault(type(response), []).append(response)
+        self.ingested += 1
+        if self.queue_depth >= self.batch_size:
+            self._cancel_timer()
+            asyncio.ensure_future(self._flush_in_background())
+        elif not self._has_timer():
+            self._timer = asyncio.ensure_future(self._flush_later())
+
+    def stats(self):
+        elapsed = time.monotonic() - self.started_at if self.started_at is not None else 0
+        return {
+            "ingested": self.ingested,
+            "flushed": self.flushed,
+            "flushes": self.flushes,
+            "queue_depth": self.queue_depth,
+            "throughput": self.ingested / elapsed if elapsed else 0.0,
+        }
+
+    async def flush(self):
+        self._cancel_timer()
+        buffers, self._buffers = self._buffers, {}
+        if not buffers:
+            return 0
+        written = await database_sync_to_async(self.write)(buffers)
+        self.flushed += written
+        self.flushes += 1
+        logger.debug("Wrote %d responses for room %s: %s", written, self.live_room.join_code, self.stats())
+        return written
+
+    def write(self, buffers):
+        try:
+            with transaction.atomic():
+                for model, rows in buffers.items():
+                    model.objects.bulk_create(rows)
+            return sum(len(rows) for rows in buffers.values())
+        except Exception:
+            logger.exception("Failed to write a batch of responses for room %s, retrying one at a time", self.live_room.join_code)
+        written = 0
+        for model, rows in buffers.items():
+            for row in rows:
+                # The rolled back batch may have assigned primary keys
+                row.pk = None
+                try:
+                    with transaction.atomic():
+                        model.objects.bulk_create([row])
+                    written += 1
+                except Exception:
+                    logger.exception("Dropped a response that could not be written for room %s", self.live_room.join_code)
+        return written
+
+    def close(self):
+        self._cancel_timer()
+
+    def _has_timer(self):
+        if self._timer is None or self._timer.done():
+            return False
+        return self._timer.get_loop() is asyncio.get_running_loop()
+
+    def _cancel_timer(self):
+        if self._timer is not None and not self._timer.done() and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        self._timer = None
+        await self._flush_in_background()
+
+    async def _flush_in_background(self):
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Failed to write buffered responses for room %s", self.live_room.join_code)
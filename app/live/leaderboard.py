@@ -0,0 +1,156 @@
+from app.helpers.helper_functions import get_streak_bonus, room_graded_marks
+from app.live.skiplist import IndexableSkipList
+from app.models import RoomParticipant
+
+
+def participant_key(user_id=None, guest_access_id=None):
+    """Key used to identify a participant in the live room state."""
+    if user_id is not None:
+        return f"user:{user_id}"
+    return f"guest:{guest_access_id}"
+
+
+def participant_label(participant):
+    """Name shown for a RoomParticipant on the leaderboard."""
+    if participant.guest_access:
+        return f"Guest ({participant.guest_access.session_id[:8]})"
+    return participant.user.email_address
+
+
+class ParticipantScore:
+    __slots__ = ("key", "participant_id", "label", "joined_at", "seq", "base_score", "streak", "total_score")
+
+    def __init__(self, key, participant_id, label, joined_at, seq=0):
+        self.key = key
+        self.participant_id = participant_id
+        self.label = label
+        self.joined_at = joined_at
+        self.seq = seq
+        self.base_score = 0
+        self.streak = 0
+        self.total_score = 0
+
+    @property
+    def rank_key(self):
+        # Highest score first, then earliest to join; seq keeps keys unique
+        return (-self.total_score, self.joined_at, self.seq)
+
+
+class LeaderboardEngine:
+    """Running scores for every participant of a live room.
+
+    Each graded answer updates one participant using the same rules as
+    calculate_user_score, so the leaderboard can be served without touching the
+    database. Scores are only written back when save_scores is called.
+
+    Participants are also kept in an indexable skip list ordered by
+    (-score, joined_at), so score updates, rank-of and top-K are O(log n)
+    instead of a sort per query.
+    """
+
+    def __init__(self):
+        self._scores = {}
+        self._dirty = set()
+        self._ranking = IndexableSkipList()
+
+    def __contains__(self, key):
+        return key in self._scores
+
+    def __len__(self):
+        return len(self._scores)
+
+    def add_participant(self, key, participant_id, label, joined_at):
+        if key not in self._scores:
+            entry = ParticipantScore(key, participant_id, label, joined_at, seq=len(self._scores))
+            self._scores[key] = entry
+            self._ranking.insert(entry.rank_key, entry)
+        return self._scores[key]
+
+    def get(self, key):
+        return self._scores.get(key)
+
+    def record_answer(self, key, correct, mark):
+        entry = self._scores.get(key)
+        if entry is None:
+            return None
+        if correct:
+            self._ranking.remove(entry.rank_key)
+            entry.base_score += mark
+            entry.streak += 1
+            entry.total_score += mark + get_streak_bonus(entry.streak, mark)
+            self._ranking.insert(entry.rank_key, entry)
+        else:
+            entry.streak = 0
+        self._dirty.add(key)
+        return entry
+
+    def ranked(self):
+        return [entry for _, entry in self._ranking]
+
+    def rank_of(self, key):
+        entry = self._scores.get(key)
+        if entry is None:
+            return None
+        return self._ranking.rank(entry.rank_key) + 1
+
+    def top(self, count):
+        return [entry for _, entry in self._ranking.first(count)]
+
+    def leaderboard(self):
+        return [self._row(rank, entry) for rank, entry in enumerate(self.ranked(), start=1)]
+
+    def student_view(self, key, top_k, radius=1):
+        """Top `top_k` rows plus the participant's own row and the rows next to it."""
+        total = len(self._ranking)
+        view = {
+            "leaderboard": [self._row(rank, entry) for rank, entry in enumerate(self.top(top_k), start=1)],
+            "total_participants": total,
+        }
+        entry = self._scores.get(key)
+        if entry is not None:
+            position = self._ranking.rank(entry.rank_key)
+            view["me"] = self._row(position + 1, entry)
+            view["neighbors"] = [
+                self._row(other + 1, self._ranking.item_at(other)[1])
+                for other in range(max(0, position - radius), min(total, position + radius + 1))
+                if other != position
+            ]
+        return view
+
+    @staticmethod
+    def _row(rank, entry):
+        return {
+            "rank": rank,
+            "participant": entry.label,
+            "score": entry.total_score
+        }
+
+    def pop_dirty(self):
+        """Return {participant_id: total_score} for every participant changed since the last call."""
+        changes = {self._scores[key].participant_id: self._scores[key].total_score for key in self._dirty}
+        self._dirty.clear()
+        return changes
+
+    @staticmethod
+    def save_scores(changes):
+        if not changes:
+            return 0
+        participants = [RoomParticipant(pk=pk, score=score) for pk, score in changes.items()]
+        RoomParticipant.objects.bulk_update(participants, ['score'])
+        return len(participants)
+
+    @classmethod
+    def load(cls, room):
+        """Build the engine for a room from the participants and responses already in the database."""
+        engine = cls()
+        participants = (
+            RoomParticipant.objects.filter(room=room)
+            .exclude(user__role__iexact="tutor")
+            .select_related('user', 'guest_access')
+        )
+        for participant in participants:
+            key = participant_key(participant.user_id, participant.guest_access_id)
+            engine.add_participant(key, participant.id, participant_label(participant), participant.joined_at)
+        for user_id, guest_access_id, _, correct, mark in room_graded_marks(room):
+            engine.record_answer(participant_key(user_id, guest_access_id), correct, mark)
+        return engine
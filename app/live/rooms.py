@@ -0,0 +1,229 @@
+import asyncio
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from app.live.broadcast import LeaderboardBroadcaster
+from app.live.clock import QuestionClock
+from app.live.counters import QuestionCounters
+from app.live.distributions import AnswerDistributions
+from app.live.frames import frame_event
+from app.live.ingestion import ResponseIngestor
+from app.live.leaderboard import LeaderboardEngine
+from app.live.roster import Roster
+from app.live.snapshot import QuestionSnapshot, QUESTION_TYPE_TAGS
+
+_rooms = {}
+
+
+class RoomClosed(Exception):
+    """A transition was asked of a live room that has already been closed."""
+
+
+class LiveRoom:
+    """In-process state for a room while its quiz is being played.
+
+    State transitions (start, end question, next question, end quiz) are run by
+    a per-room actor: consumers pass them to ask(), and the actor runs them one
+    at a time in the order they arrived, so two tutor tabs or a double click
+    cannot interleave two transitions. Once the room is closed, transitions
+    still waiting and any asked later fail with RoomClosed.
+    """
+
+    def __init__(self, join_code):
+        self.join_code = join_code
+        self.room = None
+        self.current_question = None
+        self.leaderboard = None
+        self.snapshot = None
+        self.questions = {}
+        self.broadcaster = LeaderboardBroadcaster(self)
+        self.ingestor = ResponseIngestor(self)
+        self.clock = QuestionClock()
+        self.roster = Roster()
+        self.counters = QuestionCounters()
+        self.distributions = AnswerDistributions()
+        self.closed = False
+        self._inbox = None
+        self._actor = None
+        self._running = None
+
+    async def get_room(self, refresh=False):
+        """The room row, loaded once and then kept up to date by the actor's transitions."""
+        if self.room is None or refresh:
+            from app.models import Room
+            self.room = await database_sync_to_async(Room.objects.get)(join_code=self.join_code)
+        return self.room
+
+    async def ask(self, command, *args):
+        """Run a transition on the room's actor and wait for its result."""
+        if self.closed:
+            raise RoomClosed(self.join_code)
+        self._ensure_actor()
+        future = asyncio.get_running_loop().create_future()
+        await self._inbox.put((command, args, future))
+        return await future
+
+    def _ensure_actor(self):
+        actor = self._actor
+        if actor is None or actor.done() or actor.get_loop() is not asyncio.get_running_loop():
+            self._inbox = asyncio.Queue()
+            self._actor = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        inbox = self._inbox
+        while not self.closed:
+            command, args, future = await inbox.get()
+            # Each transition gets its own task, so an error reaches the caller
+            # without the actor's frame in its traceback
+            self._running = asyncio.ensure_future(command(*args))
+            await asyncio.wait([self._running])
+            _resolve(future, self._running)
+            self._running = None
+
+    async def get_leaderboard(self, room):
+        if self.room is None:
+            self.room = room
+        if self.leaderboard is None:
+            engine = await database_sync_to_async(LeaderboardEngine.load)(room)
+            counters = await database_sync_to_async(QuestionCounters.load)(room)
+            if self.leaderboard is None:
+                self.leaderboard = engine
+                self.counters = counters
+        return self.leaderboard
+
+    async def reset_leaderboard(self, room):
+        self.room = room
+        await self.flush_responses()
+        self.leaderboard = await database_sync_to_async(LeaderboardEngine.load)(room)
+        self.counters = await database_sync_to_async(QuestionCounters.load)(room)
+        self.distributions = AnswerDistributions()
+        return self.leaderboard
+
+    async def reconcile_counters(self, room):
+        """Check the live answer counters against the stored responses once they are all written."""
+        await self.flush_responses()
+        return await database_sync_to_async(self.counters.reconcile)(room)
+
+    async def checkpoint(self):
+        """Write the scores changed since the last checkpoint to the database."""
+        if self.leaderboard is None:
+            return 0
+        changes = self.leaderboard.pop_dirty()
+        return await database_sync_to_async(LeaderboardEngine.save_scores)(changes)
+
+    async def get_snapshot(self, room):
+        if self.snapshot is None:
+            snapshot = await database_sync_to_async(QuestionSnapshot.build)(room)
+            if self.snapshot is None:
+                self.snapshot = snapshot
+        return self.snapshot
+
+    async def reset_snapshot(self, room):
+        self.snapshot = await database_sync_to_async(QuestionSnapshot.build)(room)
+        self.questions = {}
+        return self.snapshot
+
+    async def get_question(self, question_model, question_id):
+        """Question rows come from the snapshot, or are loaded once per room if there is none."""
+        if self.snapshot is not None:
+            question = self.snapshot.find(QUESTION_TYPE_TAGS.get(question_model), question_id)
+            if question is not None:
+                return question.instance
+        key = (question_model, question_id)
+        if key not in self.questions:
+            self.questions[key] = await database_sync_to_async(question_model.objects.get)(id=question_id)
+        return self.questions[key]
+
+    def ingest(self, response, at):
+        """Count a graded response in the live counters and distributions, then queue it for writing."""
+        self.distributions.record(response)
+        self.counters.record(response, at)
+        self.ingestor.submit(response)
+
+    async def flush_responses(self):
+        return await self.ingestor.flush()
+
+    async def join_roster(self, member):
+        if member is not None:
+            await self.publish_roster(self.roster.join(*member))
+
+    async def leave_roster(self, member):
+        if member is not None:
+            await self.publish_roster(self.roster.leave(member[0]))
+
+    @property
+    def is_idle(self):
+        """Nobody is on the roster, no quiz is being played and nothing is waiting to be written."""
+        return (
+            not len(self.roster)
+            and self.leaderboard is None
+            and self.clock.is_idle
+            and self._running is None
+            and not self.ingestor.queue_depth
+        )
+
+    async def publish_roster(self, event):
+        """Send a roster change to the lobby and the tutor's live quiz page."""
+        if event is None:
+            return
+        channel_layer = get_channel_layer()
+        frame = frame_event(event)
+        await channel_layer.group_send(f"lobby_{self.join_code}", frame)
+        await channel_layer.group_send(f"live_quiz_{self.join_code}", frame)
+
+    def request_leaderboard_update(self):
+        self.broadcaster.request()
+
+    async def flush_leaderboard_update(self):
+        await self.broadcaster.flush_now()
+
+    def close(self):
+        self.closed = True
+        # When a transition closes its own room the actor stops after it instead
+        if self._actor is not None and not self._actor.done() and self._running is None:
+            self._actor.cancel()
+        self._actor = None
+        while self._inbox is not None and not self._inbox.empty():
+            _, _, future = self._inbox.get_nowait()
+            if not future.done():
+                future.set_exception(RoomClosed(self.join_code))
+        self.clock.cancel()
+        self.broadcaster.cancel()
+        self.ingestor.close()
+
+
+def _resolve(future, task):
+    if future.done():
+        return
+    if task.cancelled():
+        future.cancel()
+    elif task.exception() is not None:
+        future.set_exception(task.exception())
+    else:
+        future.set_result(task.result())
+
+
+def get_live_room(join_code):
+    if join_code not in _rooms:
+        _rooms[join_code] = LiveRoom(join_code)
+    return _rooms[join_code]
+
+
+async def leave_live_room(join_code, member):
+    """Take a disconnecting socket off the roster, dropping the room once it is idle.
+
+    Unlike get_live_room this never creates a room, so disconnects cannot
+    leave empty rooms behind.
+    """
+    live_room = _rooms.get(join_code)
+    if live_room is None:
+        return
+    await live_room.leave_roster(member)
+    if live_room.is_idle and _rooms.get(join_code) is live_room:
+        discard_live_room(join_code)
+
+
+def discard_live_room(join_code):
+    live_room = _rooms.pop(join_code, None)
+    if live_room is not None:
+        live_room.close()
+    return live_room
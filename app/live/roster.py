@@ -0,0 +1,84 @@
+from django.conf import settings
+
+
+def roster_member(user, session):
+    """Roster key and label for a socket's user, or None for tutors and unknown guests.
+
+    Both come from the connection scope, so joining the roster needs no queries.
+    """
+    if user is not None and user.is_authenticated:
+        if getattr(user, "role", "").lower() == "tutor":
+            return None
+        return f"user:{user.id}", user.email_address
+    session_key = getattr(session, "session_key", None)
+    if not session_key:
+        return None
+    return f"session:{session_key}", f"Guest ({session_key[:8]})"
+
+
+class Roster:
+    """Participants currently connected to a room's lobby or live quiz pages.
+
+    join() and leave() are O(1) and return the event to broadcast: a small
+    participants_delta, or a full participants_snapshot every `snapshot_every`
+    changes so clients that missed a delta catch up. Each event carries a
+    version; a client that sees a gap asks for a snapshot with "update".
+    A participant with several sockets open is counted once. The roster is
+    held in the worker process's LiveRoom, so its count only covers sockets
+    connected to that process, not every worker behind the same room.
+    """
+
+    def __init__(self, snapshot_every=None):
+        self.snapshot_every = settings.LIVE_ROSTER_SNAPSHOT_EVERY if snapshot_every is None else snapshot_every
+        self.version = 0
+        self._members = {}
+        self._changes_since_snapshot = 0
+
+    def __len__(self):
+        return len(self._members)
+
+    def __contains__(self, key):
+        return key in self._members
+
+    def join(self, key, label):
+        member = self._members.get(key)
+        if member is not None:
+            member[1] += 1
+            return None
+        self._members[key] = [label, 1]
+        return self._changed("join", label)
+
+    def leave(self, key):
+        member = self._members.get(key)
+        if member is None:
+            return None
+        member[1] -= 1
+        if member[1] > 0:
+            return None
+        del self._members[key]
+        return self._changed("leave", member[0])
+
+    def labels(self):
+        return [label for label, _ in self._members.values()]
+
+    def snapshot(self):
+        return {
+            "type": "participants_snapshot",
+            "participants": self.labels(),
+            "participant_number": len(self._members),
+            "version": self.version,
+        }
+
+    def _changed(self, op, label):
+        self.version += 1
+        self._changes_since_snapshot += 1
+        if self._changes_since_snapshot >= self.snapshot_every:
+            self._changes_since_snapshot = 0
+            return self.snapshot()
+        return {
+            "type": "participants_delta",
+            "op": op,
+            "participant": label,
+            "participant_number": len(self._members),
+            "version": self.version,
+        }
@@ -0,0 +1,117 @@
+import math
+import random
+
+
+class _Node:
+    __slots__ = ("key", "value", "next", "width")
+
+    def __init__(self, key, value, levels):
+        self.key = key
+        self.value = value
+        self.next = [None] * levels
+        # width[level] is how many positions next[level] is ahead of this node
+        self.width = [1] * levels
+
+
+class IndexableSkipList:
+    """Sorted container with O(log n) insert, remove, rank-of and item-at-index.
+
+    Keys must be unique and comparable; values ride along with their key.
+    Each link records how many elements it skips, which is what makes
+    positional lookups logarithmic as well as searches.
+    """
+
+    MAX_LEVELS = 24
+
+    def __init__(self, seed=None):
+        self._random = random.Random(seed)
+        self._tail = _Node(None, None, 0)
+        self._head = _Node(None, None, self.MAX_LEVELS)
+        self._head.next = [self._tail] * self.MAX_LEVELS
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        node = self._head.next[0]
+        while node is not self._tail:
+            yield node.key, node.value
+            node = node.next[0]
+
+    def _path(self, key):
+        """Last node before `key` on every level, and the position of each (head is 0)."""
+        chain = [None] * self.MAX_LEVELS
+        positions = [0] * self.MAX_LEVELS
+        node = self._head
+        position = 0
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.next[level] is not self._tail and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+            positions[level] = position
+        return chain, positions
+
+    def _random_levels(self):
+        return min(self.MAX_LEVELS, 1 - int(math.log(1.0 - self._random.random(), 2)))
+
+    def insert(self, key, value=None):
+        chain, positions = self._path(key)
+        levels = self._random_levels()
+        node = _Node(key, value, levels)
+        position = positions[0] + 1
+        for level in range(levels):
+            previous = chain[level]
+            node.next[level] = previous.next[level]
+            previous.next[level] = node
+            node.width[level] = previous.width[level] - (position - positions[level]) + 1
+            previous.width[level] = position - positions[level]
+        for level in range(levels, self.MAX_LEVELS):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, key):
+        chain, _ = self._path(key)
+        node = chain[0].next[0]
+        if node is self._tail or node.key != key:
+            raise KeyError(key)
+        for level in range(len(node.next)):
+            previous = chain[level]
+            previous.width[level] += node.width[level] - 1
+            previous.next[level] = node.next[level]
+        for level in range(len(node.next), self.MAX_LEVELS):
+            chain[level].width[level] -= 1
+        self._size -= 1
+        return node.value
+
+    def rank(self, key):
+        """0-based position of `key`."""
+        chain, positions = self._path(key)
+        node = chain[0].next[0]
+        if node is self._tail or node.key != key:
+            raise KeyError(key)
+        return positions[0]
+
+    def item_at(self, index):
+        """(key, value) at a 0-based position."""
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        remaining = index + 1
+        node = self._head
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+            if remaining == 0:
+                break
+        return node.key, node.value
+
+    def first(self, count):
+        """The first `count` (key, value) pairs."""
+        items = []
+        node = self._head.next[0]
+        while node is not self._tail and len(items) < count:
+            items.append((node.key, node.value))
+            node = node.next[0]
+        return items
@@ -0,0 +1,127 @@
+from dataclasses import dataclass, field
+from app.live.frames import encode, question_update_message, quiz_update_message
+from app.models import (
+    IntegerInputQuestion, TrueFalseQuestion, TextInputQuestion,
+    DecimalInputQuestion, MultipleChoiceQuestion, NumericalRangeQuestion
+)
+
+DEFAULT_IMAGE = "/static/images/default_thumbnail.png"
+
+# Tags used by the live quiz pages for each question model
+QUESTION_TYPE_TAGS = {
+    MultipleChoiceQuestion: "multiple_choice",
+    TrueFalseQuestion: "true_false",
+    IntegerInputQuestion: "integer",
+    TextInputQuestion: "text",
+    DecimalInputQuestion: "decimal",
+    NumericalRangeQuestion: "numerical_range",
+}
+
+
+@dataclass(frozen=True)
+class SnapshotQuestion:
+    id: int
+    question_type: str
+    question_text: str
+    options: tuple
+    image: str
+    time: int
+    mark: int
+    answer: str
+    answer_key: tuple
+    instance: object = field(compare=False, repr=False)
+
+    @property
+    def model(self):
+        return type(self.instance)
+
+    @classmethod
+    def from_question(cls, question):
+        question_type = QUESTION_TYPE_TAGS.get(type(question), "unknown")
+        if isinstance(question, MultipleChoiceQuestion):
+            options = tuple(question.options)
+        elif isinstance(question, TrueFalseQuestion):
+            options = ("True", "False")
+        else:
+            options = ()
+        if isinstance(question, NumericalRangeQuestion):
+            answer_key = (question.min_value, question.max_value)
+        else:
+            answer_key = (question.correct_answer,)
+        return cls(
+            id=question.id,
+            question_type=question_type,
+            question_text=question.question_text,
+            options=options,
+            image=question.image.url if question.image else DEFAULT_IMAGE,
+            time=question.time,
+            mark=question.mark,
+            answer=str(question.correct_answer),
+            answer_key=answer_key,
+            instance=question,
+        )
+
+    def payload(self, question_number, total_questions, reveal_answer=False):
+        """Message sent to the tutor and students when this question is shown or revealed."""
+        return {
+            "question": self.question_text,
+            "question_id": self.id,
+            "question_number": question_number,
+            "total_questions": total_questions,
+            "time": 0 if reveal_answer else self.time,
+            "question_type": self.question_type,
+            "image": self.image,
+            "options": list(self.options),
+            "answer": self.answer if reveal_answer else "",
+        }
+
+
+class QuestionSnapshot:
+    """Immutable, ordered copy of a room's questions taken when its quiz starts.
+
+    Question transitions during the quiz are served from here, so moving to the
+    next question or revealing an answer needs no question queries.
+    """
+
+    def __init__(self, questions):
+        self._questions = tuple(questions)
+        self._by_key = {(question.question_type, question.id): question for question in self._questions}
+        self._frames = {}
+
+    def __len__(self):
+        return len(self._questions)
+
+    def __iter__(self):
+        return iter(self._questions)
+
+    def get(self, index):
+        if 0 <= index < len(self._questions):
+            return self._questions[index]
+        return None
+
+    def find(self, question_type, question_id):
+        return self._by_key.get((question_type, question_id))
+
+    def payload(self, index, reveal_answer=False):
+        question = self.get(index)
+        if question is None:
+            return None
+        return question.payload(index + 1, len(self._questions), reveal_answer)
+
+    def tutor_frame(self, index, reveal_answer=False):
+        """Serialized quiz_update for the tutor group, encoded once per question."""
+        return self._frame(index, reveal_answer, quiz_update_message)
+
+    def student_frame(self, index, reveal_answer=False):
+        """Serialized question_update for the student group, encoded once per question."""
+        return self._frame(index, reveal_answer, question_update_message)
+
+    def _frame(self, index, reveal_answer, message):
+        key = (index, reveal_answer, message)
+        if key not in self._frames:
+            self._frames[key] = encode(message(self.payload(index, reveal_answer)))
+        return self._frames[key]
+
+    @classmethod
+    def build(cls, room):
+        return cls(SnapshotQuestion.from_question(question) for question in room.get_questions())
@@ -0,0 +1,216 @@
+import asyncio
+import json
+import logging
+import uuid
+from channels.layers import BaseChannelLayer
+from app.live.broker import encode_frame
+
+logger = logging.getLogger(__name__)
+
+
+class _BrokerConnection:
+    """One event loop's connection to the broker and the queues of its channels.
+
+    If the broker connection drops it is reopened, and the channels and group
+    memberships made through it are registered again. Once reconnecting has
+    given up, receive() calls waiting on it fail instead of waiting forever.
+    """
+
+    reconnect_delays = (0.1, 0.5, 1, 2, 5)
+
+    def __init__(self, path, get_capacity):
+        self.path = path
+        self.get_capacity = get_capacity
+        self.queues = {}
+        self.groups = set()
+        self.reader = None
+        self.writer = None
+        self.connected = asyncio.Event()
+        self.lost = asyncio.get_running_loop().create_future()
+        self._reader_task = None
+
+    @property
+    def closed(self):
+        return self.lost.done()
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_unix_connection(self.path)
+        self.connected.set()
+        self._reader_task = asyncio.ensure_future(self._read())
+
+    async def write(self, frame):
+        await self.connected.wait()
+        if self.closed:
+            raise self.lost.result()
+        self.writer.write(encode_frame(frame))
+        await self.writer.drain()
+
+    async def subscribe(self, channel):
+        queue = self.queues.get(channel)
+        if queue is None:
+            queue = self.queues[channel] = asyncio.Queue(self.get_capacity(channel))
+            await self.write({"op": "subscribe", "channel": channel})
+        return queue
+
+    def unsubscribe(self, channel):
+        if self.queues.pop(channel, None) is not None and self.connected.is_set() and not self.closed:
+            self.writer.write(encode_frame({"op": "unsubscribe", "channel": channel}))
+
+    async def _read(self):
+        try:
+            while True:
+                try:
+                    await self._read_frames()
+                except ConnectionError:
+                    pass
+                self.connected.clear()
+                self.writer.close()
+                if not await self._reconnect():
+                    self._fail(ConnectionError("Lost the connection to the channel broker"))
+                    return
+        except asyncio.CancelledError:
+            pass
+
+    async def _read_frames(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                return
+            frame = json.loads(line)
+            message = frame["message"]
+            for channel in frame["channels"]:
+                queue = self.queues.get(channel)
+                if queue is None:
+                    continue
+                try:
+                    queue.put_nowait(dict(message))
+                except asyncio.QueueFull:
+                    logger.warning("Channel %s is full, dropping message", channel)
+
+    async def _reconnect(self):
+        for delay in self.reconnect_delays:
+            await asyncio.sleep(delay)
+            try:
+                self.reader, self.writer = await asyncio.open_unix_connection(self.path)
+                for channel in self.queues:
+                    self.writer.write(encode_frame({"op": "subscribe", "channel": channel}))
+                for group, channel in self.groups:
+                    self.writer.write(encode_frame({"op": "group_add", "group": group, "channel": channel}))
+                await self.writer.drain()
+            except OSError:
+                continue
+            self.connected.set()
+            logger.info("Reconnected to the channel broker at %s", self.path)
+            return True
+        return False
+
+    def _fail(self, error):
+        if not self.lost.done():
+            self.lost.set_result(error)
+        # Wake writers waiting for the connection so they see the failure
+        self.connected.set()
+
+    async def close(self):
+        self._fail(ConnectionError("Connection to the channel broker was closed"))
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+class UnixSocketChannelLayer(BaseChannelLayer):
+    """Channel layer shared by several worker processes on one host.
+
+    Talks to a ChannelBroker (manage.py run_channel_broker) over a Unix domain
+    socket, so lobby, tutor and student groups work across Daphne/Uvicorn
+    workers without Redis. Messages must be JSON serializable. Each channel
+    buffers at most `capacity` messages in this process; later ones are dropped.
+    """
+
+    extensions = ["groups", "flush"]
+
+    def __init__(self, path, expiry=60, group_expiry=86400, capacity=100, channel_capacity=None):
+        super().__init__(expiry=expiry, capacity=capacity, channel_capacity=channel_capacity)
+        self.path = str(path)
+        self.group_expiry = group_expiry
+        self.client_prefix = uuid.uuid4().hex
+        self._connections = {}
+
+    async def _connection(self):
+        loop = asyncio.get_running_loop()
+        for other in [other for other in self._connections if other.is_closed()]:
+            del self._connections[other]
+        connection = self._connections.get(loop)
+        if connection is None or connection.closed:
+            connection = _BrokerConnection(self.path, self.get_capacity)
+            await connection.open()
+            self._connections[loop] = connection
+        return connection
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), "message is not a dict"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        assert "__asgi_channel__" not in message
+        connection = await self._connection()
+        await connection.write({"op": "send", "channel": channel, "message": message})
+
+    async def receive(self, channel):
+        assert self.valid_channel_name(channel)
+        connection = await self._connection()
+        queue = await connection.subscribe(channel)
+        getter = asyncio.ensure_future(queue.get())
+        try:
+            await asyncio.wait([getter, connection.lost], return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            getter.cancel()
+            # The consumer owning a process-specific channel has gone away
+            if "!" in channel:
+                connection.unsubscribe(channel)
+            raise
+        if not getter.done():
+            getter.cancel()
+            raise connection.lost.result()
+        return getter.result()
+
+    async def new_channel(self, prefix="specific"):
+        channel = f"{prefix}.{self.client_prefix}!{uuid.uuid4().hex}"
+        connection = await self._connection()
+        await connection.subscribe(channel)
+        return channel
+
+    async def group_add(self, group, channel):
+        assert self.valid_group_name(group), "Group name not valid"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        connection = await self._connection()
+        connection.groups.add((group, channel))
+        await connection.write({"op": "group_add", "group": group, "channel": channel})
+
+    async def group_discard(self, group, channel):
+        assert self.valid_group_name(group), "Group name not valid"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        connection = await self._connection()
+        connection.groups.discard((group, channel))
+        await connection.write({"op": "group_discard", "group": group, "channel": channel})
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), "Message is not a dict"
+        assert self.valid_group_name(group), "Group name not valid"
+        connection = await self._connection()
+        await connection.write({"op": "group_send", "group": group, "message": message})
+
+    async def flush(self):
+        connection = await self._connection()
+        connection.groups.clear()
+        await connection.write({"op": "flush"})
+        for queue in connection.queues.values():
+            while not queue.empty():
+                queue.get_nowait()
+
+    async def close(self):
+        connection = self._connections.pop(asyncio.get_running_loop(), None)
+        if connection is not None:
+            await connection.close()
@@ -0,0 +1,89 @@
+"""Compares the CPU cost of fanning a question out to a room of students.
+
+The legacy path sends the question dict through the channel layer and every
+consumer rebuilds and json.dumps its own copy. The frame path encodes the
+message once and every consumer forwards the same text."""
+import asyncio
+import json
+import time
+from channels.layers import InMemoryChannelLayer
+from django.core.management.base import BaseCommand
+from app.live import frames
+from app.live.frames import encode, question_update_message
+
+SAMPLE_QUESTION = {
+    "question": "Which of these is a prime number?",
+    "question_id": 1,
+    "question_number": 3,
+    "total_questions": 10,
+    "time": 30,
+    "question_type": "multiple_choice",
+    "image": "/static/images/default_thumbnail.png",
+    "options": ["4", "6", "7", "9"],
+    "answer": "",
+}
+
+
+class Command(BaseCommand):
+    help = "Benchmark legacy per-consumer serialization against pre-encoded broadcast frames"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", nargs="+", type=int, default=[10, 100, 1000])
+        parser.add_argument("--rounds", type=int, default=5)
+
+    def handle(self, *args, **options):
+        rounds = options["rounds"]
+        encoder = "orjson" if frames.orjson is not None else "json"
+        encode_time = self.measure_encoding(encode, rounds)
+        dumps_time = self.measure_encoding(json.dumps, rounds)
+        self.stdout.write(
+            f"encode ({encoder}) {encode_time * 1e6:.1f} us, json.dumps {dumps_time * 1e6:.1f} us per question message"
+        )
+        self.stdout.write(f"{'members':>8} {'legacy ms':>10} {'frame ms':>10} {'encode ms':>10} {'speedup':>8}")
+        for size in options["sizes"]:
+            legacy = asyncio.run(self.measure(size, rounds, framed=False))
+            framed = asyncio.run(self.measure(size, rounds, framed=True))
+            total = framed + encode_time
+            speedup = legacy / total if total else 0
+            self.stdout.write(
+                f"{size:>8} {legacy * 1000:>10.2f} {framed * 1000:>10.2f} {encode_time * 1000:>10.3f} {speedup:>7.1f}x"
+            )
+
+    def measure_encoding(self, dumps, rounds):
+        """Average CPU seconds to serialize the question message once."""
+        repeats = rounds * 1000
+        start = time.process_time()
+        for _ in range(repeats):
+            dumps(question_update_message(SAMPLE_QUESTION))
+        return (time.process_time() - start) / repeats
+
+    async def measure(self, size, rounds, framed):
+        """Average CPU seconds for one group_send plus every member sending its frame.
+
+        The frame path's single encode is timed by measure_encoding, so only
+        the layer and the forwarding are counted here.
+        """
+        layer = InMemoryChannelLayer(capacity=rounds + 1)
+        channels = [await layer.new_channel() for _ in range(size)]
+        for channel in channels:
+            await layer.group_add("bench", channel)
+        frame = {"type": "broadcast_frame", "text": encode(question_update_message(SAMPLE_QUESTION))}
+
+        total = 0.0
+        for _ in range(rounds):
+            start = time.process_time()
+            if framed:
+                await layer.group_send("bench", frame)
+            else:
+                await layer.group_send("bench", {"type": "student_question", "message": SAMPLE_QUESTION})
+            for channel in channels:
+                event = await layer.receive(channel)
+                if framed:
+                    text = event["text"]
+                else:
+                    text = json.dumps(question_update_message(event["message"]))
+                if not text:
+                    raise RuntimeError("Empty frame")
+            total += time.process_time() - start
+        await layer.flush()
+        return total / rounds
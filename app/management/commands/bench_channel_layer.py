@@ -0,0 +1,96 @@
+"""Compares the Unix socket channel layer with the in-memory one.
+
+Unless --path points at a running broker, a broker is started inside this
+process, so the socket numbers include the broker's own work on the same core."""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from channels.layers import InMemoryChannelLayer
+from django.core.management.base import BaseCommand
+from app.live.broker import ChannelBroker
+from app.live.socket_layer import UnixSocketChannelLayer
+
+MESSAGE = {"type": "broadcast_frame", "text": '{"type":"leaderboard_update","leaderboard":[]}'}
+
+
+class Command(BaseCommand):
+    help = "Benchmark throughput, latency and group fan-out of the channel layers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=2000)
+        parser.add_argument("--members", type=int, default=100)
+        parser.add_argument("--path", default=None, help="Socket of an already running broker")
+
+    def handle(self, *args, **options):
+        results = [
+            ("in-memory", asyncio.run(self.run_in_memory(options))),
+            ("unix socket", asyncio.run(self.run_socket(options))),
+        ]
+        self.stdout.write(f"{'layer':<12} {'msgs/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'fan-out ms':>11}")
+        for name, result in results:
+            self.stdout.write(
+                f"{name:<12} {result['throughput']:>10.0f} {result['p50'] * 1000:>8.3f} "
+                f"{result['p99'] * 1000:>8.3f} {result['fan_out'] * 1000:>11.2f}"
+            )
+
+    async def run_in_memory(self, options):
+        layer = InMemoryChannelLayer(capacity=options["messages"] + 1)
+        return await self.measure(layer, layer, options)
+
+    async def run_socket(self, options):
+        broker = None
+        path = options["path"]
+        if path is None:
+            path = os.path.join(tempfile.mkdtemp(), "broker.sock")
+            broker = await ChannelBroker(path, capacity=options["messages"] + 1).start()
+        # Two layer instances stand in for two worker processes; every message
+        # is sent before any is received, so the queues must hold them all
+        sender = UnixSocketChannelLayer(path, capacity=options["messages"] + 1)
+        receiver = UnixSocketChannelLayer(path, capacity=options["messages"] + 1)
+        try:
+            return await self.measure(sender, receiver, options)
+        finally:
+            await sender.close()
+            await receiver.close()
+            if broker is not None:
+                await broker.close()
+
+    async def measure(self, sender, receiver, options):
+        count = options["messages"]
+        channel = await receiver.new_channel()
+
+        start = time.perf_counter()
+        for _ in range(count):
+            await sender.send(channel, MESSAGE)
+        for _ in range(count):
+            await receiver.receive(channel)
+        throughput = count / (time.perf_counter() - start)
+
+        latencies = []
+        for _ in range(min(count, 500)):
+            start = time.perf_counter()
+            await sender.send(channel, MESSAGE)
+            await receiver.receive(channel)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+
+        members = [await receiver.new_channel() for _ in range(options["members"])]
+        for member in members:
+            await receiver.group_add("bench", member)
+        rounds = 10
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await sender.group_send("bench", MESSAGE)
+            for member in members:
+                await receiver.receive(member)
+        fan_out = (time.perf_counter() - start) / rounds
+        await receiver.flush()
+
+        return {
+            "throughput": throughput,
+            "p50": statistics.median(latencies),
+            "p99": latencies[int(len(latencies) * 0.99) - 1],
+            "fan_out": fan_out,
+        }
@@ -0,0 +1,47 @@
+"""Times the live leaderboard at different room sizes.
+
+"sort" is what each query cost before the skip list: sorting every participant
+to answer a rank or top-K question."""
+import random
+import time
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from app.live.leaderboard import LeaderboardEngine
+
+
+class Command(BaseCommand):
+    help = "Benchmark leaderboard updates, rank-of and top-K queries up to 10k participants"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000, 10000])
+        parser.add_argument("--operations", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        operations = options["operations"]
+        self.stdout.write(f"{'size':>7} {'update us':>10} {'rank us':>9} {'top10 us':>9} {'sort us':>9}")
+        for size in options["sizes"]:
+            engine = LeaderboardEngine()
+            start = timezone.now()
+            keys = [f"user:{i}" for i in range(size)]
+            for i, key in enumerate(keys):
+                engine.add_participant(key, i, key, start + timezone.timedelta(microseconds=i))
+
+            update = self.time_each(operations, lambda: engine.record_answer(rng.choice(keys), rng.random() < 0.7, 10))
+            rank = self.time_each(operations, lambda: engine.rank_of(rng.choice(keys)))
+            top = self.time_each(operations, lambda: engine.top(10))
+            entries = list(engine._scores.values())
+            sort = self.time_each(
+                max(1, operations // 20),
+                lambda: sorted(entries, key=lambda entry: (-entry.total_score, entry.joined_at))
+            )
+            self.stdout.write(f"{size:>7} {update:>10.2f} {rank:>9.2f} {top:>9.2f} {sort:>9.1f}")
+
+    @staticmethod
+    def time_each(count, operation):
+        """Average microseconds per call."""
+        start = time.perf_counter()
+        for _ in range(count):
+            operation()
+        return (time.perf_counter() - start) / count * 1_000_000
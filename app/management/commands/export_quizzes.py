@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from app.helpers.quiz_transfer import export_quizzes
+from app.models import Quiz, User
+
+
+class Command(BaseCommand):
+    help = "Write a quiz, or all of a tutor's quizzes, as NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("tutor", help="Email address of the tutor who owns the quizzes")
+        parser.add_argument("--quiz", type=int, help="Export only this quiz")
+        parser.add_argument("--images", action="store_true", help="Bundle question and quiz images in the output")
+        parser.add_argument("--output", "-o", help="File to write to instead of standard output")
+
+    def handle(self, *args, **options):
+        tutor = User.objects.filter(email_address=options["tutor"], role=User.TUTOR).first()
+        if tutor is None:
+            raise CommandError(f"No tutor with email address {options['tutor']}")
+        quizzes = Quiz.objects.filter(tutor=tutor).order_by("id")
+        if options["quiz"] is not None:
+            quizzes = quizzes.filter(pk=options["quiz"])
+            if not quizzes.exists():
+                raise CommandError(f"{options['tutor']} has no quiz {options['quiz']}")
+
+        lines = export_quizzes(quizzes.iterator(), include_images=options["images"])
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
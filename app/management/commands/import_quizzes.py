@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from app.helpers.quiz_transfer import import_quizzes
+from app.models import User
+
+
+class Command(BaseCommand):
+    help = "Create quizzes for a tutor from an NDJSON file written by export_quizzes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("tutor", help="Email address of the tutor who will own the quizzes")
+        parser.add_argument("path")
+        parser.add_argument("--batch-size", type=int, help="Questions inserted per bulk insert")
+
+    def handle(self, *args, **options):
+        tutor = User.objects.filter(email_address=options["tutor"], role=User.TUTOR).first()
+        if tutor is None:
+            raise CommandError(f"No tutor with email address {options['tutor']}")
+        try:
+            with open(options["path"], "rb") as lines:
+                quizzes = import_quizzes(lines, tutor, options["batch_size"])
+        except (OSError, ValueError) as error:
+            raise CommandError(str(error))
+        self.stdout.write(f"Imported {len(quizzes)} quiz(zes) for {tutor.email_address}")
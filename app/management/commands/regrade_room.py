@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+from app.helpers.helper_functions import regrade_responses
+from app.models import Room
+
+
+class Command(BaseCommand):
+    help = "Re-grade a room's responses against the current answer keys and refresh its scores and stats"
+
+    def add_arguments(self, parser):
+        parser.add_argument("join_code")
+
+    def handle(self, *args, **options):
+        room = Room.objects.filter(join_code=options["join_code"]).first()
+        if room is None:
+            raise CommandError(f"No room with join code {options['join_code']}")
+        changed = regrade_responses(room)
+        self.stdout.write(f"Re-graded {changed} response(s) in room {room.join_code}")
@@ -0,0 +1,23 @@
+import asyncio
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from app.live.broker import ChannelBroker
+
+
+class Command(BaseCommand):
+    help = "Run the Unix socket broker shared by the ASGI workers' channel layers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default=settings.CHANNEL_LAYER_SOCKET)
+        parser.add_argument("--capacity", type=int, default=100)
+        parser.add_argument("--expiry", type=int, default=60)
+
+    def handle(self, *args, **options):
+        if not options["path"]:
+            raise CommandError("Set CHANNEL_LAYER_SOCKET or pass --path")
+        broker = ChannelBroker(options["path"], capacity=options["capacity"], expiry=options["expiry"])
+        self.stdout.write(f"Channel broker listening on {options['path']}")
+        try:
+            asyncio.run(broker.serve_forever())
+        except KeyboardInterrupt:
+            pass
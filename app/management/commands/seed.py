@@ -397,48 +397,48 @@ class Command(BaseCommand):
         self.generate_quiz_3_responses()
 
     def generate_quiz_1_responses(self):
-        from app.helpers.helper_functions import create_quiz_stats, calculate_user_score
+        from app.helpers.helper_functions import create_quiz_stats, update_room_scores
         students = list(User.objects.filter(role=User.STUDENT))
         quiz = Quiz.objects.filter(name="Python Basics").first()
         room = Room.objects.create(name="Python Quiz Room", quiz=quiz)
         for student in students:
-            participant = RoomParticipant.objects.create(room=room, user=student)
+            RoomParticipant.objects.create(room=room, user=student)
             self.generate_integer_input_response(student, room, IntegerInputQuestion.objects.get(quiz=quiz, position=1))
             self.generate_true_false_response(student, room, TrueFalseQuestion.objects.get(quiz=quiz, position=2))
             self.generate_multiple_choice_response(student, room, MultipleChoiceQuestion.objects.get(quiz=quiz, position=3))
             self.generate_text_input_response(student, room, TextInputQuestion.objects.get(quiz=quiz, position=4))
-            participant.score = calculate_user_score(student,room)
+        update_room_scores(room)
         create_quiz_stats(room)
         
     def generate_quiz_2_responses(self):
-        from app.helpers.helper_functions import create_quiz_stats, calculate_user_score
+        from app.helpers.helper_functions import create_quiz_stats, update_room_scores
         students = list(User.objects.filter(role=User.STUDENT))
         quiz = Quiz.objects.filter(name="Arithmetic Test").first()
         room = Room.objects.create(name="Arithmetic Test Room", quiz=quiz)
         for student in students:
-            participant = RoomParticipant.objects.create(room=room, user=student)
+            RoomParticipant.objects.create(room=room, user=student)
             self.generate_integer_input_response(student, room, IntegerInputQuestion.objects.get(quiz=quiz, position=1))
             self.generate_integer_input_response(student, room, IntegerInputQuestion.objects.get(quiz=quiz, position=2))
             self.generate_integer_input_response(student, room, IntegerInputQuestion.objects.get(quiz=quiz, position=3))
             self.generate_integer_input_response(student, room, IntegerInputQuestion.objects.get(quiz=quiz, position=4))
             self.generate_integer_input_response(student, room, IntegerInputQuestion.objects.get(quiz=quiz, position=5))
             self.generate_integer_input_response(student, room, IntegerInputQuestion.objects.get(quiz=quiz, position=6))
-            participant.score = calculate_user_score(student,room)
+        update_room_scores(room)
         create_quiz_stats(room)
 
     def generate_quiz_3_responses(self):
-        from app.helpers.helper_functions import create_quiz_stats, calculate_user_score
+        from app.helpers.helper_functions import create_quiz_stats, update_room_scores
         students = list(User.objects.filter(role=User.STUDENT))
         quiz = Quiz.objects.filter(name="Physics Basics").first()
         room = Room.objects.create(name="Physics Test Room", quiz=quiz)
         for student in students:
-            participant = RoomParticipant.objects.create(room=room, user=student)
+            RoomParticipant.objects.create(room=room, user=student)
             self.generate_multiple_choice_response(student, room, MultipleChoiceQuestion.objects.get(quiz=quiz, position=1))
             self.generate_true_false_response(student, room, TrueFalseQuestion.objects.get(quiz=quiz, position=2))
             self.generate_integer_input_response(student, room, IntegerInputQuestion.objects.get(quiz=quiz, position=3))
             self.generate_multiple_choice_response(student, room, MultipleChoiceQuestion.objects.get(quiz=quiz, position=4))
             self.generate_text_input_response(student, room, TextInputQuestion.objects.get(quiz=quiz, position=5))
-            participant.score = calculate_user_score(student,room)
+        update_room_scores(room)
         create_quiz_stats(room)
      
     def generate_integer_input_response(self, user, room, question):
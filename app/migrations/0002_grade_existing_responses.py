@@ -0,0 +1,58 @@
+from decimal import Decimal, InvalidOperation
+from django.core.exceptions import ValidationError
+from django.db import migrations
+
+
+RESPONSE_MODELS = (
+    'TrueFalseResponse', 'IntegerInputResponse', 'TextInputResponse',
+    'DecimalInputResponse', 'MultipleChoiceResponse', 'NumericalRangeResponse',
+)
+
+
+# The grading rules as they were when this migration was written. They are
+# copied here rather than imported from app.grading, so later changes to the
+# live checkers cannot change what this migration does.
+
+def normalise_text(value):
+    return " ".join(str(value).split()).casefold()
+
+
+def quantise(value, decimal_places):
+    return Decimal(str(value).strip()).quantize(Decimal(1).scaleb(-decimal_places))
+
+
+def is_correct(question, answer):
+    kind = question._meta.model_name
+    if kind == "numericalrangequestion":
+        return float(question.min_value) <= float(answer) <= float(question.max_value)
+    if kind == "multiplechoicequestion":
+        return str(answer).strip() == str(question.correct_answer).strip()
+    if kind == "textinputquestion":
+        return normalise_text(answer) == normalise_text(question.correct_answer)
+    field = question._meta.get_field("correct_answer")
+    if kind == "decimalinputquestion":
+        return quantise(answer, field.decimal_places) == quantise(question.correct_answer, field.decimal_places)
+    return field.to_python(answer) == field.to_python(question.correct_answer)
+
+
+def grade_existing_responses(apps, schema_editor):
+    for model_name in RESPONSE_MODELS:
+        response_model = apps.get_model('app', model_name)
+        responses = list(response_model.objects.select_related('question'))
+        for response in responses:
+            try:
+                response.correct = is_correct(response.question, response.answer)
+            except (TypeError, ValueError, InvalidOperation, ValidationError):
+                response.correct = False
+        response_model.objects.bulk_update(responses, ['correct'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(grade_existing_responses, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+from collections import defaultdict
+from django.db import migrations
+
+
+# Manifest order for questions sharing a position, as in app.models.quiz
+QUESTION_MODELS = (
+    'IntegerInputQuestion', 'TrueFalseQuestion', 'TextInputQuestion',
+    'DecimalInputQuestion', 'MultipleChoiceQuestion', 'NumericalRangeQuestion',
+)
+
+
+def index_existing_quizzes(apps, schema_editor):
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    QuizItem = apps.get_model('app', 'QuizItem')
+
+    rows_by_quiz = defaultdict(list)
+    for type_order, model_name in enumerate(QUESTION_MODELS):
+        question_model = apps.get_model('app', model_name)
+        content_type, _ = ContentType.objects.get_or_create(app_label='app', model=model_name.lower())
+        for object_id, quiz_id, position in question_model.objects.values_list('id', 'quiz_id', 'position'):
+            sort_key = (position if position is not None else float('inf'), type_order, object_id)
+            rows_by_quiz[quiz_id].append((sort_key, content_type, object_id))
+
+    items = []
+    for quiz_id, rows in rows_by_quiz.items():
+        rows.sort(key=lambda row: row[0])
+        items.extend(
+            QuizItem(quiz_id=quiz_id, position=position, content_type=content_type, object_id=object_id)
+            for position, (_, content_type, object_id) in enumerate(rows, start=1)
+        )
+    QuizItem.objects.bulk_create(items, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_quiz_item'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(index_existing_quizzes, migrations.RunPython.noop),
+    ]
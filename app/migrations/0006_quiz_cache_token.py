@@ -0,0 +1,19 @@
+# Generated by Django 5.1.2 on 2026-10-18 09:27
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_index_existing_quizzes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='cache_token',
+            field=models.UUIDField(default=uuid.uuid4, editable=False),
+        ),
+    ]
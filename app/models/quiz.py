@@ -1,10 +1,17 @@
+from django.conf import settings
+from django.core.cache import caches
 from django.db import models
+from django.db.models import F
+from app import image_store
+from app.models.tracking import TrackedFieldsMixin
 from app.models.user import User
-from django.core.files.storage import default_storage
-from django.core.exceptions import ObjectDoesNotExist
-from itertools import chain
+import uuid
+from collections import defaultdict
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
 
-class Quiz(models.Model):
+class Quiz(TrackedFieldsMixin, models.Model):
     DIFFICULTIES = [
         ("E", "Easy"),
         ("M", "Medium"),
@@ -34,28 +41,62 @@ class Quiz(models.Model):
         blank=True
     )
 
+    # Bumped whenever a question is added, changed, deleted or moved, so cached
+    # question manifests for older versions are never read again
+    content_version = models.PositiveIntegerField(default=0, editable=False)
+    # Part of the manifest cache key, so a quiz reusing a deleted quiz's primary
+    # key (after a rollback or a database reset) never reads its cached manifest
+    cache_token = models.UUIDField(default=uuid.uuid4, editable=False)
+
+    tracked_fields = ('quiz_img',)
+
     # room = models.OneToOneField("Room", related_name="quiz_room", on_delete=models.SET_NULL, null=True, blank=True)
     # I believe this should be removed, as it's redundant? 
 
-    def get_all_questions(self):
-        # This method already uses specific question types
-        integer_qs = self.integer_questions.all()
-        true_false_qs = self.true_false_questions.all()
-        text_qs = self.text_questions.all()
-        decimal_qs = self.decimal_questions.all()
-        multiple_choice_qs = self.multiple_choice_questions.all()
-        numerical_range_qs = self.numerical_range_questions.all()
+    def save(self, *args, **kwargs):
+        # content_version is only ever changed by bump_content_version; writing back
+        # a stale in-memory value would point the cache at an old manifest
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'content_version'
+            ]
+        replaced = self.original_value('quiz_img') if 'quiz_img' in self.changed_fields() else None
+        super().save(*args, **kwargs)
+        if replaced:
+            image_store.release(replaced, Quiz.objects.filter(quiz_img=replaced).count())
+
+    @staticmethod
+    def bump_content_version(quiz_id):
+        Quiz.objects.filter(pk=quiz_id).update(content_version=F('content_version') + 1)
+
+    @staticmethod
+    def content_changed(quiz_id, reindex=True):
+        """Move the quiz to a new content version, re-indexing its questions unless their order is unchanged."""
+        if reindex:
+            QuizItem.rebuild(quiz_id)
+        Quiz.bump_content_version(quiz_id)
 
-        # Combine all queries
-        all_questions = list(chain(integer_qs, true_false_qs, text_qs, decimal_qs, multiple_choice_qs, numerical_range_qs))
+    def manifest_cache_key(self):
+        return f"quiz:{self.pk}:{self.cache_token.hex}:questions:v{self.content_version}"
 
-        # Sort by position
-        return sorted(all_questions, key=lambda q: q.position if q.position is not None else float('inf'))
+    def get_all_questions(self):
+        """Questions ordered by position, from the cached manifest for this content version."""
+        cache = caches[settings.QUIZ_MANIFEST_CACHE]
+        key = self.manifest_cache_key()
+        questions = cache.get(key)
+        if questions is None:
+            questions = self.load_questions()
+            cache.set(key, questions, settings.QUIZ_MANIFEST_CACHE_TIMEOUT)
+        return questions
+
+    def load_questions(self):
+        return QuizItem.load(self)
 
     def __str__(self): # pragma: no cover
         return (f"Quiz: {self.id}, {self.name} - made by tutor {self.tutor}")
 
-class Question(models.Model):
+class Question(TrackedFieldsMixin, models.Model):
     question_text = models.CharField(max_length=255)
     position = models.IntegerField(blank=True, null=True)
     time = models.PositiveIntegerField(default=30)
@@ -70,23 +111,45 @@ class Question(models.Model):
     image = models.ImageField(null=True, blank=True, upload_to='questions_images/')
 
     def save(self, *args, **kwargs):
-        """ Delete the associated image file when the image is updated """
-        if self.pk:
-            try:
-                old_instance = self.__class__.objects.get(pk=self.pk)
-                if old_instance.image and self.image != old_instance.image:
-                    if default_storage.exists(old_instance.image.name):
-                        default_storage.delete(old_instance.image.name)
-            except ObjectDoesNotExist:
-                pass
+        """ Store a new image by content, release the image it replaces, and update the quiz if anything changed """
+        image_field = self._meta.get_field('image')
+        if self.image and not self.image._committed:
+            self.image = image_store.store(self.image.file, image_field.upload_to)
+        adding = self._state.adding
+        changed = self.changed_fields()
+        replaced = self.original_value('image') if 'image' in changed else None
+        previous_quiz_id = self.original_value('quiz') if 'quiz' in changed else None
         super().save(*args, **kwargs)
+        if replaced:
+            Question.release_image(replaced)
+        if previous_quiz_id and previous_quiz_id != self.quiz_id:
+            Quiz.content_changed(previous_quiz_id)
+        if changed:
+            self.quiz_changed(reindex=adding or bool(changed & {'position', 'quiz'}))
 
     def delete(self, *args, **kwargs):
-        """ Delete the associated image file when the question is deleted. """
+        """ Release the associated image file when the question is deleted. """
+        result = super().delete(*args, **kwargs)
         if self.image:
-            if default_storage.exists(self.image.name):
-                default_storage.delete(self.image.name)
-        super().delete(*args, **kwargs)
+            Question.release_image(self.image.name)
+        self.quiz_changed()
+        return result
+
+    @staticmethod
+    def image_references(name):
+        """How many questions, of any type, use the stored image."""
+        querysets = [model.objects.filter(image=name).order_by().values('pk') for model in MANIFEST_QUESTION_MODELS]
+        return querysets[0].union(*querysets[1:], all=True).count()
+
+    @staticmethod
+    def release_image(name):
+        image_store.release(name, Question.image_references(name))
+
+    def quiz_changed(self, reindex=True):
+        """Move the quiz to a new content version, and the loaded quiz object with it."""
+        Quiz.content_changed(self.quiz_id, reindex)
+        if type(self).quiz.is_cached(self):
+            self.quiz.refresh_from_db(fields=['content_version'])
 
     def __str__(self): # pragma: no cover
         return f"Quiz {self.quiz.id} Question {self.position}"
@@ -174,4 +237,73 @@ class NumericalRangeQuestion(Question):
     @property
     def correct_answer(self):
         # Return the accepted range as a string.
-        return f"{self.min_value} - {self.max_value}"
\ No newline at end of file
+        return f"{self.min_value} - {self.max_value}"
+
+
+# Manifest order for questions sharing a position
+MANIFEST_QUESTION_MODELS = (
+    IntegerInputQuestion,
+    TrueFalseQuestion,
+    TextInputQuestion,
+    DecimalInputQuestion,
+    MultipleChoiceQuestion,
+    NumericalRangeQuestion,
+)
+
+
+class QuizItem(models.Model):
+    """One row per question of a quiz, numbered 1..N in manifest order.
+
+    Questions live in one table per type, so ordering a quiz used to mean
+    reading all six. The index is rebuilt whenever a question changes, and
+    loading a quiz reads it once, then only the question tables it points at.
+    """
+
+    quiz = models.ForeignKey(Quiz, related_name="items", on_delete=models.CASCADE)
+    position = models.PositiveIntegerField()
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    question = GenericForeignKey('content_type', 'object_id')
+
+    class Meta:
+        ordering = ['position']
+        constraints = [
+            models.UniqueConstraint(fields=['quiz', 'position'], name='unique_quiz_item_position'),
+        ]
+
+    def __str__(self): # pragma: no cover
+        return f"Quiz {self.quiz_id} item {self.position}: {self.content_type.model} {self.object_id}"
+
+    @classmethod
+    def rebuild(cls, quiz_id):
+        """Renumber the quiz's index from its questions' positions."""
+        rows = []
+        for type_order, question_model in enumerate(MANIFEST_QUESTION_MODELS):
+            content_type = ContentType.objects.get_for_model(question_model)
+            for object_id, position in question_model.objects.filter(quiz_id=quiz_id).values_list('id', 'position'):
+                sort_key = (position if position is not None else float('inf'), type_order, object_id)
+                rows.append((sort_key, content_type, object_id))
+        rows.sort(key=lambda row: row[0])
+
+        with transaction.atomic():
+            cls.objects.filter(quiz_id=quiz_id).delete()
+            cls.objects.bulk_create([
+                cls(quiz_id=quiz_id, position=position, content_type=content_type, object_id=object_id)
+                for position, (_, content_type, object_id) in enumerate(rows, start=1)
+            ])
+
+    @classmethod
+    def load(cls, quiz):
+        """The quiz's questions in order: one index query, then one query per question type present."""
+        items = list(cls.objects.filter(quiz=quiz).values_list('content_type_id', 'object_id'))
+        ids_by_type = defaultdict(list)
+        for content_type_id, object_id in items:
+            ids_by_type[content_type_id].append(object_id)
+
+        questions = {}
+        for content_type_id, object_ids in ids_by_type.items():
+            question_model = ContentType.objects.get_for_id(content_type_id).model_class()
+            for question in question_model.objects.filter(pk__in=object_ids):
+                questions[content_type_id, question.pk] = question
+        # Rows removed without going through Question.delete are skipped until the next rebuild
+        return [questions[item] for item in items if item in questions]
@@ -4,6 +4,7 @@ from app.models import TrueFalseQuestion, IntegerInputQuestion, Room
 from app.models.quiz import TextInputQuestion, DecimalInputQuestion, MultipleChoiceQuestion, NumericalRangeQuestion
 from app.models.user import User
 from app.models.guest import GuestAccess
+from app.grading import get_checker
 
 class Response(models.Model):
     player = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
@@ -14,6 +15,15 @@ class Response(models.Model):
 
     class Meta:
         abstract = True
+
+    def grade(self):
+        """Mark the answer with its question's compiled checker and store the result in `correct`."""
+        self.correct = get_checker(self.question)(self.answer)
+        return self.correct
+
+    def save(self, *args, **kwargs):
+        self.grade()
+        super().save(*args, **kwargs)
         
 class TrueFalseResponse(Response):
     question = models.ForeignKey(TrueFalseQuestion, on_delete=models.CASCADE)
@@ -67,9 +77,7 @@ class MultipleChoiceResponse(Response):
     answer = models.CharField(max_length=255)
 
     def clean(self):
-        answer_stripped = self.answer.strip() if isinstance(self.answer, str) else self.answer
-        options_stripped = [option.strip() for option in self.question.options]
-        if answer_stripped not in options_stripped:
+        if not get_checker(self.question).is_option(self.answer):
             raise ValidationError("Answer must be one of the following options: '{}'".format(self.question.options))
 
     def save(self, *args, **kwargs):
@@ -34,24 +34,10 @@ class Room(models.Model):
     is_quiz_active = models.BooleanField(default=False)
 
     def get_questions(self):
-        """Combine all question types safely"""
+        """The quiz's questions in order, from its cached manifest"""
         if not self.quiz:
             return []
-
-        questions = []
-        question_types = [
-            'integer_questions',
-            'true_false_questions',
-            'text_questions',
-            'multiple_choice_questions',
-            'decimal_questions',
-            'numerical_range_questions',
-        ]
-
-        for q_type in question_types:
-            questions += list(getattr(self.quiz, q_type).all())
-
-        return sorted(questions, key=lambda q: q.position if q.position else 0)
+        return self.quiz.get_all_questions()
 
     def get_current_question(self):
         questions = self.get_questions()
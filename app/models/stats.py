@@ -1,7 +1,6 @@
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
-from django.db.models.aggregates import Avg
 from django.db.models.expressions import result
 from app.models import Room, RoomParticipant, Response, Quiz, Question, IntegerInputResponse, TrueFalseResponse, TextInputResponse, DecimalInputResponse, MultipleChoiceResponse, NumericalRangeResponse, User
 
@@ -13,25 +12,16 @@ class Stats(models.Model):
     mean_score = models.DecimalField(max_digits=5, decimal_places=2)
     median_score = models.DecimalField(max_digits=5, decimal_places=2)
 
-    def calculate_median(self):
-        scores = RoomParticipant.objects.filter(room=self.room).exclude(user__role__iexact="tutor").values_list('score', flat=True).order_by('score')
-        total_scores = len(scores)
-        if total_scores == 0:
-            median = 0
-        elif total_scores % 2 == 1:
-            median = scores[total_scores // 2]
-        else:
-            mid1 = scores[(total_scores // 2) - 1]
-            mid2 = scores[total_scores // 2]
-            median = (mid1 + mid2) / 2
-        return median
+    def summarise_scores(self):
+        """Participant count, mean and median score from the participants' saved scores, in one query."""
+        from app.helpers.analytics import ScoreAnalytics
+        analytics = ScoreAnalytics.load(self.room)
+        self.num_participants = len(analytics)
+        self.mean_score = round(analytics.mean(), 2)
+        self.median_score = round(analytics.median(), 2)
 
     def save(self, *args, **kwargs):
-        self.num_participants = RoomParticipant.objects.filter(room=self.room).exclude(user__role__iexact="tutor").count()
-        self.mean_score = RoomParticipant.objects.filter(room=self.room).exclude(user__role__iexact="tutor").aggregate(Avg('score'))['score__avg']
-        if self.mean_score is None:
-            self.mean_score = 0
-        self.median_score = self.calculate_median()
+        self.summarise_scores()
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -47,21 +37,19 @@ class QuestionStats(models.Model):
     percentage_correct = models.DecimalField(max_digits=5, decimal_places=2)
 
     def save(self, *args, **kwargs):
-        from app.helpers.helper_functions import get_response_model_class, isCorrectAnswer
+        from app.helpers.helper_functions import get_response_model_class, count_correct_responses
         response_model = get_response_model_class(self.question_type)
-        responses = list(response_model.objects.filter(room=self.room, question_id=self.question.id))
-        self.responses_received = len(responses)
-        correct_count = 0
-        for resp in responses:
-            if isCorrectAnswer(resp):
-                correct_count += 1
-        self.correct_responses = correct_count
-        if self.responses_received != 0:
-            self.percentage_correct = (self.correct_responses / self.responses_received) * 100
-        else:
-            self.percentage_correct = 0
+        responses = response_model.objects.filter(room=self.room, question_id=self.question_id)
+        self.responses_received, self.correct_responses = count_correct_responses(responses)
+        self.percentage_correct = self.percentage(self.responses_received, self.correct_responses)
         super(QuestionStats, self).save(*args, **kwargs)
 
+    @staticmethod
+    def percentage(responses_received, correct_responses):
+        if responses_received == 0:
+            return 0
+        return correct_responses / responses_received * 100
+
     @property
     def wrong_responses(self):
         return self.responses_received - self.correct_responses
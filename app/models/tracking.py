@@ -0,0 +1,79 @@
+import copy
+from django.db import models
+from django.db.models.fields.files import FieldFile
+
+
+def comparable(field, value):
+    # Files compare by stored name, and an empty file may load as '' or None
+    if isinstance(field, models.FileField):
+        return (value.name if isinstance(value, FieldFile) else value) or None
+    return value
+
+
+def snapshot(field, value):
+    # JSON values are copied, or changing them in place would change the remembered value too
+    value = comparable(field, value)
+    if isinstance(value, (list, dict)):
+        return copy.deepcopy(value)
+    return value
+
+
+class TrackedFieldsMixin:
+    """Remembers the values of tracked fields as they were loaded or last saved.
+
+    Lets save() tell which fields really changed without reading the row
+    again. `tracked_fields` names the fields to track; None tracks every
+    concrete field.
+    """
+
+    tracked_fields = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {}
+        instance.remember_values(field_names)
+        return instance
+
+    def _tracked(self):
+        return [
+            field for field in self._meta.concrete_fields
+            if self.tracked_fields is None or field.name in self.tracked_fields
+        ]
+
+    def remember_values(self, names=None):
+        """Record the current value of the tracked fields among `names` (field names or attnames)."""
+        loaded = self.__dict__.setdefault('_loaded_values', {})
+        deferred = self.get_deferred_fields()
+        for field in self._tracked():
+            if names is not None and field.name not in names and field.attname not in names:
+                continue
+            if field.attname not in deferred:
+                loaded[field.attname] = snapshot(field, getattr(self, field.attname))
+
+    def changed_fields(self):
+        """Names of tracked fields whose value differs from the stored one, or is not known."""
+        loaded = getattr(self, '_loaded_values', {})
+        return {
+            field.name for field in self._tracked()
+            if field.attname not in loaded or loaded[field.attname] != comparable(field, getattr(self, field.attname))
+        }
+
+    def original_value(self, name):
+        """The stored value of a tracked field, read from the database only if it was never loaded."""
+        if self._state.adding:
+            return None
+        field = self._meta.get_field(name)
+        loaded = getattr(self, '_loaded_values', {})
+        if field.attname not in loaded:
+            stored = type(self)._base_manager.filter(pk=self.pk).values_list(field.attname, flat=True)
+            return comparable(field, stored.first())
+        return loaded[field.attname]
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.remember_values(kwargs.get('update_fields'))
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.remember_values(kwargs.get('fields'))
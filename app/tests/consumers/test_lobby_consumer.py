@@ -2,6 +2,9 @@ from channels.testing import WebsocketCommunicator
 from django.test import TransactionTestCase
 from app.consumers.lobby_consumer import LobbyConsumer
 from app.models import Room, RoomParticipant, User, GuestAccess
+from app.live import rooms
+from app.live.leaderboard import LeaderboardEngine
+from app.live.rooms import get_live_room, discard_live_room, leave_live_room
 from channels.db import database_sync_to_async as sync_to_async
 import json
 
@@ -14,6 +17,9 @@ class LobbyConsumerTests(TransactionTestCase):
         self.user_participant = RoomParticipant.objects.create(room=self.room, user=self.student)
         self.guest_participant = RoomParticipant.objects.create(room=self.room, guest_access=self.guest)
 
+    def tearDown(self):
+        discard_live_room("ABCD1234")
+
     async def test_student_connect(self):
         communicator = WebsocketCommunicator(LobbyConsumer.as_asgi(), "/ws/lobby/ABCD1234/")
         communicator.scope['url_route'] = {'kwargs': {'join_code': 'ABCD1234'}}
@@ -91,3 +97,65 @@ class LobbyConsumerTests(TransactionTestCase):
         self.assertEqual(response, {"error": "Unknown action in lobby"})
 
         await communicator.disconnect()
+
+    async def test_join_and_leave_are_sent_as_deltas(self):
+        tutor = await sync_to_async(User.objects.create)(
+            first_name="Bob", last_name="Tutor", email_address="bobtutor@example.org", role=User.TUTOR
+        )
+        session = await sync_to_async(lambda: dict(self.client.session))()
+        watcher = WebsocketCommunicator(LobbyConsumer.as_asgi(), "/ws/lobby/ABCD1234/")
+        watcher.scope['url_route'] = {'kwargs': {'join_code': 'ABCD1234'}}
+        watcher.scope['user'] = tutor
+        watcher.scope['session'] = session
+        await watcher.connect()
+        snapshot = await watcher.receive_json_from()
+        self.assertEqual(snapshot["type"], "participants_snapshot")
+        self.assertEqual(snapshot["participants"], [])
+
+        student = WebsocketCommunicator(LobbyConsumer.as_asgi(), "/ws/lobby/ABCD1234/")
+        student.scope['url_route'] = {'kwargs': {'join_code': 'ABCD1234'}}
+        student.scope['user'] = self.student
+        student.scope['session'] = session
+        await student.connect()
+
+        joined = await watcher.receive_json_from()
+        self.assertEqual(joined["type"], "participants_delta")
+        self.assertEqual(joined["op"], "join")
+        self.assertEqual(joined["participant"], "johndoe@example.org")
+        self.assertEqual(joined["participant_number"], 1)
+
+        await student.disconnect()
+        left = await watcher.receive_json_from()
+        self.assertEqual(left["op"], "leave")
+        self.assertEqual(left["participant_number"], 0)
+        self.assertEqual(len(get_live_room("ABCD1234").roster), 0)
+
+        await watcher.disconnect()
+
+    async def _connect_student(self):
+        session = await sync_to_async(lambda: dict(self.client.session))()
+        communicator = WebsocketCommunicator(LobbyConsumer.as_asgi(), "/ws/lobby/ABCD1234/")
+        communicator.scope['url_route'] = {'kwargs': {'join_code': 'ABCD1234'}}
+        communicator.scope['user'] = self.student
+        communicator.scope['session'] = session
+        await communicator.connect()
+        await communicator.receive_json_from()
+        return communicator
+
+    async def test_room_is_dropped_when_the_last_participant_leaves(self):
+        communicator = await self._connect_student()
+        self.assertIn("ABCD1234", rooms._rooms)
+
+        await communicator.disconnect()
+        self.assertNotIn("ABCD1234", rooms._rooms)
+
+    async def test_room_playing_a_quiz_is_kept_when_empty(self):
+        communicator = await self._connect_student()
+        get_live_room("ABCD1234").leaderboard = LeaderboardEngine()
+
+        await communicator.disconnect()
+        self.assertIn("ABCD1234", rooms._rooms)
+
+    async def test_leaving_does_not_create_a_room(self):
+        await leave_live_room("ABCD1234", ("user:1", "someone@example.org"))
+        self.assertNotIn("ABCD1234", rooms._rooms)
@@ -1,13 +1,16 @@
 import json
+from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock
 
 from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
 from channels.testing import WebsocketCommunicator
 from django.contrib.auth import get_user_model
 from django.http import HttpRequest
 from django.test import TransactionTestCase
 from app.models import Room, RoomParticipant, GuestAccess, User
 from app.consumers.student_live_quiz_consumer import StudentQuizConsumer
+from app.live.rooms import get_live_room, discard_live_room
 from django.contrib.sessions.middleware import SessionMiddleware
 
 from django.contrib.sessions.backends.db import SessionStore
@@ -72,6 +75,9 @@ class StudentQuizConsumerTests(TransactionTestCase):
 
         self.consumer = StudentQuizConsumer()
 
+    def tearDown(self):
+        discard_live_room("ABCD1234")
+
     def test_guest_saves_numerical_range_response(self):
         """Test that a guest can save a numerical range response"""
         answer = "7.0"  # Guest provides an answer within the range
@@ -471,7 +477,7 @@ class StudentQuizConsumerTests(TransactionTestCase):
         
         # Verify response was saved correctly
 
-        self.assertEqual(response.answer, 3.14)
+        self.assertEqual(response.answer, Decimal("3.14"))
 
     async def test_save_text_response(self):
         """Test saving a text response"""
@@ -540,4 +546,164 @@ class StudentQuizConsumerTests(TransactionTestCase):
 
     
 
-            
\ No newline at end of file
+            
+
+    async def test_submitted_answer_is_acknowledged_and_written_on_flush(self):
+        """Test that answers are acknowledged straight away and written in a batch"""
+        self.room.quiz = self.quiz
+        await database_sync_to_async(self.room.save)()
+        communicator = await self._create_communicator(user=self.student)
+        await communicator.connect()
+
+        await communicator.send_json_to({
+            "action": "submit_answer",
+            "question_number": 1,
+            "answer": 2,
+            "question_id": self.integer_question.id,
+            "question_type": "integer",
+        })
+        response = None
+        while True:
+            response = await communicator.receive_json_from()
+            if response.get("type") == "answer_ack":
+                break
+        self.assertEqual(response["question_id"], self.integer_question.id)
+
+        live_room = get_live_room("ABCD1234")
+        self.assertEqual(live_room.ingestor.queue_depth, 1)
+        await live_room.flush_responses()
+
+        saved = await database_sync_to_async(IntegerInputResponse.objects.get)(player=self.student, room=self.room)
+        self.assertEqual(saved.answer, 2)
+        self.assertEqual(live_room.ingestor.flushed, 1)
+        self.assertEqual(live_room.leaderboard.get(f"user:{self.student.id}").total_score, 10)
+
+        await communicator.disconnect()
+
+    async def test_invalid_answer_is_rejected(self):
+        """Test that an answer that cannot be converted is reported instead of buffered"""
+        communicator = await self._create_communicator(user=self.student)
+        await communicator.connect()
+
+        await communicator.send_json_to({
+            "action": "submit_answer",
+            "question_number": 1,
+            "answer": "not a number",
+            "question_id": self.integer_question.id,
+            "question_type": "integer",
+        })
+        response = None
+        while True:
+            response = await communicator.receive_json_from()
+            if "error" in response:
+                break
+        self.assertEqual(response["error"], "Invalid answer")
+        self.assertEqual(get_live_room("ABCD1234").ingestor.queue_depth, 0)
+
+        await communicator.disconnect()
+
+    async def test_answer_outside_the_field_range_is_rejected(self):
+        """Test that answers the database cannot store are rejected before they are acknowledged"""
+        communicator = await self._create_communicator(user=self.student)
+        await communicator.connect()
+
+        await communicator.send_json_to({
+            "action": "submit_answer",
+            "question_number": 1,
+            "answer": "9" * 40,
+            "question_id": self.integer_question.id,
+            "question_type": "integer",
+        })
+        response = None
+        while True:
+            response = await communicator.receive_json_from()
+            if "error" in response or response.get("type") == "answer_ack":
+                break
+        self.assertEqual(response.get("error"), "Invalid answer")
+        self.assertEqual(get_live_room("ABCD1234").ingestor.queue_depth, 0)
+
+        await communicator.disconnect()
+
+    async def test_non_finite_range_answer_is_rejected(self):
+        """Test that nan and infinite range answers are rejected before they are counted or buffered"""
+        communicator = await self._create_communicator(user=self.student)
+        await communicator.connect()
+
+        for answer in ["nan", "inf", "1e400"]:
+            await communicator.send_json_to({
+                "action": "submit_answer",
+                "question_number": 1,
+                "answer": answer,
+                "question_id": self.nr_question.id,
+                "question_type": "numerical_range",
+            })
+            response = None
+            while True:
+                response = await communicator.receive_json_from()
+                if "error" in response or response.get("type") == "answer_ack":
+                    break
+            self.assertEqual(response.get("error"), "Invalid answer")
+        live_room = get_live_room("ABCD1234")
+        self.assertEqual(live_room.ingestor.queue_depth, 0)
+        self.assertIsNone(live_room.distributions.get(("numerical_range", self.nr_question.id)))
+
+        await communicator.disconnect()
+
+    async def test_broadcast_frame_is_forwarded_unchanged(self):
+        """Test that a pre-encoded group message reaches the socket as it was sent"""
+        communicator = await self._create_communicator(user=self.student)
+        await communicator.connect()
+
+        text = json.dumps({"type": "show_stats", "correct_answer": "B"})
+        await get_channel_layer().group_send("student_ABCD1234", {"type": "broadcast_frame", "text": text})
+        received = None
+        while received != text:
+            received = await communicator.receive_from()
+        self.assertEqual(received, text)
+
+        await communicator.disconnect()
+
+    async def test_answer_after_question_closed_is_rejected(self):
+        """Test that answers arriving after the server clock closed the question are not saved"""
+        communicator = await self._create_communicator(user=self.student)
+        await communicator.connect()
+        live_room = get_live_room("ABCD1234")
+        live_room.clock.question_key = ("integer", self.integer_question.id)
+        live_room.clock.try_close()
+
+        await communicator.send_json_to({
+            "action": "submit_answer",
+            "question_number": 1,
+            "answer": 2,
+            "question_id": self.integer_question.id,
+            "question_type": "integer",
+        })
+        response = None
+        while True:
+            response = await communicator.receive_json_from()
+            if "error" in response:
+                break
+        self.assertEqual(response["error"], "Question closed")
+        self.assertEqual(live_room.ingestor.queue_depth, 0)
+
+        await communicator.disconnect()
+
+    async def test_rank_update_sends_personal_leaderboard(self):
+        """Test that students get the top rows and their own rank instead of the full board"""
+        communicator = await self._create_communicator(user=self.student)
+        await communicator.connect()
+        live_room = get_live_room("ABCD1234")
+        await live_room.get_leaderboard(self.room)
+
+        await get_channel_layer().group_send("student_ABCD1234", {"type": "rank_update", "answered_count": 0})
+        response = None
+        while True:
+            response = await communicator.receive_json_from()
+            if response.get("type") == "leaderboard_update":
+                break
+        self.assertEqual(response["me"]["participant"], self.student.email_address)
+        self.assertEqual(response["me"]["rank"], 1)
+        self.assertEqual(response["total_participants"], len(live_room.leaderboard))
+        self.assertLessEqual(len(response["leaderboard"]), 5)
+
+        await communicator.disconnect()
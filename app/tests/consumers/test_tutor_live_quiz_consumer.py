@@ -7,6 +7,7 @@ from django.test import TransactionTestCase
 from app.models import Room, RoomParticipant, GuestAccess, Quiz, IntegerInputQuestion, TrueFalseQuestion, \
     TextInputQuestion, DecimalInputQuestion, MultipleChoiceQuestion, NumericalRangeQuestion
 from app.consumers.tutor_live_quiz_consumer import TutorQuizConsumer
+from app.live.rooms import discard_live_room
 
 User = get_user_model()
 
@@ -92,6 +93,10 @@ class TutorQuizConsumerTests(TransactionTestCase):
             room=self.room
         )
 
+    def tearDown(self):
+        discard_live_room("ABCD1234")
+        discard_live_room("4321DCBA")
+
     async def test_connection(self):
         communicator = WebsocketCommunicator(
             TutorQuizConsumer.as_asgi(),
@@ -281,6 +286,33 @@ class TutorQuizConsumerTests(TransactionTestCase):
 
         await communicator.disconnect()
 
+    async def test_repeated_next_question_click_is_ignored(self):
+        communicator = WebsocketCommunicator(
+            TutorQuizConsumer.as_asgi(),
+            "/ws/live_quiz/ABCD1234/"
+        )
+        communicator.scope['user'] = self.tutor
+        communicator.scope['url_route'] = {'kwargs': {'join_code': 'ABCD1234'}}
+
+        await communicator.connect()
+
+        # Two clicks sent while question 1 was on screen
+        await communicator.send_json_to({"action": "next_question", "question_number": 1})
+        await communicator.send_json_to({"action": "next_question", "question_number": 1})
+
+        response = None
+        while True:
+            response = await communicator.receive_json_from()
+            if response.get("type") == "quiz_update":
+                break
+        self.assertEqual(response["message"]["question_number"], 2)
+        self.assertTrue(await communicator.receive_nothing(timeout=0.3))
+
+        room = await database_sync_to_async(Room.objects.get)(join_code="ABCD1234")
+        self.assertEqual(room.current_question_index, 1)
+
+        await communicator.disconnect()
+
     async def test_receive_end_quiz(self):
         communicator = WebsocketCommunicator(
             TutorQuizConsumer.as_asgi(),
@@ -0,0 +1,40 @@
+from django.test import SimpleTestCase, TestCase
+from app.helpers.analytics import ScoreAnalytics
+from app.models import User, Quiz, Room, RoomParticipant
+
+
+class ScoreAnalyticsTests(SimpleTestCase):
+    def test_summaries_of_scores(self):
+        analytics = ScoreAnalytics([0, 10, 20, 30, 40])
+        self.assertEqual(len(analytics), 5)
+        self.assertEqual(analytics.mean(), 20)
+        self.assertEqual(analytics.median(), 20)
+        self.assertEqual(
+            analytics.percentiles(),
+            [{"point": 25, "score": 10}, {"point": 50, "score": 20}, {"point": 75, "score": 30}, {"point": 90, "score": 36}],
+        )
+
+    def test_distribution_uses_equal_width_buckets(self):
+        buckets = ScoreAnalytics([0, 1, 5, 9, 10]).distribution(bins=2)
+        self.assertEqual(buckets, [{"label": "0-5", "count": 2}, {"label": "5-10", "count": 3}])
+
+    def test_no_scores(self):
+        analytics = ScoreAnalytics([])
+        self.assertEqual((analytics.mean(), analytics.median()), (0, 0))
+        self.assertEqual(analytics.percentiles((50,)), [{"point": 50, "score": 0}])
+        self.assertEqual(analytics.distribution(), [])
+
+
+class LoadScoreAnalyticsTests(TestCase):
+    def test_load_reads_the_students_saved_scores(self):
+        tutor = User.objects.create_user(email_address="tutor@example.com", first_name="T", last_name="U", role=User.TUTOR)
+        quiz = Quiz.objects.create(name="Quiz", tutor=tutor)
+        room = Room.objects.create(name="Room", quiz=quiz)
+        RoomParticipant.objects.create(room=room, user=tutor, score=100)
+        for i, score in enumerate([5, 15]):
+            student = User.objects.create_user(email_address=f"s{i}@example.com", first_name="S", last_name="U")
+            RoomParticipant.objects.create(room=room, user=student, score=score)
+
+        analytics = ScoreAnalytics.load(room)
+        self.assertEqual(sorted(analytics.scores.tolist()), [5, 15])
+        self.assertEqual(analytics.mean(), 10)
@@ -0,0 +1,94 @@
+from decimal import Decimal
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, TestCase
+from app.grading import CheckerCache
+from app.helpers.helper_functions import regrade_responses
+from app.models import User, Quiz, Room, RoomParticipant, TextInputQuestion, DecimalInputQuestion, \
+    MultipleChoiceQuestion, NumericalRangeQuestion, IntegerInputQuestion, TrueFalseQuestion, TextInputResponse
+
+
+class AnswerCheckerTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = CheckerCache(maxsize=2)
+
+    def test_text_ignores_case_and_whitespace(self):
+        checker = self.cache.get(TextInputQuestion(id=1, correct_answer="Photo synthesis"))
+        self.assertTrue(checker("  photo   SYNTHESIS "))
+        self.assertFalse(checker("photosynthesis"))
+
+    def test_decimal_compares_at_question_precision(self):
+        checker = self.cache.get(DecimalInputQuestion(id=1, correct_answer=Decimal("3.14")))
+        self.assertTrue(checker("3.14"))
+        self.assertTrue(checker(3.141))
+        self.assertFalse(checker("3.15"))
+        with self.assertRaises(ValidationError):
+            checker("pi")
+
+    def test_multiple_choice_options_are_stripped(self):
+        checker = self.cache.get(MultipleChoiceQuestion(id=1, options=[" A", "B "], correct_answer="B"))
+        self.assertTrue(checker.is_option("A"))
+        self.assertFalse(checker.is_option("C"))
+        self.assertTrue(checker(" B"))
+
+    def test_range_and_exact_checkers(self):
+        in_range = self.cache.get(NumericalRangeQuestion(id=1, min_value=10, max_value=20))
+        self.assertTrue(in_range(10))
+        self.assertFalse(in_range("20.5"))
+        integer = self.cache.get(IntegerInputQuestion(id=1, correct_answer=4))
+        self.assertTrue(integer("4"))
+        true_false = self.cache.get(TrueFalseQuestion(id=1, correct_answer=True))
+        self.assertFalse(true_false(False))
+
+    def test_question_is_compiled_once(self):
+        question = TextInputQuestion(id=1, correct_answer="yes")
+        first = self.cache.get(question)
+        self.assertIs(self.cache.get(question), first)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_editing_the_answer_compiles_a_new_checker(self):
+        question = TextInputQuestion(id=1, correct_answer="yes")
+        self.assertTrue(self.cache.get(question)("yes"))
+        question.correct_answer = "no"
+        self.assertFalse(self.cache.get(question)("yes"))
+
+    def test_least_recently_used_checker_is_evicted(self):
+        first = TextInputQuestion(id=1, correct_answer="a")
+        second = TextInputQuestion(id=2, correct_answer="b")
+        third = TextInputQuestion(id=3, correct_answer="c")
+        self.cache.get(first)
+        self.cache.get(second)
+        self.cache.get(first)
+        self.cache.get(third)
+        self.assertEqual(len(self.cache), 2)
+        self.cache.get(first)
+        self.assertEqual(self.cache.misses, 3)
+        self.cache.get(second)
+        self.assertEqual(self.cache.misses, 4)
+
+
+class RegradeResponsesTests(TestCase):
+    def setUp(self):
+        tutor = User.objects.create_user(email_address="tutor@example.com", first_name="T", last_name="U", role=User.TUTOR)
+        self.student = User.objects.create_user(email_address="student@example.com", first_name="S", last_name="U")
+        quiz = Quiz.objects.create(name="Quiz", subject="Science", difficulty="E", type="L", tutor=tutor)
+        self.room = Room.objects.create(name="Room", quiz=quiz)
+        self.participant = RoomParticipant.objects.create(room=self.room, user=self.student)
+        self.question = TextInputQuestion.objects.create(
+            quiz=quiz, question_text="Gas plants absorb?", correct_answer="oxygen", time=10, mark=5
+        )
+
+    def test_fixed_answer_key_regrades_and_rescores(self):
+        response = TextInputResponse.objects.create(
+            player=self.student, room=self.room, question=self.question, answer="Carbon dioxide"
+        )
+        self.assertFalse(response.correct)
+
+        self.question.correct_answer = "carbon dioxide"
+        self.question.save()
+        self.assertEqual(regrade_responses(self.room), 1)
+
+        response.refresh_from_db()
+        self.participant.refresh_from_db()
+        self.assertTrue(response.correct)
+        self.assertEqual(self.participant.score, 5)
+        self.assertEqual(regrade_responses(self.room), 0)
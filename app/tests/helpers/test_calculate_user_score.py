@@ -149,3 +149,13 @@ class TestCalculateUserScore(TestCase):
 
     def test_null_calculate_user_score(self):
         self.assertEqual(calculate_user_base_score(None, None), 0)
+
+    def test_score_reads_stored_grades_without_loading_questions(self):
+        TrueFalseResponse.objects.create(player=self.player1, room=self.room, question=self.tf_question, answer=True)
+        IntegerInputResponse.objects.create(player=self.player1, room=self.room, question=self.int_question, answer=7)
+        NumericalRangeResponse.objects.create(player=self.player1, room=self.room, question=self.range_question, answer=10)
+
+        # one query per response type, plus the participant score update
+        with self.assertNumQueries(7):
+            score = calculate_user_score(self.player1, self.room)
+        self.assertEqual(score, 15 + 2)
@@ -0,0 +1,79 @@
+from decimal import Decimal
+from io import BytesIO
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from app.helpers.question_csv import import_question_csv
+from app.models import User, Quiz, IntegerInputQuestion, TrueFalseQuestion, TextInputQuestion, DecimalInputQuestion, \
+    MultipleChoiceQuestion, NumericalRangeQuestion
+
+HEADER = "type,question_text,time,mark,correct_answer,options,min_value,max_value\n"
+
+
+class QuestionCsvTestCase(TestCase):
+    def setUp(self):
+        self.tutor = User.objects.create_user(
+            email_address='tutor@example.com',
+            first_name='Tutor',
+            last_name='User',
+            role=User.TUTOR
+        )
+        self.quiz = Quiz.objects.create(name="Quiz", tutor=self.tutor)
+        IntegerInputQuestion.objects.create(quiz=self.quiz, question_text="Existing", correct_answer=1, mark=1, position=3)
+
+    def _import(self, rows):
+        return import_question_csv(self.quiz, BytesIO((HEADER + rows).encode('utf-8')))
+
+    def test_every_question_type_is_added_after_existing_questions(self):
+        created, errors = self._import(
+            "integer,2+2?,20,1,4,,,\n"
+            "true_false,Sky is blue?,,2,true,,,\n"
+            "text,Capital of France?,,3,Paris,,,\n"
+            "decimal,Pi?,,4,3.14,,,\n"
+            "multiple_choice,Pick B,,5,B,A|B|C,,\n"
+            "numerical_range,Between 1 and 2,,6,,,1,2\n"
+        )
+        self.assertEqual((created, errors), (6, []))
+        questions = Quiz.objects.get(pk=self.quiz.pk).get_all_questions()
+        self.assertEqual([q.position for q in questions], [3, 4, 5, 6, 7, 8, 9])
+        self.assertEqual(
+            [type(q) for q in questions[1:]],
+            [IntegerInputQuestion, TrueFalseQuestion, TextInputQuestion, DecimalInputQuestion,
+             MultipleChoiceQuestion, NumericalRangeQuestion]
+        )
+        self.assertEqual(questions[1].time, 20)
+        self.assertEqual(questions[2].time, 30)
+        self.assertIs(questions[2].correct_answer, True)
+        self.assertEqual(questions[4].correct_answer, Decimal("3.14"))
+        self.assertEqual(questions[5].options, ["A", "B", "C"])
+        self.assertEqual((questions[6].min_value, questions[6].max_value), (1, 2))
+        self.assertEqual(list(self.quiz.items.values_list('position', flat=True)), list(range(1, 8)))
+
+    def test_invalid_rows_are_reported_and_valid_rows_kept(self):
+        created, errors = self._import(
+            "integer,Fine,,1,4,,,\n"
+            "integer,Not a number,,1,four,,,\n"
+            "essay,Unknown,,1,x,,,\n"
+            "multiple_choice,Missing answer,,1,D,A|B,,\n"
+        )
+        self.assertEqual(created, 1)
+        self.assertEqual([row for row, _ in errors], [3, 4, 5])
+        self.assertIn("correct_answer: Correct answer must be an integer.", errors[0][1])
+        self.assertEqual(errors[1][1], "Unknown question type 'essay'")
+        self.assertIn("matches one of the options", errors[2][1])
+
+    def test_missing_columns_are_rejected(self):
+        with self.assertRaisesMessage(ValueError, "missing mark"):
+            import_question_csv(self.quiz, BytesIO(b"type,question_text\ninteger,2+2?\n"))
+
+    def test_rows_are_validated_without_queries(self):
+        def count(rows):
+            with CaptureQueriesContext(connection) as queries:
+                self._import(rows)
+            return len(queries)
+
+        # The first import adds text questions, which the later manifest reads then include
+        count("integer,Q,,1,4,,,\ntext,Q,,1,x,,,\n")
+        small = count("integer,Q,,1,4,,,\ntext,Q,,1,x,,,\n")
+        large = count("integer,Q,,1,4,,,\ntext,Q,,1,x,,,\n" * 50)
+        self.assertEqual(small, large)
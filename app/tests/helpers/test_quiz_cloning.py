@@ -0,0 +1,81 @@
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from app.helpers.quiz_cloning import clone_quiz
+from app.models import User, Quiz, QuizItem, IntegerInputQuestion, TrueFalseQuestion, TextInputQuestion, \
+    MultipleChoiceQuestion
+
+
+class CloneQuizTestCase(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email_address='owner@example.com',
+            first_name='Owner',
+            last_name='Tutor',
+            role=User.TUTOR
+        )
+        self.tutor = User.objects.create_user(
+            email_address='tutor@example.com',
+            first_name='Tutor',
+            last_name='User',
+            role=User.TUTOR
+        )
+
+    def _quiz(self, questions_per_type):
+        quiz = Quiz.objects.create(name="Public", subject="Maths", difficulty="E", type="L", is_public=True, tutor=self.owner)
+        position = iter(range(1, 4 * questions_per_type + 1))
+        for _ in range(questions_per_type):
+            IntegerInputQuestion.objects.bulk_create([IntegerInputQuestion(quiz=quiz, question_text="2+2?", correct_answer=4, mark=1, position=next(position))])
+            TrueFalseQuestion.objects.bulk_create([TrueFalseQuestion(quiz=quiz, question_text="True?", correct_answer=True, mark=1, position=next(position))])
+            TextInputQuestion.objects.bulk_create([TextInputQuestion(quiz=quiz, question_text="Capital?", correct_answer="Paris", mark=1, position=next(position))])
+            MultipleChoiceQuestion.objects.bulk_create([MultipleChoiceQuestion(quiz=quiz, question_text="Pick", options=["A", "B"], correct_answer="A", mark=1, position=next(position))])
+        Quiz.content_changed(quiz.id)
+        return quiz
+
+    def test_clone_copies_every_question_in_order(self):
+        quiz = self._quiz(2)
+        original = quiz.get_all_questions()
+        clone = clone_quiz(quiz, self.tutor)
+
+        self.assertEqual(clone.tutor, self.tutor)
+        self.assertEqual(clone.name, "Copy of Public")
+        copies = Quiz.objects.get(pk=clone.pk).get_all_questions()
+        self.assertEqual([type(question) for question in copies], [type(question) for question in original])
+        self.assertEqual([question.position for question in copies], [question.position for question in original])
+        self.assertTrue(all(copy.quiz_id == clone.pk and copy.pk for copy in copies))
+        self.assertEqual(list(clone.items.values_list('position', flat=True)), list(range(1, 9)))
+        self.assertEqual(QuizItem.objects.filter(quiz=quiz).count(), 8)
+
+    def test_cloning_a_200_question_quiz_uses_a_constant_number_of_queries(self):
+        clone_quiz(self._quiz(1), self.tutor)
+        quiz = self._quiz(1)
+        with self.assertNumQueries(13):
+            clone_quiz(quiz, self.tutor)
+
+        quiz = self._quiz(50)
+        with self.assertNumQueries(13):
+            clone = clone_quiz(quiz, self.tutor)
+        self.assertEqual(clone.items.count(), 200)
+
+    def test_copies_share_images_until_the_last_reference_goes(self):
+        quiz = Quiz.objects.create(name="Public", is_public=True, tutor=self.owner)
+        question = IntegerInputQuestion.objects.create(
+            quiz=quiz, question_text="2+2?", correct_answer=4, mark=1,
+            image=SimpleUploadedFile("shared.jpg", b"cloned image content", content_type="image/jpeg")
+        )
+        name = question.image.name
+        self.assertTrue(name.startswith("questions_images/") and "shared" not in name)
+
+        copy = clone_quiz(quiz, self.tutor).get_all_questions()[0]
+        self.assertEqual(copy.image.name, name)
+        question.delete()
+        self.assertTrue(default_storage.exists(name))
+
+        same_upload = IntegerInputQuestion.objects.create(
+            quiz=quiz, question_text="Again", correct_answer=4, mark=1,
+            image=SimpleUploadedFile("again.jpg", b"cloned image content", content_type="image/jpeg")
+        )
+        self.assertEqual(same_upload.image.name, name)
+        same_upload.delete()
+        copy.delete()
+        self.assertFalse(default_storage.exists(name))
@@ -0,0 +1,96 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from app.helpers.helper_functions import create_quiz_stats, regrade_responses, update_room_scores
+from app.live.leaderboard import LeaderboardEngine
+from app.models import User, Quiz, Room, RoomParticipant, TrueFalseQuestion, IntegerInputQuestion, \
+    TrueFalseResponse, IntegerInputResponse, Stats
+from app.models.stats import QuestionStats
+
+
+class CreateQuizStatsTests(TestCase):
+    def setUp(self):
+        tutor = User.objects.create_user(email_address="tutor@example.com", first_name="T", last_name="U", role=User.TUTOR)
+        self.quiz = Quiz.objects.create(name="Quiz", subject="Maths", difficulty="E", type="L", tutor=tutor)
+        self.room = Room.objects.create(name="Room", quiz=self.quiz)
+        RoomParticipant.objects.create(room=self.room, user=tutor)
+        self.tf_question = TrueFalseQuestion.objects.create(
+            quiz=self.quiz, question_text="True?", correct_answer=True, time=10, mark=5
+        )
+        self.int_question = IntegerInputQuestion.objects.create(
+            quiz=self.quiz, question_text="2+2?", correct_answer=4, time=10, mark=10
+        )
+        self.unanswered = TrueFalseQuestion.objects.create(
+            quiz=self.quiz, question_text="False?", correct_answer=False, time=10, mark=5
+        )
+        self.count = 0
+
+    def add_student(self, tf_answer, int_answer):
+        self.count += 1
+        student = User.objects.create_user(email_address=f"s{self.count}@example.com", first_name="S", last_name="U")
+        RoomParticipant.objects.create(room=self.room, user=student)
+        TrueFalseResponse.objects.create(room=self.room, player=student, question=self.tf_question, answer=tf_answer)
+        IntegerInputResponse.objects.create(room=self.room, player=student, question=self.int_question, answer=int_answer)
+        return student
+
+    def test_create_quiz_stats_writes_room_and_question_stats(self):
+        self.add_student(True, 4)
+        self.add_student(False, 4)
+        update_room_scores(self.room)
+        create_quiz_stats(self.room)
+
+        stats = Stats.objects.get(room=self.room)
+        self.assertEqual(stats.num_participants, 2)
+        self.assertEqual(stats.mean_score, 12.5)
+        by_question = {qs.question: qs for qs in QuestionStats.objects.filter(room=self.room)}
+        self.assertEqual(len(by_question), 3)
+        self.assertEqual(by_question[self.tf_question].correct_responses, 1)
+        self.assertEqual(by_question[self.tf_question].percentage_correct, 50)
+        self.assertEqual(by_question[self.int_question].correct_responses, 2)
+        self.assertEqual(by_question[self.unanswered].responses_received, 0)
+
+    def test_query_count_does_not_grow_with_the_room(self):
+        def count_queries():
+            Stats.objects.filter(room=self.room).delete()
+            QuestionStats.objects.filter(room=self.room).delete()
+            with CaptureQueriesContext(connection) as queries:
+                create_quiz_stats(self.room)
+            return len(queries)
+
+        self.add_student(True, 4)
+        small = count_queries()
+        for _ in range(10):
+            self.add_student(False, 4)
+        self.assertEqual(count_queries(), small)
+
+    def test_empty_room(self):
+        stats = create_quiz_stats(self.room)
+        self.assertEqual(stats.num_participants, 0)
+        self.assertEqual(stats.mean_score, 0)
+
+    def test_stats_are_built_from_grouped_queries(self):
+        self.add_student(True, 4)
+        self.add_student(False, 3)
+        # Participant scores, the quiz index, one grouped count per response table, two bulk inserts
+        with self.assertNumQueries(1 + 1 + 6 + 2):
+            stats = create_quiz_stats(self.room)
+        self.assertEqual(stats.num_participants, 2)
+        counts = {qs.question: (qs.responses_received, qs.correct_responses) for qs in QuestionStats.objects.filter(room=self.room)}
+        self.assertEqual(counts, {self.tf_question: (2, 1), self.int_question: (2, 1), self.unanswered: (0, 0)})
+
+    def test_regrade_leaves_stats_from_the_live_leaderboard_unchanged(self):
+        student = self.add_student(True, 4)
+        TrueFalseResponse.objects.create(room=self.room, player=student, question=self.unanswered, answer=False)
+        self.add_student(False, 4)
+        # Scores as the live quiz checkpoints them, streak bonuses included
+        engine = LeaderboardEngine.load(self.room)
+        LeaderboardEngine.save_scores(engine.pop_dirty())
+        stats = create_quiz_stats(self.room)
+
+        # A stale stored grade makes the regrade rescore the whole room
+        TrueFalseResponse.objects.filter(player=student, question=self.tf_question).update(correct=False)
+        self.assertEqual(regrade_responses(self.room), 1)
+
+        regraded = Stats.objects.get(pk=stats.pk)
+        self.assertEqual((regraded.mean_score, regraded.median_score), (stats.mean_score, stats.median_score))
+        self.assertEqual(RoomParticipant.objects.get(room=self.room, user=student).score, 5 + 10 + 5 + 2)
@@ -0,0 +1,117 @@
+import base64
+import json
+from decimal import Decimal
+from io import StringIO
+from tempfile import TemporaryDirectory
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from app.helpers.quiz_transfer import export_quizzes, import_quizzes
+from app.image_store import content_address
+from app.models import User, Quiz, QuizItem, IntegerInputQuestion, TrueFalseQuestion, TextInputQuestion, \
+    DecimalInputQuestion, MultipleChoiceQuestion, NumericalRangeQuestion
+
+
+class QuizTransferTestCase(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email_address='owner@example.com',
+            first_name='Owner',
+            last_name='Tutor',
+            role=User.TUTOR
+        )
+        self.tutor = User.objects.create_user(
+            email_address='tutor@example.com',
+            first_name='Tutor',
+            last_name='User',
+            role=User.TUTOR
+        )
+        self.quiz = Quiz.objects.create(name="Bank", subject="Maths", difficulty="M", type="L", tutor=self.owner)
+        IntegerInputQuestion.objects.create(quiz=self.quiz, question_text="2+2?", correct_answer=4, mark=1, position=1)
+        TrueFalseQuestion.objects.create(quiz=self.quiz, question_text="True?", correct_answer=True, mark=2, position=2)
+        TextInputQuestion.objects.create(quiz=self.quiz, question_text="Capital?", correct_answer="Paris", mark=3, position=3)
+        DecimalInputQuestion.objects.create(quiz=self.quiz, question_text="Pi?", correct_answer=Decimal("3.14"), mark=4, position=4)
+        MultipleChoiceQuestion.objects.create(quiz=self.quiz, question_text="Pick", options=["A", "B"], correct_answer="B", mark=5, position=5)
+        NumericalRangeQuestion.objects.create(quiz=self.quiz, question_text="Range", min_value=1.5, max_value=2.5, mark=6, position=6, time=45)
+
+    def _summary(self, quiz):
+        return [
+            (type(question), question.question_text, question.mark, question.time, str(question.correct_answer))
+            for question in Quiz.objects.get(pk=quiz.pk).get_all_questions()
+        ]
+
+    def test_round_trip_keeps_every_question_type_and_order(self):
+        lines = list(export_quizzes([self.quiz]))
+        self.assertEqual(len(lines), 7)
+        self.assertEqual(json.loads(lines[0])["record"], "quiz")
+
+        [imported] = import_quizzes(lines, self.tutor)
+        self.assertEqual((imported.tutor, imported.name, imported.difficulty), (self.tutor, "Bank", "M"))
+        self.assertEqual(self._summary(imported), self._summary(self.quiz))
+        self.assertEqual(list(imported.items.values_list('position', flat=True)), [1, 2, 3, 4, 5, 6])
+
+    def test_import_inserts_in_bounded_batches(self):
+        lines = [line.encode() for line in export_quizzes([self.quiz])]
+        # A savepoint pair, one quiz insert, then two batches of three questions plus their index rows
+        with self.assertNumQueries(2 + 1 + 2 * (3 + 1)):
+            import_quizzes(lines, self.tutor, batch_size=3)
+        self.assertEqual(QuizItem.objects.filter(quiz__tutor=self.tutor).count(), 6)
+
+    def test_invalid_line_rolls_the_whole_import_back(self):
+        lines = list(export_quizzes([self.quiz]))
+        lines.insert(3, json.dumps({"record": "question", "question_type": "essay"}))
+        with self.assertRaisesMessage(ValueError, "Line 4: Unknown question type 'essay'"):
+            import_quizzes(lines, self.tutor)
+        lines[3] = json.dumps({"record": "question", "question_type": "integer", "question_text": "x", "mark": 1, "correct_answer": "four"})
+        with self.assertRaisesMessage(ValueError, "Line 4:"):
+            import_quizzes(lines, self.tutor)
+        self.assertFalse(Quiz.objects.filter(tutor=self.tutor).exists())
+
+    def test_images_are_bundled_once_and_restored_by_content(self):
+        for question in self.quiz.get_all_questions()[:2]:
+            question.image = SimpleUploadedFile("shared.jpg", b"transfer image", content_type="image/jpeg")
+            question.save()
+        name = Quiz.objects.get(pk=self.quiz.pk).get_all_questions()[0].image.name
+        self.addCleanup(default_storage.delete, name)
+
+        records = [json.loads(line) for line in export_quizzes([Quiz.objects.get(pk=self.quiz.pk)], include_images=True)]
+        self.assertEqual([record["record"] for record in records].count("image"), 1)
+        self.assertFalse(any('"image", "name"' in line for line in export_quizzes([self.quiz])))
+
+        records[1]["name"] = records[2]["image"] = records[3]["image"] = "questions_images/renamed.jpg"
+        [imported] = import_quizzes([json.dumps(record) for record in records], self.tutor)
+        self.assertEqual([question.image.name for question in imported.get_all_questions()[:2]], [name, name])
+
+    def test_rolled_back_import_removes_the_images_it_stored(self):
+        records = [json.loads(line) for line in export_quizzes([self.quiz])]
+        image = {"record": "image", "name": "questions_images/new.jpg", "content": base64.b64encode(b"rolled back image").decode()}
+        records[1]["image"] = image["name"]
+        records.insert(1, image)
+        records.append({"record": "question", "question_type": "essay"})
+        stored = content_address(ContentFile(b"rolled back image", name="new.jpg"), "questions_images")
+
+        with self.assertRaisesMessage(ValueError, "Line 9:"):
+            import_quizzes([json.dumps(record) for record in records], self.tutor)
+        self.assertFalse(default_storage.exists(stored))
+
+    def test_image_outside_the_record_types_folder_is_rejected(self):
+        records = [json.loads(line) for line in export_quizzes([self.quiz])]
+        records[1]["image"] = "quiz_thumbnail/cover.jpg"
+        with self.assertRaisesMessage(ValueError, "Line 2: Image 'quiz_thumbnail/cover.jpg' is not in questions_images/"):
+            import_quizzes([json.dumps(record) for record in records], self.tutor)
+
+        records = [json.loads(line) for line in export_quizzes([self.quiz])]
+        records[0]["image"] = "questions_images/../quiz_thumbnail/cover.jpg"
+        with self.assertRaisesMessage(ValueError, "Line 1:"):
+            import_quizzes([json.dumps(record) for record in records], self.tutor)
+
+    def test_management_commands_round_trip(self):
+        output = StringIO()
+        call_command("export_quizzes", "owner@example.com", stdout=output)
+        path = self.enterContext(TemporaryDirectory()) + "/bank.ndjson"
+        with open(path, "w") as file:
+            file.write(output.getvalue())
+        call_command("import_quizzes", "tutor@example.com", path, stdout=StringIO())
+        self.assertEqual(self._summary(Quiz.objects.get(tutor=self.tutor)), self._summary(self.quiz))
@@ -0,0 +1,73 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from app.helpers.helper_functions import score_room, get_leaderboard, update_room_scores, calculate_user_score, \
+    calculate_guest_score
+from app.live.leaderboard import LeaderboardEngine
+from app.models import User, Quiz, Room, RoomParticipant, GuestAccess, TrueFalseQuestion, IntegerInputQuestion, \
+    TrueFalseResponse, IntegerInputResponse
+
+
+class ScoreRoomTests(TestCase):
+    def setUp(self):
+        tutor = User.objects.create_user(email_address="tutor@example.com", first_name="T", last_name="U", role=User.TUTOR)
+        quiz = Quiz.objects.create(name="Quiz", subject="Maths", difficulty="E", type="L", tutor=tutor)
+        self.room = Room.objects.create(name="Room", quiz=quiz)
+        self.questions = [
+            TrueFalseQuestion.objects.create(quiz=quiz, question_text="True?", correct_answer=True, time=10, mark=5),
+            IntegerInputQuestion.objects.create(quiz=quiz, question_text="2+2?", correct_answer=4, time=10, mark=5),
+            TrueFalseQuestion.objects.create(quiz=quiz, question_text="False?", correct_answer=False, time=10, mark=5),
+        ]
+        self.count = 0
+
+    def add_student(self, answers=(True, 4, False)):
+        self.count += 1
+        student = User.objects.create_user(
+            email_address=f"student{self.count}@example.com", first_name="S", last_name="U"
+        )
+        RoomParticipant.objects.create(room=self.room, user=student)
+        self.answer(answers, player=student)
+        return student
+
+    def add_guest(self, answers=(True, 4, False)):
+        self.count += 1
+        guest = GuestAccess.objects.create(session_id=f"guest-session-{self.count}")
+        RoomParticipant.objects.create(room=self.room, guest_access=guest)
+        self.answer(answers, guest_access=guest)
+        return guest
+
+    def answer(self, answers, **owner):
+        tf_first, integer, tf_last = self.questions
+        TrueFalseResponse.objects.create(room=self.room, question=tf_first, answer=answers[0], **owner)
+        IntegerInputResponse.objects.create(room=self.room, question=integer, answer=answers[1], **owner)
+        TrueFalseResponse.objects.create(room=self.room, question=tf_last, answer=answers[2], **owner)
+
+    def count_queries(self, func):
+        with CaptureQueriesContext(connection) as queries:
+            func(self.room)
+        return len(queries)
+
+    def test_scores_match_per_participant_scoring(self):
+        student = self.add_student()
+        streak_broken = self.add_student(answers=(True, 3, False))
+        guest = self.add_guest()
+        scores = score_room(self.room)
+        self.assertEqual(scores[(student.id, None)][1], calculate_user_score(student, self.room))
+        self.assertEqual(scores[(streak_broken.id, None)], (10, 10))
+        self.assertEqual(scores[(None, guest.id)][1], calculate_guest_score(guest, self.room))
+        self.assertEqual(scores[(student.id, None)], (15, 17))
+
+    def test_guests_are_scored_on_the_leaderboard(self):
+        self.add_guest()
+        self.assertEqual(get_leaderboard(self.room)[0]["score"], 17)
+
+    def test_query_count_does_not_grow_with_participants(self):
+        self.add_student()
+        self.add_guest()
+        small = [self.count_queries(func) for func in (score_room, get_leaderboard, update_room_scores, LeaderboardEngine.load)]
+        for _ in range(10):
+            self.add_student()
+            self.add_guest()
+        large = [self.count_queries(func) for func in (score_room, get_leaderboard, update_room_scores, LeaderboardEngine.load)]
+        self.assertEqual(small, large)
+        self.assertEqual(small[0], 1)
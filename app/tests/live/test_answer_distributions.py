@@ -0,0 +1,105 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from channels.layers import get_channel_layer
+from django.test import SimpleTestCase
+from app.live.distributions import AnswerDistributions, TextDistribution, HistogramDistribution
+from app.live.leaderboard import LeaderboardEngine
+from app.live.rooms import LiveRoom
+from app.models import MultipleChoiceQuestion, TrueFalseQuestion, IntegerInputQuestion, NumericalRangeQuestion, \
+    TextInputQuestion, MultipleChoiceResponse, TrueFalseResponse, IntegerInputResponse, NumericalRangeResponse, \
+    TextInputResponse
+
+
+class AnswerDistributionsTestCase(SimpleTestCase):
+    def setUp(self):
+        self.distributions = AnswerDistributions()
+
+    def _buckets(self, key):
+        return {bucket["label"]: bucket["count"] for bucket in self.distributions.message(key)["buckets"]}
+
+    def test_multiple_choice_and_true_false_counts(self):
+        question = MultipleChoiceQuestion(id=1, options=["A", "B ", "C"], correct_answer="B")
+        for answer in ["A", "B", " B", "C", "D"]:
+            self.distributions.record(MultipleChoiceResponse(question=question, answer=answer))
+        self.assertEqual(self._buckets(("multiple_choice", 1)), {"A": 1, "B": 2, "C": 1})
+
+        true_false = TrueFalseQuestion(id=1, correct_answer=True)
+        for answer in [True, True, False]:
+            self.distributions.record(TrueFalseResponse(question=true_false, answer=answer))
+        self.assertEqual(self._buckets(("true_false", 1)), {"True": 2, "False": 1})
+
+    def test_numeric_answers_are_bucketed(self):
+        integer = IntegerInputQuestion(id=1, correct_answer=4)
+        for answer in [4, 4, 5, -100, 100]:
+            self.distributions.record(IntegerInputResponse(question=integer, answer=answer))
+        buckets = self._buckets(("integer", 1))
+        self.assertEqual(buckets["4"], 2)
+        self.assertEqual(buckets["5"], 1)
+        self.assertEqual(sum(buckets.values()), 5)
+
+        in_range = NumericalRangeQuestion(id=1, min_value=10, max_value=20)
+        for answer in [12.5, 15, 25, 5, 35]:
+            self.distributions.record(NumericalRangeResponse(question=in_range, answer=answer))
+        message = self.distributions.message(("numerical_range", 1))
+        self.assertEqual(message["kind"], "histogram")
+        self.assertEqual(message["total"], 5)
+        self.assertEqual(message["buckets"][-1], {"label": ">= 30", "count": 1})
+
+    def test_histogram_ranges(self):
+        histogram = HistogramDistribution(0, 10, 5)
+        for value in [0, 1.9, 2, 9.99, 10, -0.1]:
+            histogram.add(value)
+        self.assertEqual(histogram.counts, [2, 1, 0, 0, 1])
+        self.assertEqual((histogram.below, histogram.above), (1, 1))
+
+    def test_histogram_ignores_non_finite_answers(self):
+        histogram = HistogramDistribution(0, 10, 5)
+        for value in [float("nan"), float("inf"), float("-inf"), "nan"]:
+            self.assertFalse(histogram.add(value))
+        self.assertEqual(histogram.total, 0)
+        self.assertEqual((histogram.below, histogram.above), (0, 0))
+
+    def test_text_answers_keep_the_top_k_in_bounded_memory(self):
+        text = TextDistribution(capacity=3, top_k=2)
+        for answer in ["Paris", "paris ", " PARIS"] * 7 + ["Lyon"] * 10 + [f"guess {i}" for i in range(10)]:
+            text.add(answer)
+        self.assertLessEqual(len(text.counts), 3)
+        self.assertEqual(text.buckets()[0], {"label": "Paris", "count": 21})
+        self.assertEqual(len(text.buckets()), 2)
+        self.assertEqual(text.total, 41)
+
+        question = TextInputQuestion(id=1, correct_answer="Paris")
+        self.distributions.record(TextInputResponse(question=question, answer=" Paris"))
+        self.assertEqual(self._buckets(("text", 1)), {"Paris": 1})
+
+    def test_only_changed_distributions_are_popped(self):
+        question = TrueFalseQuestion(id=1, correct_answer=True)
+        self.assertIsNone(self.distributions.pop_changed(("true_false", 1)))
+        self.distributions.record(TrueFalseResponse(question=question, answer=True))
+        self.assertEqual(self.distributions.pop_changed(("true_false", 1))["total"], 1)
+        self.assertIsNone(self.distributions.pop_changed(("true_false", 1)))
+
+    async def test_changed_distribution_is_pushed_with_the_coalesced_update(self):
+        channel_layer = get_channel_layer()
+        live_room = LiveRoom("DIST0001")
+        live_room.leaderboard = LeaderboardEngine()
+        live_room.current_question = SimpleNamespace(question_type="true_false", id=1)
+        tutor_channel = await channel_layer.new_channel()
+        await channel_layer.group_add("live_quiz_DIST0001", tutor_channel)
+
+        question = TrueFalseQuestion(id=1, correct_answer=True)
+        for answer in [True, False, True]:
+            live_room.distributions.record(TrueFalseResponse(question=question, answer=answer))
+        await live_room.flush_leaderboard_update()
+        await live_room.flush_leaderboard_update()
+
+        frames = []
+        while True:
+            try:
+                message = await asyncio.wait_for(channel_layer.receive(tutor_channel), timeout=0.1)
+            except asyncio.TimeoutError:
+                break
+            frames.append(json.loads(message["text"])["type"])
+        self.assertEqual(frames, ["leaderboard_update", "answer_distribution", "leaderboard_update"])
+        live_room.close()
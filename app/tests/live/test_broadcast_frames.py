@@ -0,0 +1,39 @@
+import json
+from io import StringIO
+from django.core.management import call_command
+from unittest.mock import patch
+from django.test import SimpleTestCase
+from app.live import frames
+from app.live.frames import encode, frame_event, question_update_message
+
+
+class BroadcastFramesTestCase(SimpleTestCase):
+    def test_frame_event_carries_encoded_text(self):
+        message = {"type": "show_stats", "correct_answer": "B", "responses_received": 3}
+        event = frame_event(message)
+        self.assertEqual(event["type"], "broadcast_frame")
+        self.assertEqual(json.loads(event["text"]), message)
+
+    def test_encode_matches_json(self):
+        message = {"type": "leaderboard_update", "leaderboard": [{"rank": 1, "participant": "é", "score": 5}]}
+        self.assertEqual(json.loads(encode(message)), message)
+
+    def test_encode_falls_back_to_json_without_orjson(self):
+        message = {"type": "answer_ack", "question_id": 3}
+        with patch.object(frames, "orjson", None):
+            self.assertEqual(encode(message), json.dumps(message))
+
+    def test_question_update_message_defaults(self):
+        message = question_update_message({"question": "Q", "question_id": 1})
+        self.assertEqual(message["type"], "question_update")
+        self.assertEqual(message["question_type"], "multiple_choice")
+        self.assertEqual(message["items"], [])
+        self.assertEqual(message["image"], "")
+
+    def test_bench_broadcast_command_prints_table(self):
+        out = StringIO()
+        call_command("bench_broadcast", sizes=[5], rounds=1, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertIn("encode", lines[0])
+        self.assertIn("members", lines[1])
+        self.assertTrue(lines[2].strip().startswith("5"))
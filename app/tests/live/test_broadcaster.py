@@ -0,0 +1,72 @@
+import asyncio
+import json
+from channels.layers import get_channel_layer
+from django.test import SimpleTestCase
+from django.utils import timezone
+from app.live.leaderboard import LeaderboardEngine
+from app.live.rooms import LiveRoom
+
+
+class LeaderboardBroadcasterTestCase(SimpleTestCase):
+    async def _setup(self):
+        self.channel_layer = get_channel_layer()
+        self.live_room = LiveRoom("BCAST001")
+        self.live_room.leaderboard = LeaderboardEngine()
+        self.live_room.leaderboard.add_participant("user:1", 1, "student@example.com", timezone.now())
+        self.live_room.broadcaster.tick = 0.05
+        self.tutor_channel = await self.channel_layer.new_channel()
+        self.student_channel = await self.channel_layer.new_channel()
+        await self.channel_layer.group_add("live_quiz_BCAST001", self.tutor_channel)
+        await self.channel_layer.group_add("student_BCAST001", self.student_channel)
+
+    async def _pending_messages(self, channel):
+        messages = []
+        while True:
+            try:
+                messages.append(await asyncio.wait_for(self.channel_layer.receive(channel), timeout=0.1))
+            except asyncio.TimeoutError:
+                return messages
+
+    async def test_burst_of_requests_is_coalesced_into_one_push(self):
+        await self._setup()
+        for _ in range(300):
+            self.live_room.request_leaderboard_update()
+        await asyncio.sleep(0.1)
+
+        tutor_messages = await self._pending_messages(self.tutor_channel)
+        student_messages = await self._pending_messages(self.student_channel)
+        self.assertEqual(len(tutor_messages), 1)
+        self.assertEqual(len(student_messages), 1)
+        self.assertEqual(tutor_messages[0]["type"], "broadcast_frame")
+        self.assertEqual(student_messages[0]["type"], "rank_update")
+        payload = json.loads(tutor_messages[0]["text"])
+        self.assertEqual(payload["type"], "leaderboard_update")
+        self.assertEqual(payload["leaderboard"][0]["participant"], "student@example.com")
+        self.assertEqual(self.live_room.broadcaster.requests, 300)
+        self.assertEqual(self.live_room.broadcaster.flushes, 1)
+
+    async def test_flush_now_sends_immediately_and_cancels_pending_tick(self):
+        await self._setup()
+        self.live_room.request_leaderboard_update()
+        await self.live_room.flush_leaderboard_update()
+        self.assertFalse(self.live_room.broadcaster.has_pending())
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(len(await self._pending_messages(self.tutor_channel)), 1)
+        self.assertEqual(self.live_room.broadcaster.flushes, 1)
+
+    async def test_requests_after_a_flush_schedule_a_new_tick(self):
+        await self._setup()
+        self.live_room.request_leaderboard_update()
+        await asyncio.sleep(0.1)
+        self.live_room.request_leaderboard_update()
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(len(await self._pending_messages(self.student_channel)), 2)
+
+    async def test_nothing_is_sent_before_the_leaderboard_exists(self):
+        await self._setup()
+        self.live_room.leaderboard = None
+        await self.live_room.flush_leaderboard_update()
+
+        self.assertEqual(await self._pending_messages(self.tutor_channel), [])
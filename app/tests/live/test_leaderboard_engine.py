@@ -0,0 +1,124 @@
+from django.test import TestCase
+from django.utils import timezone
+from app.helpers.helper_functions import calculate_user_score
+from app.live.leaderboard import LeaderboardEngine, participant_key
+from app.models import User, Quiz, Room, RoomParticipant, GuestAccess, TrueFalseQuestion, TrueFalseResponse
+
+
+class LeaderboardEngineTestCase(TestCase):
+    def setUp(self):
+        self.tutor = User.objects.create_user(
+            email_address='tutor@example.com',
+            first_name='Tutor',
+            last_name='User',
+            role=User.TUTOR
+        )
+        self.student = User.objects.create_user(
+            email_address='student@example.com',
+            first_name='Student',
+            last_name='User',
+            role=User.STUDENT
+        )
+        self.quiz = Quiz.objects.create(name="Quiz", tutor=self.tutor)
+        self.room = Room.objects.create(name="Room", quiz=self.quiz)
+        self.guest = GuestAccess.objects.create(session_id="guest-session-id")
+        self.student_participant = RoomParticipant.objects.create(room=self.room, user=self.student)
+        self.guest_participant = RoomParticipant.objects.create(room=self.room, guest_access=self.guest)
+        RoomParticipant.objects.create(room=self.room, user=self.tutor)
+        self.questions = [
+            TrueFalseQuestion.objects.create(
+                quiz=self.quiz, question_text=f"Question {i}", correct_answer=True, mark=10, position=i
+            )
+            for i in range(1, 7)
+        ]
+
+    def test_record_answer_matches_calculate_user_score(self):
+        answers = [True, True, True, False, True, True]
+        engine = LeaderboardEngine()
+        key = participant_key(user_id=self.student.id)
+        engine.add_participant(key, self.student_participant.id, "student", timezone.now())
+        for question, answer in zip(self.questions, answers):
+            TrueFalseResponse.objects.create(player=self.student, room=self.room, question=question, answer=answer)
+            engine.record_answer(key, answer, question.mark)
+
+        entry = engine.get(key)
+        self.assertEqual(entry.total_score, calculate_user_score(self.student, self.room))
+        self.assertEqual(entry.base_score, 50)
+        self.assertEqual(entry.streak, 2)
+
+    def test_record_answer_for_unknown_participant_is_ignored(self):
+        engine = LeaderboardEngine()
+        self.assertIsNone(engine.record_answer("user:999", True, 10))
+
+    def test_load_replays_existing_responses(self):
+        TrueFalseResponse.objects.create(player=self.student, room=self.room, question=self.questions[0], answer=True)
+        TrueFalseResponse.objects.create(guest_access=self.guest, room=self.room, question=self.questions[0], answer=False)
+        engine = LeaderboardEngine.load(self.room)
+
+        self.assertEqual(len(engine), 2)
+        self.assertEqual(engine.get(participant_key(user_id=self.student.id)).total_score, 10)
+        self.assertEqual(engine.get(participant_key(guest_access_id=self.guest.id)).total_score, 0)
+
+    def test_leaderboard_orders_by_score_then_join_time(self):
+        engine = LeaderboardEngine.load(self.room)
+        leaderboard = engine.leaderboard()
+        self.assertEqual([entry["participant"] for entry in leaderboard], ["student@example.com", "Guest (guest-se)"])
+
+        engine.record_answer(participant_key(guest_access_id=self.guest.id), True, 10)
+        leaderboard = engine.leaderboard()
+        self.assertEqual(leaderboard[0], {"rank": 1, "participant": "Guest (guest-se)", "score": 10})
+        self.assertEqual(leaderboard[1]["rank"], 2)
+
+    def test_scores_are_only_written_on_save(self):
+        engine = LeaderboardEngine.load(self.room)
+        engine.record_answer(participant_key(user_id=self.student.id), True, 10)
+        self.student_participant.refresh_from_db()
+        self.assertEqual(self.student_participant.score, 0)
+
+        changes = engine.pop_dirty()
+        self.assertEqual(changes, {self.student_participant.id: 10})
+        with self.assertNumQueries(1):
+            LeaderboardEngine.save_scores(changes)
+        self.student_participant.refresh_from_db()
+        self.assertEqual(self.student_participant.score, 10)
+        self.assertEqual(engine.pop_dirty(), {})
+
+    def test_student_view_has_top_rows_and_own_neighbourhood(self):
+        engine = LeaderboardEngine()
+        start = timezone.now()
+        for i in range(10):
+            engine.add_participant(f"user:{i}", i, f"student{i}", start + timezone.timedelta(seconds=i))
+            for _ in range(10 - i):
+                engine.record_answer(f"user:{i}", True, 1)
+
+        view = engine.student_view("user:6", top_k=3)
+        self.assertEqual([row["participant"] for row in view["leaderboard"]], ["student0", "student1", "student2"])
+        self.assertEqual(view["total_participants"], 10)
+        self.assertEqual(view["me"]["rank"], 7)
+        self.assertEqual([row["rank"] for row in view["neighbors"]], [6, 8])
+        self.assertEqual(engine.rank_of("user:0"), 1)
+
+        first = engine.student_view("user:0", top_k=3)
+        self.assertEqual([row["rank"] for row in first["neighbors"]], [2])
+        self.assertNotIn("me", engine.student_view("user:99", top_k=3))
+
+    def test_ranking_is_refreshed_after_an_answer(self):
+        engine = LeaderboardEngine()
+        start = timezone.now()
+        engine.add_participant("user:1", 1, "first", start)
+        engine.add_participant("user:2", 2, "second", start + timezone.timedelta(seconds=1))
+        self.assertEqual(engine.rank_of("user:2"), 2)
+        engine.record_answer("user:2", True, 5)
+        self.assertEqual(engine.rank_of("user:2"), 1)
+
+    def test_equal_scores_keep_join_order(self):
+        engine = LeaderboardEngine()
+        start = timezone.now()
+        engine.add_participant("user:late", 1, "late", start + timezone.timedelta(seconds=5))
+        engine.add_participant("user:early", 2, "early", start)
+        engine.record_answer("user:late", True, 10)
+        engine.record_answer("user:early", True, 10)
+
+        self.assertEqual([entry.label for entry in engine.ranked()], ["early", "late"])
+        self.assertEqual(engine.rank_of("user:late"), 2)
+        self.assertEqual([entry.label for entry in engine.top(1)], ["early"])
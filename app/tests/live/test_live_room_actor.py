@@ -0,0 +1,71 @@
+import asyncio
+from django.test import SimpleTestCase
+from app.live.rooms import LiveRoom, RoomClosed
+
+
+class LiveRoomActorTestCase(SimpleTestCase):
+    async def test_transitions_run_one_at_a_time_in_order(self):
+        live_room = LiveRoom("ACTOR001")
+        events = []
+
+        async def transition(name):
+            events.append(f"{name} start")
+            await asyncio.sleep(0.01)
+            events.append(f"{name} end")
+            return name
+
+        results = await asyncio.gather(
+            live_room.ask(transition, "first"),
+            live_room.ask(transition, "second"),
+            live_room.ask(transition, "third"),
+        )
+
+        self.assertEqual(results, ["first", "second", "third"])
+        self.assertEqual(events, [
+            "first start", "first end", "second start", "second end", "third start", "third end"
+        ])
+        live_room.close()
+
+    async def test_errors_are_raised_to_the_caller_and_actor_keeps_running(self):
+        live_room = LiveRoom("ACTOR001")
+
+        async def failing():
+            raise ValueError("boom")
+
+        async def working():
+            return "ok"
+
+        with self.assertRaises(ValueError):
+            await live_room.ask(failing)
+        self.assertEqual(await live_room.ask(working), "ok")
+        live_room.close()
+
+    async def test_transition_can_close_its_own_room(self):
+        live_room = LiveRoom("ACTOR001")
+
+        async def finish():
+            live_room.close()
+            await asyncio.sleep(0)
+            return "finished"
+
+        self.assertEqual(await live_room.ask(finish), "finished")
+        self.assertTrue(live_room.closed)
+
+    async def test_waiting_and_later_transitions_fail_once_closed(self):
+        live_room = LiveRoom("ACTOR001")
+
+        async def finish():
+            live_room.close()
+            await asyncio.sleep(0)
+            return "finished"
+
+        async def working():
+            return "ok"
+
+        finishing = asyncio.ensure_future(live_room.ask(finish))
+        waiting = asyncio.ensure_future(live_room.ask(working))
+        self.assertEqual(await finishing, "finished")
+        with self.assertRaises(RoomClosed):
+            await asyncio.wait_for(waiting, timeout=1)
+        with self.assertRaises(RoomClosed):
+            await live_room.ask(working)
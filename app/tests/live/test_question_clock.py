@@ -0,0 +1,65 @@
+import asyncio
+from django.test import SimpleTestCase
+from app.live.clock import QuestionClock
+from app.live.snapshot import SnapshotQuestion
+
+
+def make_question(question_id=1, time=30):
+    return SnapshotQuestion(
+        id=question_id, question_type="integer", question_text="Q", options=(), image="",
+        time=time, mark=5, answer="3", answer_key=(3,), instance=None
+    )
+
+
+class QuestionClockTestCase(SimpleTestCase):
+    async def test_idle_clock_accepts_answers_and_end_requests(self):
+        clock = QuestionClock(grace=0)
+        self.assertTrue(clock.accepts("integer", 1))
+        self.assertTrue(clock.try_close())
+
+    async def test_expiry_ends_the_question_once(self):
+        clock = QuestionClock(grace=0)
+        ended = []
+
+        async def on_expire():
+            ended.append(True)
+
+        clock.start(make_question(time=0.05), on_expire)
+        self.assertTrue(clock.accepts("integer", "1"))
+        await asyncio.sleep(0.15)
+
+        self.assertEqual(ended, [True])
+        self.assertFalse(clock.try_close())
+        self.assertFalse(clock.accepts("integer", 1))
+
+    async def test_tutor_end_before_expiry_cancels_the_timer(self):
+        clock = QuestionClock(grace=0)
+        ended = []
+
+        async def on_expire():
+            ended.append(True)
+
+        clock.start(make_question(time=0.05), on_expire)
+        self.assertTrue(clock.try_close())
+        self.assertFalse(clock.try_close())
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(ended, [])
+
+    async def test_only_the_current_question_is_accepted(self):
+        clock = QuestionClock(grace=0)
+
+        async def on_expire():
+            pass
+
+        clock.start(make_question(question_id=1), on_expire)
+        self.assertFalse(clock.accepts("integer", 2))
+        self.assertFalse(clock.accepts("text", 1))
+        self.assertFalse(clock.accepts("integer", "not an id"))
+        self.assertFalse(clock.try_close(("integer", 2)))
+
+        clock.start(make_question(question_id=2), on_expire)
+        self.assertTrue(clock.accepts("integer", 2))
+        self.assertFalse(clock.accepts("integer", 1))
+        clock.reset()
+        self.assertTrue(clock.is_idle)
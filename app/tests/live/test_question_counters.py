@@ -0,0 +1,63 @@
+from django.test import TestCase
+from django.utils import timezone
+from app.helpers.helper_functions import count_answers_for_question
+from app.live.counters import QuestionCounters, counter_key
+from app.models import User, Quiz, Room, GuestAccess, TrueFalseQuestion, TrueFalseResponse
+
+
+class QuestionCountersTestCase(TestCase):
+    def setUp(self):
+        self.tutor = User.objects.create_user(
+            email_address='tutor@example.com',
+            first_name='Tutor',
+            last_name='User',
+            role=User.TUTOR
+        )
+        self.student = User.objects.create_user(
+            email_address='student@example.com',
+            first_name='Student',
+            last_name='User',
+            role=User.STUDENT
+        )
+        self.guests = [GuestAccess.objects.create(session_id=f"guest-session-{i}") for i in range(2)]
+        self.quiz = Quiz.objects.create(name="Quiz", tutor=self.tutor)
+        self.room = Room.objects.create(name="Room", quiz=self.quiz, join_code="COUNT001")
+        self.question = TrueFalseQuestion.objects.create(quiz=self.quiz, question_text="TF", correct_answer=True, mark=5)
+        self.key = counter_key(self.question)
+
+    def _response(self, answer=True, **owner):
+        response = TrueFalseResponse(room=self.room, question=self.question, answer=answer, **owner)
+        response.grade()
+        return response
+
+    def test_each_participant_is_counted_once(self):
+        counters = QuestionCounters()
+        first = timezone.now()
+        self.assertTrue(counters.record(self._response(player=self.student), first))
+        self.assertFalse(counters.record(self._response(player=self.student), first))
+        counters.record(self._response(answer=False, guest_access=self.guests[0]), first + timezone.timedelta(seconds=2))
+        counters.record(self._response(guest_access=self.guests[1]), first + timezone.timedelta(seconds=1))
+
+        counter = counters.get(self.key)
+        self.assertEqual(counter.totals(), (3, 2))
+        self.assertEqual(counter.first_answer_at, first)
+        self.assertEqual(counter.last_answer_at, first + timezone.timedelta(seconds=2))
+        self.assertEqual(counters.answered_count(("true_false", 999)), 0)
+
+    def test_load_counts_guests_separately(self):
+        for owner in ({"player": self.student}, {"guest_access": self.guests[0]}, {"guest_access": self.guests[1]}):
+            self._response(**owner).save()
+        counters = QuestionCounters.load(self.room)
+        self.assertEqual(counters.get(self.key).totals(), (3, 3))
+        self.assertEqual(count_answers_for_question(self.room, self.question), 3)
+
+    def test_reconcile_adopts_the_database_counts(self):
+        self._response(player=self.student).save()
+        counters = QuestionCounters()
+        counters.record(self._response(player=self.student), timezone.now())
+        self.assertEqual(counters.reconcile(self.room), [])
+
+        self._response(guest_access=self.guests[0]).save()
+        with self.assertLogs("app.live.counters", level="WARNING"):
+            self.assertEqual(counters.reconcile(self.room), [self.key])
+        self.assertEqual(counters.answered_count(self.key), 2)
@@ -0,0 +1,100 @@
+import json
+from dataclasses import FrozenInstanceError
+from django.test import TestCase
+from app.live.snapshot import QuestionSnapshot, DEFAULT_IMAGE
+from app.models import (
+    User, Quiz, Room, IntegerInputQuestion, TrueFalseQuestion, MultipleChoiceQuestion, NumericalRangeQuestion
+)
+
+
+class QuestionSnapshotTestCase(TestCase):
+    def setUp(self):
+        self.tutor = User.objects.create_user(
+            email_address='tutor@example.com',
+            first_name='Tutor',
+            last_name='User',
+            role=User.TUTOR
+        )
+        self.quiz = Quiz.objects.create(name="Quiz", tutor=self.tutor)
+        self.room = Room.objects.create(name="Room", quiz=self.quiz)
+        self.mc_question = MultipleChoiceQuestion.objects.create(
+            quiz=self.quiz, question_text="Pick one", options=["A", "B"], correct_answer="B", mark=5, position=1
+        )
+        self.range_question = NumericalRangeQuestion.objects.create(
+            quiz=self.quiz, question_text="Range", min_value=1, max_value=3, mark=5, position=3, time=20
+        )
+        self.tf_question = TrueFalseQuestion.objects.create(
+            quiz=self.quiz, question_text="True?", correct_answer=True, mark=5, position=2
+        )
+        self.int_question = IntegerInputQuestion.objects.create(
+            quiz=self.quiz, question_text="Int", correct_answer=4, mark=5, position=4
+        )
+
+    def test_snapshot_keeps_room_question_order(self):
+        snapshot = QuestionSnapshot.build(self.room)
+        self.assertEqual(len(snapshot), 4)
+        self.assertEqual([q.id for q in snapshot], [q.id for q in self.room.get_questions()])
+        self.assertEqual(
+            [q.question_type for q in snapshot],
+            ["multiple_choice", "true_false", "numerical_range", "integer"]
+        )
+
+    def test_lookups_do_not_query_the_database(self):
+        snapshot = QuestionSnapshot.build(self.room)
+        with self.assertNumQueries(0):
+            self.assertEqual(snapshot.get(1).id, self.tf_question.id)
+            self.assertIsNone(snapshot.get(4))
+            self.assertEqual(snapshot.find("integer", self.int_question.id).instance, self.int_question)
+            self.assertIsNone(snapshot.find("text", self.int_question.id))
+            snapshot.payload(2, reveal_answer=True)
+
+    def test_payload_before_and_after_reveal(self):
+        snapshot = QuestionSnapshot.build(self.room)
+        self.assertEqual(snapshot.payload(0), {
+            "question": "Pick one",
+            "question_id": self.mc_question.id,
+            "question_number": 1,
+            "total_questions": 4,
+            "time": 30,
+            "question_type": "multiple_choice",
+            "image": DEFAULT_IMAGE,
+            "options": ["A", "B"],
+            "answer": "",
+        })
+        revealed = snapshot.payload(2, reveal_answer=True)
+        self.assertEqual(revealed["answer"], "1.0 - 3.0")
+        self.assertEqual(revealed["time"], 0)
+        self.assertEqual(revealed["options"], [])
+        self.assertEqual(snapshot.payload(1)["options"], ["True", "False"])
+        self.assertIsNone(snapshot.payload(10))
+
+    def test_answer_keys(self):
+        snapshot = QuestionSnapshot.build(self.room)
+        self.assertEqual(snapshot.get(0).answer_key, ("B",))
+        self.assertEqual(snapshot.get(2).answer_key, (1.0, 3.0))
+        self.assertEqual(snapshot.get(3).model, IntegerInputQuestion)
+
+    def test_snapshot_questions_are_immutable(self):
+        snapshot = QuestionSnapshot.build(self.room)
+        with self.assertRaises(FrozenInstanceError):
+            snapshot.get(0).question_text = "Changed"
+
+    def test_room_without_quiz_has_empty_snapshot(self):
+        room = Room.objects.create(name="Empty")
+        snapshot = QuestionSnapshot.build(room)
+        self.assertEqual(len(snapshot), 0)
+        self.assertIsNone(snapshot.get(0))
+
+    def test_frames_are_encoded_once_per_question(self):
+        snapshot = QuestionSnapshot.build(self.room)
+        frame = snapshot.student_frame(0)
+        self.assertIs(snapshot.student_frame(0), frame)
+        message = json.loads(frame)
+        self.assertEqual(message["type"], "question_update")
+        self.assertEqual(message["question_id"], self.mc_question.id)
+        self.assertNotIn("answer", message)
+
+        tutor_message = json.loads(snapshot.tutor_frame(2, reveal_answer=True))
+        self.assertEqual(tutor_message["type"], "quiz_update")
+        self.assertEqual(tutor_message["message"]["answer"], "1.0 - 3.0")
+        self.assertIsNot(snapshot.tutor_frame(2), snapshot.tutor_frame(2, reveal_answer=True))
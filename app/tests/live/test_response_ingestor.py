@@ -0,0 +1,106 @@
+import asyncio
+from channels.db import database_sync_to_async
+from django.test import TransactionTestCase
+from app.live.rooms import LiveRoom
+from app.models import User, Quiz, Room, TrueFalseQuestion, IntegerInputQuestion, TrueFalseResponse, IntegerInputResponse
+
+
+class ResponseIngestorTestCase(TransactionTestCase):
+    def setUp(self):
+        self.tutor = User.objects.create_user(
+            email_address='tutor@example.com',
+            first_name='Tutor',
+            last_name='User',
+            role=User.TUTOR
+        )
+        self.students = [
+            User.objects.create_user(
+                email_address=f'student{i}@example.com',
+                first_name='Student',
+                last_name='User',
+                role=User.STUDENT
+            )
+            for i in range(5)
+        ]
+        self.quiz = Quiz.objects.create(name="Quiz", tutor=self.tutor)
+        self.room = Room.objects.create(name="Room", quiz=self.quiz, join_code="INGEST01")
+        self.tf_question = TrueFalseQuestion.objects.create(quiz=self.quiz, question_text="TF", correct_answer=True, mark=5)
+        self.int_question = IntegerInputQuestion.objects.create(quiz=self.quiz, question_text="Int", correct_answer=3, mark=5)
+        self.live_room = LiveRoom("INGEST01")
+
+    def tearDown(self):
+        self.live_room.close()
+
+    def _tf_response(self, student):
+        return TrueFalseResponse(player=student, room=self.room, question=self.tf_question, answer=True)
+
+    async def test_responses_are_buffered_until_flush(self):
+        ingestor = self.live_room.ingestor
+        ingestor.flush_interval = 60
+        for student in self.students:
+            ingestor.submit(self._tf_response(student))
+        ingestor.submit(IntegerInputResponse(player=self.students[0], room=self.room, question=self.int_question, answer=3))
+
+        self.assertEqual(ingestor.queue_depth, 6)
+        self.assertEqual(await database_sync_to_async(TrueFalseResponse.objects.count)(), 0)
+
+        self.assertEqual(await ingestor.flush(), 6)
+        self.assertEqual(ingestor.queue_depth, 0)
+        self.assertEqual(await database_sync_to_async(TrueFalseResponse.objects.count)(), 5)
+        self.assertEqual(await database_sync_to_async(IntegerInputResponse.objects.count)(), 1)
+        self.assertEqual(ingestor.flushed, 6)
+        self.assertEqual(ingestor.flushes, 1)
+
+    async def test_stats_are_logged_on_each_flush(self):
+        ingestor = self.live_room.ingestor
+        ingestor.flush_interval = 60
+        for student in self.students:
+            ingestor.submit(self._tf_response(student))
+        with self.assertLogs("app.live.ingestion", level="DEBUG") as logs:
+            await ingestor.flush()
+
+        stats = ingestor.stats()
+        self.assertEqual(stats["ingested"], 5)
+        self.assertEqual(stats["flushed"], 5)
+        self.assertEqual(stats["flushes"], 1)
+        self.assertEqual(stats["queue_depth"], 0)
+        self.assertGreater(stats["throughput"], 0)
+        self.assertIn("Wrote 5 responses for room INGEST01", logs.output[0])
+
+    async def test_full_batch_is_written_without_waiting(self):
+        ingestor = self.live_room.ingestor
+        ingestor.flush_interval = 60
+        ingestor.batch_size = 3
+        for student in self.students[:3]:
+            ingestor.submit(self._tf_response(student))
+        await asyncio.sleep(0.2)
+
+        self.assertEqual(ingestor.queue_depth, 0)
+        self.assertEqual(await database_sync_to_async(TrueFalseResponse.objects.count)(), 3)
+
+    async def test_partial_batch_is_written_after_flush_interval(self):
+        ingestor = self.live_room.ingestor
+        ingestor.flush_interval = 0.05
+        ingestor.submit(self._tf_response(self.students[0]))
+        await asyncio.sleep(0.3)
+
+        self.assertEqual(ingestor.flushes, 1)
+        self.assertEqual(await database_sync_to_async(TrueFalseResponse.objects.count)(), 1)
+
+    async def test_flush_with_nothing_buffered_does_not_write(self):
+        self.assertEqual(await self.live_room.flush_responses(), 0)
+        self.assertEqual(self.live_room.ingestor.flushes, 0)
+
+    async def test_failed_batch_is_retried_one_row_at_a_time(self):
+        ingestor = self.live_room.ingestor
+        ingestor.flush_interval = 60
+        for student in self.students[:2]:
+            ingestor.submit(self._tf_response(student))
+        ingestor.submit(IntegerInputResponse(player=self.students[0], room=self.room, question=self.int_question, answer=int("9" * 40)))
+        ingestor.submit(IntegerInputResponse(player=self.students[1], room=self.room, question=self.int_question, answer=3))
+
+        with self.assertLogs("app.live.ingestion", level="ERROR"):
+            self.assertEqual(await ingestor.flush(), 3)
+        self.assertEqual(ingestor.queue_depth, 0)
+        self.assertEqual(await database_sync_to_async(TrueFalseResponse.objects.count)(), 2)
+        self.assertEqual(await database_sync_to_async(IntegerInputResponse.objects.count)(), 1)
@@ -0,0 +1,62 @@
+from django.contrib.auth.models import AnonymousUser
+from django.test import SimpleTestCase
+from app.live.roster import Roster, roster_member
+from app.models import User
+
+
+class FakeSession:
+    def __init__(self, session_key):
+        self.session_key = session_key
+
+
+class RosterTestCase(SimpleTestCase):
+    def test_join_and_leave_produce_deltas(self):
+        roster = Roster(snapshot_every=50)
+        self.assertEqual(roster.join("user:1", "a@example.org"), {
+            "type": "participants_delta",
+            "op": "join",
+            "participant": "a@example.org",
+            "participant_number": 1,
+            "version": 1,
+        })
+        roster.join("user:2", "b@example.org")
+        delta = roster.leave("user:1")
+        self.assertEqual(delta["op"], "leave")
+        self.assertEqual(delta["participant"], "a@example.org")
+        self.assertEqual(delta["participant_number"], 1)
+        self.assertEqual(delta["version"], 3)
+        self.assertEqual(roster.labels(), ["b@example.org"])
+
+    def test_second_socket_of_a_participant_is_counted_once(self):
+        roster = Roster(snapshot_every=50)
+        roster.join("user:1", "a@example.org")
+        self.assertIsNone(roster.join("user:1", "a@example.org"))
+        self.assertIsNone(roster.leave("user:1"))
+        self.assertIn("user:1", roster)
+        self.assertEqual(roster.leave("user:1")["op"], "leave")
+        self.assertIsNone(roster.leave("user:1"))
+        self.assertEqual(len(roster), 0)
+
+    def test_full_snapshot_is_sent_periodically(self):
+        roster = Roster(snapshot_every=3)
+        roster.join("user:1", "a")
+        roster.join("user:2", "b")
+        event = roster.join("user:3", "c")
+        self.assertEqual(event, {
+            "type": "participants_snapshot",
+            "participants": ["a", "b", "c"],
+            "participant_number": 3,
+            "version": 3,
+        })
+        self.assertEqual(roster.join("user:4", "d")["type"], "participants_delta")
+
+    def test_roster_member_from_scope(self):
+        student = User(id=7, email_address="s@example.org", role=User.STUDENT)
+        tutor = User(id=8, email_address="t@example.org", role=User.TUTOR)
+        self.assertEqual(roster_member(student, None), ("user:7", "s@example.org"))
+        self.assertIsNone(roster_member(tutor, None))
+        self.assertEqual(
+            roster_member(AnonymousUser(), FakeSession("abcdefghijkl")),
+            ("session:abcdefghijkl", "Guest (abcdefgh)")
+        )
+        self.assertIsNone(roster_member(AnonymousUser(), {}))
@@ -0,0 +1,44 @@
+import bisect
+import random
+from django.test import SimpleTestCase
+from app.live.skiplist import IndexableSkipList
+
+
+class IndexableSkipListTestCase(SimpleTestCase):
+    def test_matches_a_sorted_list_under_random_inserts_and_removes(self):
+        rng = random.Random(7)
+        skiplist = IndexableSkipList(seed=3)
+        expected = []
+        for step in range(3000):
+            if expected and rng.random() < 0.4:
+                key = rng.choice(expected)
+                expected.remove(key)
+                self.assertEqual(skiplist.remove(key), -key)
+            else:
+                key = rng.random()
+                skiplist.insert(key, -key)
+                bisect.insort(expected, key)
+            if step % 50 == 0:
+                self.assertEqual([key for key, _ in skiplist], expected)
+                if expected:
+                    index = rng.randrange(len(expected))
+                    self.assertEqual(skiplist.item_at(index)[0], expected[index])
+                    self.assertEqual(skiplist.rank(expected[index]), index)
+        self.assertEqual(len(skiplist), len(expected))
+
+    def test_first_returns_smallest_keys(self):
+        skiplist = IndexableSkipList(seed=1)
+        for key in [5, 3, 9, 1]:
+            skiplist.insert(key, str(key))
+        self.assertEqual(skiplist.first(2), [(1, "1"), (3, "3")])
+        self.assertEqual(len(skiplist.first(10)), 4)
+
+    def test_missing_keys_and_indexes_raise(self):
+        skiplist = IndexableSkipList(seed=1)
+        skiplist.insert(1)
+        with self.assertRaises(KeyError):
+            skiplist.remove(2)
+        with self.assertRaises(KeyError):
+            skiplist.rank(0)
+        with self.assertRaises(IndexError):
+            skiplist.item_at(1)
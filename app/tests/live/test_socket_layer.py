@@ -0,0 +1,146 @@
+import asyncio
+import os
+import tempfile
+from django.test import SimpleTestCase
+from app.live.broker import ChannelBroker
+from app.live.socket_layer import UnixSocketChannelLayer
+
+
+class UnixSocketChannelLayerTestCase(SimpleTestCase):
+    async def _setup(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "broker.sock")
+        self.broker = await ChannelBroker(self.path).start()
+        # Two layers stand in for two worker processes
+        self.worker_a = UnixSocketChannelLayer(self.path)
+        self.worker_b = UnixSocketChannelLayer(self.path)
+
+    async def _teardown(self):
+        await self.worker_a.close()
+        await self.worker_b.close()
+        await self.broker.close()
+
+    async def _receive(self, layer, channel):
+        return await asyncio.wait_for(layer.receive(channel), timeout=1)
+
+    async def test_group_send_reaches_members_in_other_workers(self):
+        await self._setup()
+        try:
+            channel_a = await self.worker_a.new_channel()
+            channel_b = await self.worker_b.new_channel()
+            await self.worker_a.group_add("live_quiz_ABCD1234", channel_a)
+            await self.worker_b.group_add("live_quiz_ABCD1234", channel_b)
+            await asyncio.sleep(0.05)
+
+            await self.worker_b.group_send("live_quiz_ABCD1234", {"type": "quiz_update", "message": "hi"})
+
+            self.assertEqual((await self._receive(self.worker_a, channel_a))["message"], "hi")
+            self.assertEqual((await self._receive(self.worker_b, channel_b))["type"], "quiz_update")
+        finally:
+            await self._teardown()
+
+    async def test_send_to_a_channel_in_another_worker(self):
+        await self._setup()
+        try:
+            channel = await self.worker_a.new_channel()
+            await asyncio.sleep(0.05)
+            await self.worker_b.send(channel, {"type": "hello", "n": 1})
+
+            self.assertEqual(await self._receive(self.worker_a, channel), {"type": "hello", "n": 1})
+        finally:
+            await self._teardown()
+
+    async def test_messages_are_held_until_channel_is_received_on(self):
+        await self._setup()
+        try:
+            await self.worker_b.send("lobby.worker", {"type": "queued"})
+            await asyncio.sleep(0.05)
+
+            self.assertEqual((await self._receive(self.worker_a, "lobby.worker"))["type"], "queued")
+        finally:
+            await self._teardown()
+
+    async def test_group_discard_and_disconnect_remove_members(self):
+        await self._setup()
+        try:
+            channel_a = await self.worker_a.new_channel()
+            channel_b = await self.worker_b.new_channel()
+            await self.worker_a.group_add("student_ABCD1234", channel_a)
+            await self.worker_b.group_add("student_ABCD1234", channel_b)
+            await self.worker_a.group_discard("student_ABCD1234", channel_a)
+            await asyncio.sleep(0.05)
+            self.assertEqual(self.broker.group_members("student_ABCD1234"), [channel_b])
+
+            await self.worker_b.close()
+            await asyncio.sleep(0.05)
+            self.assertEqual(self.broker.group_members("student_ABCD1234"), [])
+        finally:
+            await self._teardown()
+
+    async def test_group_send_reaches_every_member_in_a_worker(self):
+        await self._setup()
+        try:
+            channels = [await self.worker_a.new_channel() for _ in range(5)]
+            for channel in channels:
+                await self.worker_a.group_add("student_ABCD1234", channel)
+            await asyncio.sleep(0.05)
+
+            await self.worker_b.group_send("student_ABCD1234", {"type": "broadcast_frame", "text": "{}"})
+            for channel in channels:
+                self.assertEqual((await self._receive(self.worker_a, channel))["text"], "{}")
+            self.assertEqual(self.broker.delivered, 5)
+        finally:
+            await self._teardown()
+
+    async def test_worker_reconnects_and_rejoins_groups_after_broker_restart(self):
+        await self._setup()
+        try:
+            channel_a = await self.worker_a.new_channel()
+            await self.worker_a.group_add("live_quiz_ABCD1234", channel_a)
+            await asyncio.sleep(0.05)
+
+            await self.broker.close()
+            self.broker = await ChannelBroker(self.path).start()
+            for _ in range(50):
+                if self.broker.group_members("live_quiz_ABCD1234"):
+                    break
+                await asyncio.sleep(0.02)
+            self.assertEqual(self.broker.group_members("live_quiz_ABCD1234"), [channel_a])
+
+            await self.worker_b.group_send("live_quiz_ABCD1234", {"type": "broadcast_frame", "text": "{}"})
+            self.assertEqual((await self._receive(self.worker_a, channel_a))["text"], "{}")
+        finally:
+            await self._teardown()
+
+    async def test_waiting_receive_fails_when_broker_cannot_be_reached(self):
+        await self._setup()
+        try:
+            channel = await self.worker_a.new_channel()
+            connection = await self.worker_a._connection()
+            connection.reconnect_delays = (0.01, 0.01)
+            receiving = asyncio.ensure_future(self.worker_a.receive(channel))
+            await asyncio.sleep(0.05)
+
+            await self.broker.close()
+            with self.assertRaises(ConnectionError):
+                await asyncio.wait_for(receiving, timeout=1)
+        finally:
+            await self._teardown()
+
+    async def test_channel_queue_is_limited_to_capacity(self):
+        await self._setup()
+        worker = UnixSocketChannelLayer(self.path, capacity=2)
+        try:
+            channel = await worker.new_channel()
+            await asyncio.sleep(0.05)
+            with self.assertLogs("app.live.socket_layer", level="WARNING"):
+                for n in range(3):
+                    await self.worker_b.send(channel, {"type": "hello", "n": n})
+                await asyncio.sleep(0.05)
+
+            self.assertEqual((await self._receive(worker, channel))["n"], 0)
+            self.assertEqual((await self._receive(worker, channel))["n"], 1)
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(worker.receive(channel), timeout=0.1)
+        finally:
+            await worker.close()
+            await self._teardown()
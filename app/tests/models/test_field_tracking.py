@@ -0,0 +1,93 @@
+from unittest.mock import patch
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from app.models import User, Quiz, TrueFalseQuestion, IntegerInputQuestion, MultipleChoiceQuestion
+
+# Bound before the tests patch it, to remove the files they write
+delete_file = default_storage.delete
+
+
+class FieldTrackingTestCase(TestCase):
+    def setUp(self):
+        self.tutor = User.objects.create_user(
+            email_address='tutor@example.com',
+            first_name='Tutor',
+            last_name='User',
+            role=User.TUTOR
+        )
+        self.quiz = Quiz.objects.create(name="Quiz", tutor=self.tutor)
+        self.question = TrueFalseQuestion.objects.create(
+            quiz=self.quiz, question_text="True?", correct_answer=True, mark=5, position=1
+        )
+
+    def test_loaded_question_reports_only_real_changes(self):
+        question = TrueFalseQuestion.objects.get(pk=self.question.pk)
+        self.assertEqual(question.changed_fields(), set())
+        question.mark = 10
+        self.assertEqual(question.changed_fields(), {'mark'})
+        question.save()
+        self.assertEqual(question.changed_fields(), set())
+
+    def test_unchanged_save_is_a_single_update(self):
+        question = TrueFalseQuestion.objects.get(pk=self.question.pk)
+        version = question.quiz.content_version
+        with self.assertNumQueries(1):
+            question.save()
+        self.assertEqual(Quiz.objects.get(pk=self.quiz.pk).content_version, version)
+
+    def test_editing_text_bumps_the_version_without_reindexing(self):
+        question = TrueFalseQuestion.objects.get(pk=self.question.pk)
+        version = Quiz.objects.get(pk=self.quiz.pk).content_version
+        question.question_text = "Still true?"
+        with self.assertNumQueries(2):
+            question.save()
+        self.assertEqual(Quiz.objects.get(pk=self.quiz.pk).content_version, version + 1)
+
+    def test_options_changed_in_place_are_detected(self):
+        question = MultipleChoiceQuestion.objects.create(
+            quiz=self.quiz, question_text="Pick one", correct_answer="A", options=["A", "B"], mark=5
+        )
+        question = MultipleChoiceQuestion.objects.get(pk=question.pk)
+        version = Quiz.objects.get(pk=self.quiz.pk).content_version
+        question.options.append("C")
+        self.assertEqual(question.changed_fields(), {'options'})
+        question.save()
+        self.assertEqual(Quiz.objects.get(pk=self.quiz.pk).content_version, version + 1)
+        self.assertEqual(Quiz.objects.get(pk=self.quiz.pk).get_all_questions()[-1].options, ["A", "B", "C"])
+
+    @patch("django.core.files.storage.default_storage.delete")
+    def test_image_is_released_only_when_it_changes(self, mock_delete):
+        question = IntegerInputQuestion.objects.create(
+            quiz=self.quiz, question_text="2+2?", correct_answer=4, mark=5,
+            image=SimpleUploadedFile("tracked.jpg", b"tracked image", content_type="image/jpeg")
+        )
+        old_image_name = question.image.name
+        self.addCleanup(delete_file, old_image_name)
+        question = IntegerInputQuestion.objects.get(pk=question.pk)
+        question.mark = 6
+        question.save()
+        mock_delete.assert_not_called()
+
+        question.image = SimpleUploadedFile("tracked.jpg", b"replacement image", content_type="image/jpeg")
+        question.save()
+        self.addCleanup(delete_file, question.image.name)
+        mock_delete.assert_called_once_with(old_image_name)
+
+    @patch("django.core.files.storage.default_storage.delete")
+    def test_replaced_quiz_thumbnail_is_released(self, mock_delete):
+        self.quiz.quiz_img = SimpleUploadedFile("thumb.jpg", b"thumbnail", content_type="image/jpeg")
+        self.quiz.save()
+        old_thumbnail = self.quiz.quiz_img.name
+        self.addCleanup(delete_file, old_thumbnail)
+
+        quiz = Quiz.objects.get(pk=self.quiz.pk)
+        self.assertEqual(quiz.changed_fields(), set())
+        quiz.name = "Renamed"
+        quiz.save()
+        mock_delete.assert_not_called()
+
+        quiz.quiz_img = SimpleUploadedFile("thumb.jpg", b"new thumbnail", content_type="image/jpeg")
+        quiz.save()
+        self.addCleanup(delete_file, quiz.quiz_img.name)
+        mock_delete.assert_called_once_with(old_thumbnail)
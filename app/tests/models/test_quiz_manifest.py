@@ -0,0 +1,87 @@
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from app.models import User, Quiz, QuizItem, Room, TrueFalseQuestion, IntegerInputQuestion
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'manifest-tests'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class QuizManifestTestCase(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.tutor = User.objects.create_user(
+            email_address='tutor@example.com',
+            first_name='Tutor',
+            last_name='User',
+            role=User.TUTOR
+        )
+        self.quiz = Quiz.objects.create(name="Quiz", tutor=self.tutor)
+        self.second = IntegerInputQuestion.objects.create(
+            quiz=self.quiz, question_text="2+2?", correct_answer=4, mark=5, position=2
+        )
+        self.first = TrueFalseQuestion.objects.create(
+            quiz=self.quiz, question_text="True?", correct_answer=True, mark=5, position=1
+        )
+
+    def test_manifest_is_read_from_the_cache(self):
+        quiz = Quiz.objects.get(pk=self.quiz.pk)
+        self.assertEqual(quiz.get_all_questions(), [self.first, self.second])
+        with self.assertNumQueries(0):
+            self.assertEqual(quiz.get_all_questions(), [self.first, self.second])
+
+        room = Room.objects.create(name="Room", quiz=quiz)
+        with self.assertNumQueries(0):
+            self.assertEqual(room.get_questions(), [self.first, self.second])
+
+    def test_quiz_reusing_a_primary_key_does_not_read_the_old_manifest(self):
+        quiz = Quiz.objects.get(pk=self.quiz.pk)
+        quiz.get_all_questions()
+        Quiz.objects.filter(pk=quiz.pk).delete()
+
+        # Same primary key and content version, as after a rolled back test or a database reset
+        Quiz.objects.create(pk=quiz.pk, name="Replacement", tutor=self.tutor)
+        Quiz.objects.filter(pk=quiz.pk).update(content_version=quiz.content_version)
+        self.assertEqual(Quiz.objects.get(pk=quiz.pk).get_all_questions(), [])
+
+    def test_saving_or_deleting_a_question_bumps_the_version(self):
+        version = Quiz.objects.get(pk=self.quiz.pk).content_version
+        self.quiz.get_all_questions()
+
+        third = TrueFalseQuestion(quiz=self.quiz, question_text="False?", correct_answer=False, mark=5, position=3)
+        third.save()
+        self.assertEqual(self.quiz.content_version, version + 1)
+        self.assertEqual(self.quiz.get_all_questions(), [self.first, self.second, third])
+
+        self.second.position = 4
+        self.second.save()
+        self.assertEqual(Quiz.objects.get(pk=self.quiz.pk).get_all_questions(), [self.first, third, self.second])
+
+        self.first.delete()
+        self.assertEqual(Quiz.objects.get(pk=self.quiz.pk).get_all_questions(), [third, self.second])
+
+    def test_saving_a_stale_quiz_does_not_roll_the_version_back(self):
+        stale = Quiz.objects.get(pk=self.quiz.pk)
+        TrueFalseQuestion.objects.create(quiz=self.quiz, question_text="New?", correct_answer=True, mark=5, position=3)
+        stale.name = "Renamed"
+        stale.save()
+
+        fresh = Quiz.objects.get(pk=self.quiz.pk)
+        self.assertEqual(fresh.name, "Renamed")
+        self.assertGreater(fresh.content_version, stale.content_version)
+        self.assertEqual(len(fresh.get_all_questions()), 3)
+
+    def test_quiz_items_index_questions_in_order(self):
+        third = TrueFalseQuestion.objects.create(quiz=self.quiz, question_text="Unplaced?", correct_answer=False, mark=5)
+        items = list(QuizItem.objects.filter(quiz=self.quiz))
+        self.assertEqual([item.position for item in items], [1, 2, 3])
+        self.assertEqual([item.question for item in items], [self.first, self.second, third])
+
+        self.second.delete()
+        self.assertEqual(list(self.quiz.items.values_list('position', 'object_id')), [(1, self.first.id), (2, third.id)])
+
+    def test_loader_queries_the_index_then_each_type_present(self):
+        TrueFalseQuestion.objects.create(quiz=self.quiz, question_text="False?", correct_answer=False, mark=5, position=3)
+        quiz = Quiz.objects.get(pk=self.quiz.pk)
+        quiz.load_questions()
+        with self.assertNumQueries(3):
+            self.assertEqual(len(quiz.load_questions()), 3)
@@ -1,7 +1,8 @@
 from django.test import TestCase
 from django.core.exceptions import ValidationError
 from app.models import User, Quiz, TrueFalseQuestion, IntegerInputQuestion, TrueFalseResponse, IntegerInputResponse, \
-    TextInputQuestion, TextInputResponse, Room, MultipleChoiceQuestion, MultipleChoiceResponse
+    TextInputQuestion, TextInputResponse, Room, MultipleChoiceQuestion, MultipleChoiceResponse, DecimalInputQuestion, \
+    DecimalInputResponse
 
 
 class ResponseTestCase(TestCase):
@@ -162,3 +163,20 @@ class ResponseTestCase(TestCase):
         )
         self.assertEqual(str(response),
                          f"Integer Input Answer by {self.test_player.email_address} for question {self.integer_input_question}: {response.answer}")
+
+    def test_response_is_graded_when_saved(self):
+        correct = IntegerInputResponse.objects.create(
+            player=self.test_player, room=self.room, question=self.integer_input_question, answer=4
+        )
+        wrong = TrueFalseResponse.objects.create(
+            player=self.test_player, room=self.room, question=self.true_false_question, answer=False
+        )
+        self.assertTrue(IntegerInputResponse.objects.get(id=correct.id).correct)
+        self.assertFalse(TrueFalseResponse.objects.get(id=wrong.id).correct)
+
+    def test_unsaved_decimal_answer_grades_like_a_stored_one(self):
+        question = DecimalInputQuestion.objects.create(
+            quiz=self.quiz, question_text="What is pi to 2dp?", correct_answer=3.14, time=10, mark=5
+        )
+        response = DecimalInputResponse(player=self.test_player, room=self.room, question=question, answer="3.14")
+        self.assertTrue(response.grade())
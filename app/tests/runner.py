@@ -0,0 +1,21 @@
+"""Test runner that keeps uploaded files out of the source tree."""
+import shutil
+import tempfile
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TemporaryMediaRunner(DiscoverRunner):
+    """Point MEDIA_ROOT at a scratch directory for the length of the run."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._media_root = tempfile.mkdtemp(prefix="quizmunk-media-")
+        self._media_override = override_settings(MEDIA_ROOT=self._media_root)
+        self._media_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._media_override.disable()
+        shutil.rmtree(self._media_root, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
@@ -1,6 +1,8 @@
 from io import BytesIO
 import json
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from app.forms.quiz_form import QuizForm
@@ -592,7 +594,105 @@ class ViewTests(TestCase):
         self.assertEqual(response.status_code, 404)
         self.assertEqual(response.json()['message'], 'Question with ID 99999 not found in this quiz')
 
+    def _reorder(self, identifiers):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('update-question-order'), {
+                'quiz_id': self.quiz.id,
+                'order': json.dumps(identifiers),
+            })
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_update_question_order_uses_a_constant_number_of_queries(self):
+        self.client.login(email_address="tutor@example.com", password="password123")
+        version = Quiz.objects.get(pk=self.quiz.pk).content_version
+        response, small_reorder = self._reorder(['true_false-' + str(self.tf_question.id), 'multiple_choice-' + str(self.mcq.id)])
+        self.assertEqual(response.json()['version'], version + 1)
+
+        extra = [
+            TrueFalseQuestion.objects.create(quiz=self.quiz, question_text=f"TF {i}", correct_answer=True, mark=1)
+            for i in range(20)
+        ]
+        identifiers = ['true_false-' + str(question.id) for question in reversed(extra)]
+        response, large_reorder = self._reorder(identifiers + ['multiple_choice-' + str(self.mcq.id)])
+        self.assertEqual(large_reorder, small_reorder)
+        self.assertEqual(response.json()['version'], Quiz.objects.get(pk=self.quiz.pk).content_version)
+
+        extra[0].refresh_from_db()
+        self.mcq.refresh_from_db()
+        self.assertEqual(extra[0].position, 20)
+        self.assertEqual(self.mcq.position, 21)
+
+    def test_update_question_order_is_all_or_nothing(self):
+        self.client.login(email_address="tutor@example.com", password="password123")
+        data = {
+            'quiz_id': self.quiz.id,
+            'order': json.dumps(['true_false-' + str(self.tf_question.id), 'multiple_choice-99999'])
+        }
+        position = TrueFalseQuestion.objects.get(pk=self.tf_question.pk).position
+        response = self.client.post(reverse('update-question-order'), data)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(TrueFalseQuestion.objects.get(pk=self.tf_question.pk).position, position)
+
+        data['order'] = json.dumps(['true_false-' + str(self.tf_question.id)] * 2)
+        response = self.client.post(reverse('update-question-order'), data)
+        self.assertEqual(response.status_code, 400)
+
     
+    def test_export_and_import_quiz_as_ndjson(self):
+        self.client.login(email_address="tutor@example.com", password="password123")
+        response = self.client.get(reverse('export_quiz', args=[self.quiz.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        body = b"".join(response.streaming_content)
+        self.assertEqual(len(body.splitlines()), 1 + len(self.quiz.get_all_questions()))
+
+        upload = SimpleUploadedFile("quiz.ndjson", body, content_type="application/x-ndjson")
+        response = self.client.post(reverse('import_quizzes'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        [quiz_id] = response.json()['quizzes']
+        imported = Quiz.objects.get(pk=quiz_id)
+        self.assertEqual(imported.tutor, self.tutor_user)
+        self.assertEqual(len(imported.get_all_questions()), len(self.quiz.get_all_questions()))
+
+    def test_import_quizzes_rejects_invalid_files(self):
+        self.client.login(email_address="tutor@example.com", password="password123")
+        response = self.client.post(reverse('import_quizzes'))
+        self.assertEqual(response.status_code, 400)
+        upload = SimpleUploadedFile("quiz.ndjson", b'{"record": "question"}\n', content_type="application/x-ndjson")
+        response = self.client.post(reverse('import_quizzes'), {'file': upload})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['message'], 'Line 1: Question record before any quiz record')
+
+    def test_cannot_export_another_tutors_quiz(self):
+        other = User.objects.create_user(
+            first_name="Other", last_name="Tutor", email_address="other@example.com",
+            password="password123", role=User.TUTOR,
+        )
+        self.client.login(email_address="other@example.com", password="password123")
+        response = self.client.get(reverse('export_quiz', args=[self.quiz.id]))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse('export_quizzes'))
+        self.assertEqual(b"".join(response.streaming_content), b"")
+
+    def test_import_questions_from_csv(self):
+        self.client.login(email_address="tutor@example.com", password="password123")
+        upload = SimpleUploadedFile(
+            "questions.csv",
+            b"type,question_text,time,mark,correct_answer,options\n"
+            b"true_false,Imported?,,1,True,\n"
+            b"integer,Broken,,1,four,\n",
+            content_type="text/csv"
+        )
+        response = self.client.post(
+            reverse('edit_quiz', args=[self.quiz.id]), {'action': 'import_csv', 'questions_csv': upload}, follow=True
+        )
+        self.assertRedirects(response, reverse('edit_quiz', args=[self.quiz.id]))
+        self.assertTrue(TrueFalseQuestion.objects.filter(quiz=self.quiz, question_text="Imported?").exists())
+        messages = [str(message) for message in response.context['messages']]
+        self.assertEqual(messages[0], 'Imported 1 question(s)')
+        self.assertTrue(messages[1].startswith('Row 3: correct_answer:'))
+
     def test_numerical_range_question(self):
         self.numerical_range_question = NumericalRangeQuestion.objects.create(
             quiz=self.quiz,
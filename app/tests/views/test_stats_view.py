@@ -89,6 +89,16 @@ class StatsViewTests(TestCase):
         self.assertTemplateUsed(response, 'tutor/stats_detail.html')
         self.assertEqual(response.context['stats'].id, self.stats.id)
 
+    def test_stats_details_shows_score_percentiles_and_distribution(self):
+        """Ensure the details page summarises the participants' scores."""
+        RoomParticipant.objects.create(room=self.room, user=self.student_user, score=10)
+        self.client.login(email_address="tutor@example.com", password="password123")
+        response = self.client.get(self.stats_details_url)
+
+        self.assertEqual(response.context['score_percentiles'][1], {"point": 50, "score": 10})
+        self.assertEqual(sum(bucket["count"] for bucket in response.context['score_distribution']), 1)
+        self.assertContains(response, "Score Percentiles")
+
     def test_stats_details_access_restriction(self):
         """Ensure students cannot access tutor stats details."""
         self.client.login(email_address="student@example.com", password="password123")
@@ -1,4 +1,5 @@
 import os
+from django.conf import settings
 from django.http import Http404
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
@@ -40,7 +41,7 @@ def lobby(request, join_code):
             participant, created = RoomParticipant.objects.get_or_create(room=room, guest_access=guest_access)
 
     participants = RoomParticipant.objects.filter(room=room).exclude(user__role="tutor")
-    qr_code_path = "app/media/qr_codes/qr_code.png"
+    qr_code_path = os.path.join(settings.MEDIA_ROOT, "qr_codes", "qr_code.png")
 
     try:
         os.makedirs(os.path.dirname(qr_code_path), exist_ok=True)
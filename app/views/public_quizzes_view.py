@@ -4,6 +4,7 @@ from app.models import Quiz
 from django.contrib.contenttypes.models import ContentType
 from app.helpers.decorators import is_student, is_tutor, redirect_unauthenticated_to_homepage
 from app.helpers.helper_functions import getAllQuestions
+from app.helpers.quiz_cloning import clone_quiz
 from app.question_registry import QUESTION_MODELS
 
 @redirect_unauthenticated_to_homepage
@@ -45,19 +46,7 @@ def public_quizzes_view(request):
 @is_tutor
 def save_public_quiz_view(request, quiz_id):
     original_quiz = get_object_or_404(Quiz, id=quiz_id, is_public=True)
-    new_quiz = Quiz.objects.create(
-        name=f"Copy of {original_quiz.name}",
-        subject=original_quiz.subject,
-        difficulty=original_quiz.difficulty,
-        type=original_quiz.type,
-        tutor=request.user
-    )
-    new_quiz.save()
-    questions = original_quiz.get_all_questions()
-    for question in questions:
-        question.pk = None
-        question.quiz = new_quiz
-        question.save()
+    new_quiz = clone_quiz(original_quiz, request.user)
 
     return redirect('edit_quiz', new_quiz.id)
 
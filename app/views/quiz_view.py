@@ -2,13 +2,15 @@ import json
 from django.shortcuts import redirect,render, get_object_or_404
 from app.forms import QuizForm
 from app.models.quiz import Quiz
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.urls import reverse
 from app.helpers.decorators import is_tutor, redirect_unauthenticated_to_homepage
 from django.views.decorators.http import require_POST
-from django.core.files.storage import default_storage
+from django.db import transaction
 from app.question_registry import QUESTION_FORMS, QUESTION_MODELS
 from app.helpers.helper_functions import getAllQuestions
+from app.helpers.question_csv import import_question_csv
+from app.helpers.quiz_transfer import export_quizzes, import_quizzes
 from django.contrib import messages
 
 @redirect_unauthenticated_to_homepage
@@ -56,6 +58,21 @@ def edit_quiz_view(request, quiz_id):
             quiz.save()
             messages.success(request, 'Quiz settings updated successfully')
             return redirect('your_quizzes')
+        if action == 'import_csv':
+            upload = request.FILES.get('questions_csv')
+            if not upload:
+                messages.error(request, 'Choose a CSV file to import')
+                return redirect('edit_quiz', quiz_id=quiz.id)
+            try:
+                created, errors = import_question_csv(quiz, upload.file)
+            except ValueError as e:
+                messages.error(request, f'Could not read the CSV file: {e}')
+                return redirect('edit_quiz', quiz_id=quiz.id)
+            if created:
+                messages.success(request, f'Imported {created} question(s)')
+            for row_number, error in errors:
+                messages.error(request, f'Row {row_number}: {error}')
+            return redirect('edit_quiz', quiz_id=quiz.id)
         hx_request = request.headers.get('HX-Request')
         for key in QUESTION_FORMS:
             if key in request.POST:
@@ -162,8 +179,7 @@ def delete_question_image_view(request, question_id):
         return JsonResponse({"error": "Question not found"}, status=404)
     
     if question.image:
-        if default_storage.exists(question.image.name):
-            default_storage.delete(question.image.name)
+        # Saving releases the old image, which is only deleted if no other question uses it
         question.image = None
         question.save()
     return JsonResponse({"status": "success"})
@@ -179,25 +195,40 @@ def update_question_order(request):
         if not quiz_id:
             return JsonResponse({"status": "error", "message": "Quiz ID is required"}, status=400)
         data = json.loads(request.POST.get("order", "[]"))
+
+        # Validate the whole order before touching the database
+        positions = {}
         for index, identifier in enumerate(data, start=1):
             try:
                 question_type, question_id = identifier.split("-", 1)
+                question_id = int(question_id)
             except ValueError:
                 return JsonResponse({"status": "error", "message": "Invalid identifier format"}, status=400)
 
             model = QUESTION_MODELS.get(question_type)
             if not model:
                 return JsonResponse({"status": "error", "message": f"Invalid question type: {question_type}"}, status=400)
-
-            try:
-                question = model.objects.get(id=question_id, quiz_id=quiz_id)
-            except model.DoesNotExist:
-                return JsonResponse({"status": "error", "message": f"Question with ID {question_id} not found in this quiz"}, status=404)
-
-            question.position = index
-            question.save()
-
-        return JsonResponse({"status": "success"})
+            if question_id in positions.setdefault(model, {}):
+                return JsonResponse({"status": "error", "message": f"Question {identifier} appears more than once"}, status=400)
+            positions[model][question_id] = index
+
+        if not Quiz.objects.filter(pk=quiz_id).exists():
+            return JsonResponse({"status": "error", "message": "Quiz not found"}, status=404)
+
+        with transaction.atomic():
+            for model, model_positions in positions.items():
+                questions = list(model.objects.filter(quiz_id=quiz_id, id__in=model_positions).only("id", "position"))
+                missing = set(model_positions) - {question.id for question in questions}
+                if missing:
+                    transaction.set_rollback(True)
+                    return JsonResponse({"status": "error", "message": f"Question with ID {min(missing)} not found in this quiz"}, status=404)
+                for question in questions:
+                    question.position = model_positions[question.id]
+                model.objects.bulk_update(questions, ["position"])
+            Quiz.content_changed(quiz_id)
+            version = Quiz.objects.values_list("content_version", flat=True).get(pk=quiz_id)
+
+        return JsonResponse({"status": "success", "version": version})
     except Exception as e:
         return JsonResponse({"status": "error", "message": str(e)}, status=400)
 
@@ -262,3 +293,35 @@ def delete_quiz_view(request, quiz_id):
     if request.headers.get('HX-Request'):
             return HttpResponse(status=204)
     return redirect('your_quizzes')
+
+
+@redirect_unauthenticated_to_homepage
+@is_tutor
+def export_quizzes_view(request, quiz_id=None):
+    """Stream one of the tutor's quizzes, or all of them, as NDJSON. Add ?images=1 to bundle images."""
+    if quiz_id is None:
+        quizzes = Quiz.objects.filter(tutor=request.user).order_by('id').iterator()
+        filename = "quizzes.ndjson"
+    else:
+        quizzes = [get_object_or_404(Quiz, id=quiz_id, tutor=request.user)]
+        filename = f"quiz_{quiz_id}.ndjson"
+    response = StreamingHttpResponse(
+        export_quizzes(quizzes, include_images=request.GET.get('images') == '1'),
+        content_type="application/x-ndjson"
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@redirect_unauthenticated_to_homepage
+@is_tutor
+@require_POST
+def import_quizzes_view(request):
+    upload = request.FILES.get('file')
+    if not upload:
+        return JsonResponse({"status": "error", "message": "An NDJSON file is required"}, status=400)
+    try:
+        quizzes = import_quizzes(upload, request.user)
+    except ValueError as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=400)
+    return JsonResponse({"status": "success", "quizzes": [quiz.id for quiz in quizzes]})
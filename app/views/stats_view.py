@@ -2,12 +2,13 @@ from django.shortcuts import render, get_object_or_404
 from django.http import Http404, HttpResponse
 from app.models import Stats, Room, User, Classroom
 from app.models.room import RoomParticipant
+from app.helpers.analytics import ScoreAnalytics
 from app.helpers.decorators import is_tutor
 from app.models.stats import QuestionStats
 import csv
 import datetime
 from app.helpers.helper_functions import get_responses_by_player_in_room, get_all_responses_question, \
-    get_student_quiz_history, calculate_average_score, find_best_and_worst_scores, get_guest_responses, isCorrectAnswer, \
+    get_student_quiz_history, calculate_average_score, find_best_and_worst_scores, get_guest_responses, \
     get_responses
 import json
 
@@ -23,10 +24,13 @@ def stats_details(request, stats_id):
     stats_obj = get_object_or_404(Stats, id=stats_id, quiz__tutor=request.user)
     participants = RoomParticipant.objects.filter(room=stats_obj.room).exclude(user__role__iexact="tutor")
     questions_stats = QuestionStats.objects.filter(room=stats_obj.room)
+    analytics = ScoreAnalytics(participant.score for participant in participants)
     context = {
         "stats": stats_obj,
         "participants": participants,
         "questions_stats": questions_stats,
+        "score_percentiles": analytics.percentiles(),
+        "score_distribution": analytics.distribution(),
     }
     return render(request, "tutor/stats_detail.html", context)
 
@@ -100,9 +104,7 @@ def question_responses(request, room_id, question_id):
     if not question:
         raise Http404("Question not found.")
     stats = Stats.objects.filter(room=room).first()
-    responses = sorted(get_all_responses_question(room, question), key=lambda r: r.timestamp)
-    for response in responses:
-        isCorrectAnswer(response)
+    responses = list(get_all_responses_question(room, question).select_related('player', 'guest_access').order_by('timestamp'))
     correct_count = sum(1 for r in responses if r.correct)
     incorrect_count = len(responses) - correct_count
     context={
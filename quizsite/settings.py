@@ -83,12 +83,71 @@ ASGI_APPLICATION = 'quizsite.asgi.application'
 
 WSGI_APPLICATION = 'quizsite.wsgi.application'
 
-CHANNEL_LAYERS = {
+# Set CHANNEL_LAYER_SOCKET to share channel groups between processes through the
+# broker started with `python manage.py run_channel_broker`. This does not make
+# live quizzes safe to spread over several workers: the question clock,
+# leaderboard, answer counters, roster and answer buffer in app.live are kept
+# per process, and nothing routes all of a room's sockets to the same worker.
+CHANNEL_LAYER_SOCKET = os.environ.get('CHANNEL_LAYER_SOCKET')
+
+if CHANNEL_LAYER_SOCKET:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'app.live.socket_layer.UnixSocketChannelLayer',
+            'CONFIG': {
+                'path': CHANNEL_LAYER_SOCKET,
+            },
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        },
+    }
+
+# The cache backend is configurable so several workers can share one (e.g.
+# django.core.cache.backends.redis.RedisCache with CACHE_LOCATION=redis://...)
+CACHES = {
     'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer',
-    },
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'quizmunk'),
+    }
 }
 
+# Ordered question lists per quiz are cached here, keyed by the quiz's content version
+QUIZ_MANIFEST_CACHE = 'default'
+QUIZ_MANIFEST_CACHE_TIMEOUT = 60 * 60
+
+# Seconds between coalesced leaderboard pushes during a live quiz
+LIVE_QUIZ_BROADCAST_TICK = 0.25
+
+# Students see this many leaderboard rows plus their own rank and neighbours
+LIVE_QUIZ_STUDENT_TOP_K = 5
+
+# Submitted answers are buffered and written in batches of this size,
+# or after this many seconds if the batch does not fill up
+LIVE_QUIZ_INGEST_BATCH_SIZE = 100
+LIVE_QUIZ_INGEST_FLUSH_INTERVAL = 0.5
+
+# Seconds after a question's time runs out that late answers are still accepted
+LIVE_QUIZ_ANSWER_GRACE = 1.0
+
+# Participant join/leave deltas are replaced by a full roster every this many changes
+LIVE_ROSTER_SNAPSHOT_EVERY = 50
+
+# Live answer distributions shown to the tutor: buckets for numeric answers,
+# and how many distinct text answers are tracked and shown
+LIVE_QUIZ_HISTOGRAM_BUCKETS = 10
+LIVE_QUIZ_TEXT_ANSWER_SLOTS = 50
+LIVE_QUIZ_TEXT_ANSWER_TOP_K = 5
+
+# Imported questions are inserted in batches of this size
+QUIZ_IMPORT_BATCH_SIZE = 500
+
+# Compiled answer checkers kept in memory per process (least recently used are dropped)
+ANSWER_CHECKER_CACHE_SIZE = 1024
+
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
@@ -139,6 +198,9 @@ STATIC_URL = '/static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, "app", "media")
 
+# Tests upload files into a temporary MEDIA_ROOT instead of app/media.
+TEST_RUNNER = 'app.tests.runner.TemporaryMediaRunner'
+
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'app', 'static'),
 ]
@@ -27,7 +27,7 @@ from app.views.join_quiz_view import join_quiz
 from app.views.lobby_view import lobby, setup_quiz, setup_classroom_quiz
 from app.views.dashboard_view import student_dashboard, tutor_dashboard
 from app.views.profile_view import student_profile, tutor_profile
-from app.views.quiz_view import create_quiz_view,edit_quiz_view,delete_question_view, get_question_view, your_quizzes_view, delete_quiz_view, delete_question_image_view, update_question_order
+from app.views.quiz_view import create_quiz_view,edit_quiz_view,delete_question_view, get_question_view, your_quizzes_view, delete_quiz_view, delete_question_image_view, update_question_order, export_quizzes_view, import_quizzes_view
 from app.views.live_quiz_view import tutor_live_quiz, start_quiz, next_question, end_quiz, student_live_quiz, load_partial
 from app.views.password_reset_view import password_reset
 from app.views.classroom_view import tutor_classroom_view, tutor_classroom_detail_view, student_classroom_view, accept_classroom_invite, decline_classroom_invite, student_classroom_detail_view
@@ -55,6 +55,9 @@ urlpatterns = [
     path('delete-question-image/<int:question_id>/', delete_question_image_view, name='delete_question_image'),
     path('get_question/<int:quiz_id>/', get_question_view, name='get_question'),
     path('update-question-order/', update_question_order, name='update-question-order'),
+    path('export-quizzes/', export_quizzes_view, name='export_quizzes'),
+    path('export-quiz/<int:quiz_id>/', export_quizzes_view, name='export_quiz'),
+    path('import-quizzes/', import_quizzes_view, name='import_quizzes'),
 
     path('join-quiz/', join_quiz, name='join_quiz'),
     path('setup_quiz/<int:quiz_id>/', setup_quiz, name='setup_quiz'),